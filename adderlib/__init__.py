@@ -1,2 +1,2 @@
-__all__ = ["adder","channels","devices","urlhandlers","users","presets"]
+__all__ = ["adder","asyncadder","bulk","caching","channels","cluster","coalescing","delta","devices","errors","filters","fleet","inventory","lazy","paging","parsers","reconcile","records","relations","resilience","rollout","sessions","store","switching","tokens","urlhandlers","users","presets","watch"]
 __version__ = "1.0.3"
\ No newline at end of file
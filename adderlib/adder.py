@@ -1,14 +1,22 @@
-import urllib.parse, typing
+import concurrent.futures, re, threading, time, types, urllib.parse, typing
+from datetime import datetime, timezone
 
 from .urlhandlers import UrlHandler, RequestsHandler
 from .users import AdderUser
 from .devices import AdderDevice, AdderReceiver, AdderTransmitter, AdderServer, AdderUSBExtender, AdderUSBReceiver, AdderUSBTransmitter
 from .channels import AdderChannel
 from .presets import AdderPreset
-
-class AdderRequestError(Exception):
-	"""Adder API request has not returned success"""
-	pass
+from .filters import DeviceFilter, ChannelFilter, PresetFilter
+from .paging import PagedList, list_items
+from .errors import AdderRequestError, raise_for_failure
+from .inventory import AdderInventory, AdderUSBTopology
+from .relations import ChannelGraph
+from .watch import Watch
+from .bulk import PairResult, BulkResult, as_pairs
+from .switching import PresetSwitcher
+from .lazy import LazyRecord, hydrate_all
+from .tokens import TokenStore
+from .parsers import StreamedList
 
 class AdderAPI:
 
@@ -19,6 +27,15 @@ class AdderAPI:
 		self.setUrlHandler(url_handler or RequestsHandler())
 		self.setUser(user or AdderUser())
 		self.setApiVersion(api_version)
+		self._inventory = None
+		self._switcher = None
+
+		# Set when the session should be renewed if the AIM turns it down, such as when it was restored from a TokenStore
+		self._token_store = None
+		self._credentials = None
+
+		# Held while logging in or out.  Reentrant, as logging out may need to log in again to tidy up.
+		self._session_lock = threading.RLock()
 	
 	def _setServerAddress(self, server_address:str):
 		"""Set the server address to use"""
@@ -45,10 +62,83 @@ class AdderAPI:
 		"""Set the API version to use"""
 		self._api_version = int(version)
 
-	# User authentication
-	def login(self, username:str, password:str):
-		"""Log the user in to the KVM system and retrieve an API token"""
+	def _iterItems(self, args:dict, container:str, item:str, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Iterator[dict]:
+		"""
+		Iterate over the items of an API list
+		The whole list is streamed in one request, unless a `page_size` is given.  Then it is requested one page at a time,
+		with up to `prefetch` pages requested ahead in the background.
+		"""
+
+		if page_size is None:
+			return self._stream(args, container, item)
 		
+		return iter(PagedList(self._request, args, container, item, page_size=page_size, prefetch=prefetch))
+
+	# Requests
+
+	# AIM error codes for a session token which wasn't accepted.  Errors without a code are judged by their message.
+	TOKEN_ERROR_CODES = frozenset({"1"})
+
+	@classmethod
+	def _isTokenError(cls, response:dict) -> bool:
+		"""Whether a response failed because the session token was not accepted"""
+
+		if response.get("success") == "1" or not response.get("errors"):
+			return False
+		errors = response.get("errors").get("error")
+		errors = errors if isinstance(errors, list) else [errors]
+
+		for error in filter(None, errors):
+			code = str(error.get("code") or "").strip()
+			if code:
+				if code in cls.TOKEN_ERROR_CODES:
+					return True
+			elif re.search(r"token|not logged in", str(error.get("msg") or ""), re.IGNORECASE):
+				return True
+		return False
+
+	def _request(self, args:dict) -> dict:
+		"""
+		Make an API call
+		If the API is to keep its session going (such as one restored from a TokenStore) and it has expired, log in again and retry once.
+		"""
+
+		response = self._url_handler.api_call(self._server_address, args)
+
+		if self._credentials is not None and "token" in args and self._isTokenError(response):
+			response = self._url_handler.api_call(self._server_address, dict(args, token=self._renewSession(args["token"])))
+
+		return response
+
+	def _stream(self, args:dict, container:str, item:str) -> typing.Iterator[dict]:
+		"""
+		Stream the items of an API list, logging in again and asking once more if the session has expired
+		A list the AIM turns down raises AdderRequestError, as with a paged list.
+		"""
+
+		renews = self._credentials is not None and "token" in args
+
+		stream = self._url_handler.api_stream(self._server_address, args, container, item)
+		listed = False
+		for listed_item in stream:
+			listed = True
+			yield listed_item
+
+		if isinstance(stream, StreamedList):
+			# A failed list streams as an empty one; the rest of the response says why
+			if stream.succeeded is False:
+				response = self._request(dict(args, token=self._renewSession(args["token"]))) if renews and self._isTokenError(stream.header) else stream.header
+				raise_for_failure(response)
+				yield from list_items(response, container, item)
+		elif renews and not listed:
+			# Handlers which don't say how the response went can't tell a failed list from an empty one, so check with a whole response
+			response = self._request(args)
+			raise_for_failure(response)
+			yield from list_items(response, container, item)
+
+	def _authenticate(self, username:str, password:str) -> str:
+		"""Log in, and return the new session token"""
+
 		args = {
 			"v":self._api_version,
 			"method":"login",
@@ -56,13 +146,10 @@ class AdderAPI:
 			"password":password
 		}
 
-		if self._user.logged_in:
-			raise AdderRequestError(f"Already logged in as {self._user.username}")
-
 		response = self._url_handler.api_call(self._server_address, args)
 		
 		if response.get("success") == "1" and response.get("token") is not None:
-			self._user.set_logged_in(username, response.get("token"))
+			return response.get("token")
 		
 		elif "errors" in response:
 			error = response.get("errors").get("error")
@@ -70,28 +157,133 @@ class AdderAPI:
 		
 		else:
 			raise Exception("Unknown error")
+
+	def _renewSession(self, stale_token:str) -> str:
+		"""Log in again in place of an expired session, and return the new token"""
+
+		with self._session_lock:
+			# Another thread may have got there first
+			if self._user.token != stale_token:
+				return self._user.token
+
+			username, password = self._credentials
+			token = self._authenticate(username, password)
+			self._user.set_logged_in(username, token)
+			if self._token_store is not None:
+				self._token_store.save(self._server_address.geturl(), username, token)
+			return token
+
+	# User authentication
+	def login(self, username:str, password:str, *, prefetch:bool=False, token_store:typing.Optional[TokenStore]=None) -> typing.Optional[AdderInventory]:
+		"""
+		Log the user in to the KVM system and retrieve an API token, optionally taking an inventory snapshot straight away
+		With a `token_store`, a token kept from an earlier run is used instead if there is one, without checking it with the AIM.
+		Should it have expired, the user is logged in again when it is first turned down.  New tokens are kept for next time.
+		"""
+
+		# One login or logout at a time, so threads sharing the API can't leave it half logged in
+		with self._session_lock:
+			if self._user.logged_in:
+				raise AdderRequestError(f"Already logged in as {self._user.username}")
+
+			restored = False
+			if token_store is not None:
+				self._token_store = token_store
+				self._credentials = (username, password)
+				restored = self._user.load_token(token_store, self._server_address.geturl(), username)
+
+			if not restored:
+				token = self._authenticate(username, password)
+				self._user.set_logged_in(username, token)
+				if token_store is not None:
+					token_store.save(self._server_address.geturl(), username, token)
+		
+		return self.snapshot() if prefetch else None
 	
 	def logout(self):
 		"""Log the user out"""
 
-		args = {
-			"v":self._api_version,
-			"method":"logout",
-			"token":self._user.token
+		with self._session_lock:
+			args = {
+				"v":self._api_version,
+				"method":"logout",
+				"token":self._user.token
+			}
+
+			# Temporary presets are only any use to this session
+			if self._switcher is not None:
+				self._switcher.close()
+				self._switcher = None
+
+			response = self._url_handler.api_call(self._server_address, args)
+
+			# TODO: More detailed error handling?
+			# TODO: Maybe have the URL handler throw an exception?
+			if response.get("success") == "1":
+				if self._token_store is not None:
+					# Logged out, the token is no use to anyone
+					self._token_store.discard(self._server_address.geturl(), self._user.username)
+					self._token_store = None
+				self._credentials = None
+				self._user.set_logged_out()
+				self._inventory = None
+			else:
+				raise AdderRequestError()
+	
+	def snapshot(self, *, max_workers:int=6) -> AdderInventory:
+		"""Fetch the transmitters, receivers, channels, presets, servers and C-USB extenders concurrently, as one inventory"""
+
+		fetches = {
+			"transmitters":  lambda: tuple(self.getTransmitters()),
+			"receivers":     lambda: tuple(self.getReceivers()),
+			"channels":      lambda: tuple(self.getChannels()),
+			"presets":       lambda: tuple(self.getPresets()),
+			"servers":       lambda: tuple(self.getServers()),
+			"usb_extenders": self.getUSBExtenders,
 		}
+		fetched_at = {}
+
+		def fetch(name:str):
+			items = fetches[name]()
+			fetched_at[name] = datetime.now(timezone.utc)
+			return items
+
+		started_at = datetime.now(timezone.utc)
+		timer = time.perf_counter()
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=max(int(max_workers), 1), thread_name_prefix="adderlib-snapshot") as executor:
+			futures = {name: executor.submit(fetch, name) for name in fetches}
+			try:
+				lists = {name: future.result() for name, future in futures.items()}
+			except Exception:
+				# No point downloading the rest of an inventory that can't be completed
+				for future in futures.values():
+					future.cancel()
+				raise
+
+		self._inventory = AdderInventory(
+			**lists,
+			started_at=started_at,
+			fetched_at=types.MappingProxyType(fetched_at),
+			wall_time=time.perf_counter() - timer
+		)
+		return self._inventory
+		
+	def watch(self, *, min_interval:float=1.0, max_interval:float=30.0) -> Watch:
+		"""
+		Watch the receivers for changes, such as connections and status, polling the AIM on a background thread
+		Polling speeds up while changes are frequent and slows down while the fleet is idle.  Use it as a context manager and
+		`subscribe()` once per consumer, or iterate over it directly.
+		"""
+		return Watch(self.getReceivers, min_interval=min_interval, max_interval=max_interval)
 
-		response = self._url_handler.api_call(self._server_address, args)
-
-		# TODO: More detailed error handling?
-		# TODO: Maybe have the URL handler throw an exception?
-		if response.get("success") == "1":
-			self._user.set_logged_out()
-		else:
-			raise AdderRequestError()
-		
 	# Device management
-	def getTransmitters(self, t_id:typing.Optional[str]=None) -> typing.Generator[AdderTransmitter, None, None]:
-		"""Request a list of available Adderlink transmitters"""
+	def getTransmitters(self, t_id:typing.Optional[str]=None, *, filter:typing.Optional[DeviceFilter]=None, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Generator[AdderTransmitter, None, None]:
+		"""Request a list of available Adderlink transmitters, optionally matching a DeviceFilter"""
+
+		filter = filter or DeviceFilter()
+		if t_id is not None:
+			filter = filter.with_id(t_id)
 
 		args = {
 			"v":self._api_version,
@@ -99,27 +291,21 @@ class AdderAPI:
 			"method":"get_devices",
 			"device_type":"tx"
 		}
-
-		response = self._url_handler.api_call(self._server_address, args)
-
-		if response.get("success") == "1" and "devices" in response:
-
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_devices") == "1":
-				transmitters_list = [response.get("devices").get("device")]
-			else:
-				transmitters_list = response.get("devices").get("device")
-
-
-			for device in transmitters_list:
-				tx = AdderTransmitter(device)
-				# Quick n dirty filtering since API does not support it natively
-				if t_id is not None and t_id != tx.id:
-					continue
-				yield tx
+		args.update(filter.query_args())
+
+		for device in self._iterItems(args, "devices", "device", page_size, prefetch):
+			tx = AdderTransmitter(device)
+			# The API can't filter on everything (IDs, for one), so check what comes back
+			if not filter.matches(tx):
+				continue
+			yield tx
 			
-	def getReceivers(self, r_id:typing.Optional[str]=None) -> typing.Generator[AdderReceiver, None, None]:
-		"""Request a list of available Adderlink receivers"""
+	def getReceivers(self, r_id:typing.Optional[str]=None, *, filter:typing.Optional[DeviceFilter]=None, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Generator[AdderReceiver, None, None]:
+		"""Request a list of available Adderlink receivers, optionally matching a DeviceFilter"""
+
+		filter = filter or DeviceFilter()
+		if r_id is not None:
+			filter = filter.with_id(r_id)
 
 		args = {
 			"v":self._api_version,
@@ -127,26 +313,17 @@ class AdderAPI:
 			"method":"get_devices",
 			"device_type":"rx"
 		}
+		args.update(filter.query_args())
 
-		response = self._url_handler.api_call(self._server_address, args)
-
-		if response.get("success") == "1" and "devices" in response:
-
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_devices") == "1":
-				receivers_list = [response.get("devices").get("device")]
-			else:
-				receivers_list = response.get("devices").get("device")
-
-			for device in receivers_list:
-				rx = AdderReceiver(device)
-				# Quick n dirty filtering since API does not support it natively
-				if r_id is not None and r_id != rx.id:
-					continue
-				yield rx
+		for device in self._iterItems(args, "devices", "device", page_size, prefetch):
+			rx = AdderReceiver(device)
+			# The API can't filter on everything (IDs, for one), so check what comes back
+			if not filter.matches(rx):
+				continue
+			yield rx
 
 	# Device management
-	def getServers(self) -> typing.Generator[AdderServer, None, None]:
+	def getServers(self, *, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Generator[AdderServer, None, None]:
 		"""Request a list of available Adderlink AIM Servers"""
 
 		args = {
@@ -155,18 +332,8 @@ class AdderAPI:
 			"method":"get_servers"
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
-
-		if response.get("success") == "1" and "servers" in response:
-
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_servers") == "1":
-				servers_list = [response.get("servers").get("server")]
-			else:
-				servers_list = response.get("servers").get("server")
-
-			for server in servers_list:
-				yield AdderServer(server)
+		for server in self._iterItems(args, "servers", "server", page_size, prefetch):
+			yield AdderServer(server)
 	
 	def setDeviceInfo(self, device:AdderDevice, *, description:typing.Optional[str]=None, location:typing.Optional[str]=None):
 		"""Update the information for an existing device"""
@@ -188,7 +355,7 @@ class AdderAPI:
 		if location is not None:
 			args.update({"loc": '_' if not len(location.strip()) else location})
 
-		response = self._url_handler.api_call(self._server_address, args)			
+		response = self._request(args)			
 			
 		if response.get("success") == "1":
 			return
@@ -212,7 +379,7 @@ class AdderAPI:
 			"ids": ','.join(d.id for d in devices)
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 
 		if response.get("success") == "1":
 			return
@@ -223,39 +390,44 @@ class AdderAPI:
 
 	
 	# Channel management
-	def getChannels(self, id:typing.Optional[str]=None, name:typing.Optional[str]="") -> typing.Generator[AdderChannel, None, None]:
-		"""Request a list of available Adderlink channels"""
+	def getChannels(self, id:typing.Optional[str]=None, name:typing.Optional[str]="", *, filter:typing.Optional[ChannelFilter]=None, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Generator[AdderChannel, None, None]:
+		"""Request a list of available Adderlink channels, optionally matching a ChannelFilter"""
+
+		filter = filter or ChannelFilter()
+		if id is not None:
+			filter = filter.with_id(id)
+		if name:
+			filter = filter.named(name)
 
 		args = {
 			"v":self._api_version,
 			"token":self._user.token,
-			"method":"get_channels",
-			"filter_c_name": name or ""
+			"method":"get_channels"
 		}
-
-		response = self._url_handler.api_call(self._server_address, args)
-		
-		if response.get("success") == "1" and "channels" in response:
-
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_channels") == "1":
-				channel_list = [response.get("channels").get("channel")]
-			else:
-				channel_list = response.get("channels").get("channel")
-
-			for channel in channel_list:
-				ch = AdderChannel(channel)
-				if id is not None and id != ch.id:
-					continue
-				yield AdderChannel(channel)
+		args.update(filter.query_args())
+
+		for channel in self._iterItems(args, "channels", "channel", page_size, prefetch):
+			ch = AdderChannel(channel)
+			# The API can't filter on everything (IDs, for one), so check what comes back
+			if not filter.matches(ch):
+				continue
+			yield ch
+	
+	def getChannelGraph(self) -> ChannelGraph:
+		"""Fetch receivers, channels and transmitters once each, and join receivers to their channels and channels to their transmitters"""
+		return ChannelGraph(self.getReceivers(), self.getChannels(), self.getTransmitters())
 	
 	def createChannel(self,
 		name:str, description:typing.Optional[str]=None, location:typing.Optional[str]=None, modes:typing.Optional[typing.List[AdderChannel.ConnectionMode]]=None, 
 		video1:typing.Optional[AdderTransmitter]=None, video1_head:typing.Optional[int]=None,
 		video2:typing.Optional[AdderTransmitter]=None, video2_head:typing.Optional[int]=None,
 		audio:typing.Optional[AdderTransmitter]=None, usb:typing.Optional[AdderTransmitter]=None, serial:typing.Optional[AdderTransmitter]=None,
-		group_name:typing.Optional[str]=None) -> AdderChannel:
-		"""Create a new channel from the specified transmitters"""
+		group_name:typing.Optional[str]=None, *, lazy:bool=False) -> typing.Union[AdderChannel, LazyRecord]:
+		"""
+		Create a new channel from the specified transmitters
+		With `lazy`, the channel is returned as a LazyRecord, and only fetched if something other than its ID, name, description
+		or location is asked for.
+		"""
 
 		modes = modes or []
 		
@@ -296,9 +468,16 @@ class AdderAPI:
 		if serial:
 			args.update({"serial":serial.id})
 		
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		if response.get("success") == "1" and response.get("id"):
-			return next(self.getChannels(id=response.get("id")))
+			# Narrow the lookup to channels with this name, rather than fetching them all
+			fetch = lambda id: next(self.getChannels(filter=ChannelFilter(id=id, name=name)), None)
+			if lazy:
+				return LazyRecord(AdderChannel, response.get("id"), fetch, name=name, description=description or "", location=location or "")
+			channel = fetch(response.get("id"))
+			if channel is None:
+				raise AdderRequestError(f"Created channel {response.get('id')} could not be found")
+			return channel
 		
 		elif "errors" in response:
 			error = response.get("errors").get("error")
@@ -308,6 +487,21 @@ class AdderAPI:
 			raise Exception("Unknown error")
 
 
+	def createChannels(self, channels:typing.Iterable[dict]) -> typing.List[AdderChannel]:
+		"""
+		Create many channels, each described by a dict of arguments to createChannel(), and fetch them all in one request at the end
+		If creating one fails, the error is raised and those already created are left in place.
+		"""
+
+		created = [self.createChannel(**channel, lazy=True) for channel in channels]
+		if not created:
+			return []
+
+		try:
+			return hydrate_all(created, self.getChannels())
+		except LookupError as e:
+			raise AdderRequestError(str(e)) from e
+
 	def connectToChannel(self, channel:AdderChannel, receiver:AdderReceiver, mode:typing.Optional[AdderChannel.ConnectionMode]=AdderChannel.ConnectionMode.SHARED):
 		"""Connect a channel to a receiver"""
 
@@ -320,7 +514,7 @@ class AdderAPI:
 			"mode":mode.value
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		if response.get("success") == "1":
 			return
 		
@@ -331,6 +525,48 @@ class AdderAPI:
 		else:
 			raise Exception("Unknown error")
 		
+	def connectMany(self, pairs:typing.Iterable[typing.Union[AdderPreset.Pair, typing.Tuple[AdderChannel, AdderReceiver]]], mode:typing.Optional[AdderChannel.ConnectionMode]=AdderChannel.ConnectionMode.SHARED, *, max_concurrency:int=8, atomic:bool=False) -> BulkResult:
+		"""
+		Connect many channel/receiver pairs at once, with up to `max_concurrency` requests in flight
+		Every pair is attempted, whatever happens to the others.  Check the result for which succeeded.
+		With `atomic`, the pairs are instead switched together through a temporary preset (see PresetSwitcher), and succeed or fail as one.
+		"""
+
+		if int(max_concurrency) < 1:
+			raise ValueError("At least one connection must be allowed at a time")
+		pairs = as_pairs(pairs)
+
+		if atomic and pairs:
+			with self._session_lock:
+				if self._switcher is None:
+					self._switcher = PresetSwitcher(self)
+			started = time.perf_counter()
+			try:
+				self._switcher.switch(pairs, mode)
+			except Exception as e:
+				error = e
+			else:
+				error = None
+			latency = time.perf_counter() - started
+			return BulkResult(tuple(PairResult(pair, error, latency) for pair in pairs), latency)
+
+		def connect(pair:AdderPreset.Pair) -> PairResult:
+			started = time.perf_counter()
+			try:
+				self.connectToChannel(pair.channel, pair.receiver, mode)
+			except Exception as e:
+				return PairResult(pair, e, time.perf_counter() - started)
+			return PairResult(pair, None, time.perf_counter() - started)
+
+		started = time.perf_counter()
+		if not pairs:
+			return BulkResult((), 0.0)
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=min(int(max_concurrency), len(pairs)), thread_name_prefix="adderlib-connect") as executor:
+			results = tuple(executor.map(connect, pairs))
+
+		return BulkResult(results, time.perf_counter() - started)
+
 	def disconnectFromChannel(self, receiver:typing.Union[AdderReceiver, typing.Iterable[AdderReceiver]], force:typing.Optional[bool]=False):
 		"""Disconnect a receiver -- or iterable of receivers -- from its current channel"""
 		receiver = [receiver] if isinstance(receiver, AdderReceiver) else receiver
@@ -343,7 +579,7 @@ class AdderAPI:
 			"force":int(force)
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		
 		if response.get("success") == "1":
 			return
@@ -361,7 +597,7 @@ class AdderAPI:
 			"id": channel.id
 		}
 		
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 
 		if response.get("success") == "1":
 			return
@@ -371,33 +607,32 @@ class AdderAPI:
 			raise AdderRequestError(f"Error {error.get('code','?')}: {error.get('msg','?')}")		
 	
 	# Preset management
-	def getPresets(self, id:typing.Optional[str]=None) -> typing.Generator[AdderPreset, None, None]:
-		"""Request a list of available Adderlink presets"""
+	def getPresets(self, id:typing.Optional[str]=None, *, filter:typing.Optional[PresetFilter]=None, page_size:typing.Optional[int]=None, prefetch:int=1) -> typing.Generator[AdderPreset, None, None]:
+		"""Request a list of available Adderlink presets, optionally matching a PresetFilter"""
+
+		filter = filter or PresetFilter()
+		if id is not None:
+			filter = filter.with_id(id)
 
 		args = {
 			"v":self._api_version,
 			"token":self._user.token,
 			"method":"get_presets"
 		}
-
-		response = self._url_handler.api_call(self._server_address, args)
-		
-		if response.get("success") == "1" and "connection_presets" in response:
-
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_presets") == "1":
-				presets_list = [response.get("connection_presets").get("connection_preset")]
-			else:
-				presets_list = response.get("connection_presets").get("connection_preset")
-
-			for preset in presets_list:
-				ps = AdderPreset(preset)
-				if id is not None and id != ps.id:
-					continue
-				yield ps
+		args.update(filter.query_args())
+
+		for preset in self._iterItems(args, "connection_presets", "connection_preset", page_size, prefetch):
+			ps = AdderPreset(preset)
+			# The API doesn't filter presets, so check what comes back
+			if not filter.matches(ps):
+				continue
+			yield ps
 	
-	def createPreset(self, name:str, pairs:typing.Union[typing.Iterable[AdderPreset.Pair], AdderPreset.Pair], modes:typing.Union[typing.Iterable[AdderChannel.ConnectionMode], AdderChannel.ConnectionMode]) -> AdderPreset:
-		"""Create a preset consisting of one or more channel/receiver pairs"""
+	def createPreset(self, name:str, pairs:typing.Union[typing.Iterable[AdderPreset.Pair], AdderPreset.Pair], modes:typing.Union[typing.Iterable[AdderChannel.ConnectionMode], AdderChannel.ConnectionMode], *, lazy:bool=False) -> typing.Union[AdderPreset, LazyRecord]:
+		"""
+		Create a preset consisting of one or more channel/receiver pairs
+		With `lazy`, the preset is returned as a LazyRecord, and only fetched if something other than its ID or name is asked for.
+		"""
 
 		if not len(name.strip()):
 			raise ValueError("'name' parameter must not be empty")
@@ -420,16 +655,41 @@ class AdderAPI:
 			"allowed":modes_formatted
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 
 		if response.get("success") == "1" and response.get("id"):
-			return next(self.getPresets(response.get("id")))
+			# The AIM can't look up a single preset, so fetching one means fetching them all
+			fetch = lambda id: next(self.getPresets(id), None)
+			if lazy:
+				return LazyRecord(AdderPreset, response.get("id"), fetch, name=name)
+			preset = fetch(response.get("id"))
+			if preset is None:
+				raise AdderRequestError(f"Created preset {response.get('id')} could not be found")
+			return preset
 		
 		elif "errors" in response:
-			raise Exception(f"Errors: {response.get('errors')}")
-			#for error in response.get("errors").get("error"):
-			#	raise Exception(f"Error {error.get('code','?')}: {error.get('msg','?')}")
+			error = response.get("errors").get("error")
+			error = error[0] if isinstance(error, list) else error
+			raise AdderRequestError(f"Error {error.get('code','?')}: {error.get('msg','?')}", code=error.get("code"))
+
+		else:
+			raise AdderRequestError("Unknown error")
 	
+	def createPresets(self, presets:typing.Iterable[dict]) -> typing.List[AdderPreset]:
+		"""
+		Create many presets, each described by a dict of arguments to createPreset(), and fetch them all in one request at the end
+		If creating one fails, the error is raised and those already created are left in place.
+		"""
+
+		created = [self.createPreset(**preset, lazy=True) for preset in presets]
+		if not created:
+			return []
+
+		try:
+			return hydrate_all(created, self.getPresets())
+		except LookupError as e:
+			raise AdderRequestError(str(e)) from e
+
 	def loadPreset(self, preset:AdderPreset, mode:AdderChannel.ConnectionMode, force:typing.Optional[bool]=False):
 		"""Connect a preset"""
 
@@ -442,13 +702,8 @@ class AdderAPI:
 			"force":int(force)
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
-		
-		if response.get("success") == "1":
-			return
-		
-		elif "errors" in response:
-			raise Exception(f"Errors: {response.get('errors')}")
+		response = self._request(args)
+		raise_for_failure(response)
 	
 	def unloadPreset(self, preset:AdderPreset, force:typing.Optional[bool]=False):
 		"""Disconnect a preset"""
@@ -461,7 +716,7 @@ class AdderAPI:
 			"force":int(force)
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		
 		if response.get("success") == "1":
 			return
@@ -479,7 +734,7 @@ class AdderAPI:
 			"id":preset.id
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		
 		if response.get("success") == "1":
 			return
@@ -488,8 +743,8 @@ class AdderAPI:
 			raise Exception(f"Errors: {response.get('errors')}")
 	
 	# C-USB Lan Extender Management
-	def getUSBReceivers(self, mac_address:typing.Optional[AdderUSBReceiver]=None) -> typing.Generator[AdderUSBReceiver, None, None]:
-		"""Get a list of C-USB LAN Receivers, optionally filtered by MAC address"""
+	def getUSBExtenders(self) -> AdderUSBTopology:
+		"""Get all C-USB LAN Transmitters and Receivers with a single request, indexed by MAC address"""
 
 		args = {
 			"v":self._api_version,
@@ -497,26 +752,34 @@ class AdderAPI:
 			"method":"get_all_c_usb"
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		extenders = []
+		for usb in self._stream(args, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") == "rx":
+				extenders.append(AdderUSBReceiver(usb))
+			elif usb.get("type","") == "tx":
+				extenders.append(AdderUSBTransmitter(usb))
 
-		if response.get("success") == "1" and "c_usb_lan_extenders" in response:
+		return AdderUSBTopology(extenders)
+	
+	def getUSBReceivers(self, mac_address:typing.Optional[AdderUSBReceiver]=None) -> typing.Generator[AdderUSBReceiver, None, None]:
+		"""Get a list of C-USB LAN Receivers, optionally filtered by MAC address"""
 
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_c_usbs") == "1":
-				usb_list = [response.get("c_usb_lan_extenders").get("c_usb")]
-			else:
-				usb_list = response.get("c_usb_lan_extenders").get("c_usb")
+		args = {
+			"v":self._api_version,
+			"token":self._user.token,
+			"method":"get_all_c_usb"
+		}
 
-			for usb in usb_list:
-				if usb.get("type","") != "rx": continue
+		for usb in self._stream(args, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") != "rx": continue
 
-				rx = AdderUSBReceiver(usb)
+			rx = AdderUSBReceiver(usb)
 
-				# Quick n dirty filtering since API does not support it natively
-				if mac_address is not None and mac_address != rx.mac_address:
-					continue
+			# Quick n dirty filtering since API does not support it natively
+			if mac_address is not None and mac_address != rx.mac_address:
+				continue
 
-				yield rx
+			yield rx
 
 	# C-USB Lan Extender Management
 	# TODO: Currently untested
@@ -530,26 +793,16 @@ class AdderAPI:
 			"method":"get_all_c_usb"
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
-
-		if response.get("success") == "1" and "c_usb_lan_extenders" in response:
+		for usb in self._stream(args, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") != "tx": continue
 
-			# It seems `xmltodict` only returns a list of nodes if there are more than one
-			if response.get("count_c_usbs") == "1":
-				usb_list = [response.get("c_usb_lan_extenders").get("c_usb")]
-			else:
-				usb_list = response.get("c_usb_lan_extenders").get("c_usb")
-
-			for usb in usb_list:
-				if usb.get("type","") != "tx": continue
+			tx = AdderUSBTransmitter(usb)
 
-				tx = AdderUSBTransmitter(usb)
+			# Quick n dirty filtering since API does not support it natively
+			if mac_address is not None and mac_address != tx.mac_address:
+				continue
 
-				# Quick n dirty filtering since API does not support it natively
-				if mac_address is not None and mac_address != tx.mac_address:
-					continue
-
-				yield tx
+			yield tx
 	
 	def deleteUSBExtender(self, usb:AdderUSBExtender):
 		"""Delete a C-USB LAN Transmitter or Receiver"""
@@ -561,7 +814,7 @@ class AdderAPI:
 			"mac":usb.mac_address
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 		
 		if response.get("success") == "1":
 			return
@@ -580,7 +833,7 @@ class AdderAPI:
 			"name":name
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 	
 		if response.get("success") == "1":
 			return
@@ -600,7 +853,7 @@ class AdderAPI:
 			"tx": transmitter.mac_address
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 	
 		if response.get("success") == "1":
 			return
@@ -618,7 +871,7 @@ class AdderAPI:
 			"mac": receiver.mac_address,
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 	
 		if response.get("success") == "1":
 			return
@@ -637,7 +890,7 @@ class AdderAPI:
 			"r_d_id": new_device.id
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 
 		if response.get("success") == "1":
 			return
@@ -655,7 +908,7 @@ class AdderAPI:
 			"id": device.id
 		}
 
-		response = self._url_handler.api_call(self._server_address, args)
+		response = self._request(args)
 
 		if response.get("success") == "1":
 			return
@@ -663,6 +916,11 @@ class AdderAPI:
 		elif "errors" in response:
 			raise Exception(f"Errors: {response.get('errors')}")
 
+	@property
+	def inventory(self) -> typing.Optional[AdderInventory]:
+		"""The most recent inventory snapshot, if one has been taken since logging in"""
+		return self._inventory
+
 	@property
 	def user(self) -> AdderUser:
 		"""Get the current user"""
@@ -0,0 +1,471 @@
+import asyncio, time, types, urllib.parse, typing
+from datetime import datetime, timezone
+
+from .urlhandlers import AsyncUrlHandler, AsyncHttpHandler
+from .users import AdderUser
+from .devices import AdderDevice, AdderReceiver, AdderTransmitter, AdderServer, AdderUSBExtender, AdderUSBReceiver, AdderUSBTransmitter
+from .channels import AdderChannel
+from .presets import AdderPreset
+from .filters import DeviceFilter, ChannelFilter, PresetFilter
+from .paging import list_items
+from .inventory import AdderInventory, AdderUSBTopology
+from .relations import ChannelGraph
+from .watch import AsyncWatch
+from .bulk import PairResult, BulkResult, as_pairs
+from .adder import AdderRequestError
+
+class AsyncAdderAPI:
+
+	def __init__(self,server_address:str,*,url_handler:typing.Optional[AsyncUrlHandler]=None, user:typing.Optional[AdderUser]=None, api_version:typing.Optional[int]=8):
+		"""
+		Asynchronous Adderlink API for interacting with devices, channels, and users
+		Methods mirror those of `AdderAPI`, but are awaitable.  The `get*` methods are async generators.
+		"""
+
+		self._setServerAddress(server_address)
+		self.setUrlHandler(url_handler or AsyncHttpHandler())
+		self.setUser(user or AdderUser())
+		self.setApiVersion(api_version)
+		self._inventory = None
+
+	def _setServerAddress(self, server_address:str):
+		"""Set the server address to use"""
+
+		# If no schema defined, indicate that properly in the address
+		if "//" not in server_address:
+			server_address = "//" + server_address
+
+		self._server_address = urllib.parse.urlparse(server_address, scheme="http")
+
+	def setUrlHandler(self, handler:AsyncUrlHandler):
+		"""Set the AsyncUrlHandler to use for AsyncAdderAPI URL calls"""
+		if not isinstance(handler, AsyncUrlHandler):
+			raise ValueError(f"URL handler {type(handler)} is not an instance of AsyncUrlHandler")
+		self._url_handler = handler
+
+	def setUser(self, user:AdderUser):
+		"""Set the AdderUser to use for AsyncAdderAPI calls"""
+		if not isinstance(user, AdderUser):
+			raise ValueError(f"User type{type(user)} is not an instance of AdderUser")
+		self._user = user
+
+	def setApiVersion(self, version:int):
+		"""Set the API version to use"""
+		self._api_version = int(version)
+
+	# Helpers
+	async def _call(self, method:str, **params) -> dict:
+		"""Call an authenticated API method"""
+
+		args = {
+			"v":self._api_version,
+			"token":self._user.token,
+			"method":method
+		}
+		args.update(params)
+
+		return await self._url_handler.api_call(self._server_address, args)
+
+	@staticmethod
+	def _checkSuccess(response:dict):
+		"""Raise an error for an unsuccessful response"""
+
+		if response.get("success") == "1":
+			return
+
+		elif "errors" in response:
+			error = response.get("errors").get("error")
+			if isinstance(error, list):
+				error = error[0]
+			raise AdderRequestError(f"Error {error.get('code','?')}: {error.get('msg','?')}")
+
+		else:
+			raise Exception("Unknown error")
+
+	@staticmethod
+	def _listItems(response:dict, container:str, item:str) -> list:
+		"""List the items in a successful response"""
+
+		return list_items(response, container, item)
+
+	@staticmethod
+	async def _collect(items:typing.AsyncIterator) -> list:
+		"""Gather the items of an async generator into a list"""
+		return [item async for item in items]
+
+	# User authentication
+	async def login(self, username:str, password:str, *, prefetch:bool=False) -> typing.Optional[AdderInventory]:
+		"""Log the user in to the KVM system and retrieve an API token, optionally taking an inventory snapshot straight away"""
+
+		args = {
+			"v":self._api_version,
+			"method":"login",
+			"username":username,
+			"password":password
+		}
+
+		if self._user.logged_in:
+			raise AdderRequestError(f"Already logged in as {self._user.username}")
+
+		response = await self._url_handler.api_call(self._server_address, args)
+		self._checkSuccess(response)
+
+		if response.get("token") is None:
+			raise Exception("Unknown error")
+
+		self._user.set_logged_in(username, response.get("token"))
+
+		return await self.snapshot() if prefetch else None
+
+	async def logout(self):
+		"""Log the user out"""
+
+		response = await self._url_handler.api_call(self._server_address, {
+			"v":self._api_version,
+			"method":"logout",
+			"token":self._user.token
+		})
+
+		if response.get("success") == "1":
+			self._user.set_logged_out()
+			self._inventory = None
+		else:
+			raise AdderRequestError()
+
+	async def snapshot(self) -> AdderInventory:
+		"""Fetch the transmitters, receivers, channels, presets, servers and C-USB extenders concurrently, as one inventory"""
+
+		fetches = {
+			"transmitters":     self.getTransmitters,
+			"receivers":        self.getReceivers,
+			"channels":         self.getChannels,
+			"presets":          self.getPresets,
+			"servers":          self.getServers,
+			"usb_extenders":    self.getUSBExtenders,
+		}
+		fetched_at = {}
+
+		async def fetch(name:str) -> tuple:
+			if name == "usb_extenders":
+				items = await fetches[name]()
+			else:
+				items = tuple([item async for item in fetches[name]()])
+			fetched_at[name] = datetime.now(timezone.utc)
+			return items
+
+		started_at = datetime.now(timezone.utc)
+		timer = time.perf_counter()
+
+		# The handler's in-flight limit still applies to the calls made here
+		tasks = [asyncio.ensure_future(fetch(name)) for name in fetches]
+		try:
+			lists = dict(zip(fetches, await asyncio.gather(*tasks)))
+		except BaseException:
+			for task in tasks:
+				task.cancel()
+			raise
+
+		self._inventory = AdderInventory(
+			**lists,
+			started_at=started_at,
+			fetched_at=types.MappingProxyType(fetched_at),
+			wall_time=time.perf_counter() - timer
+		)
+		return self._inventory
+
+	def watch(self, *, min_interval:float=1.0, max_interval:float=30.0) -> AsyncWatch:
+		"""
+		Watch the receivers for changes, such as connections and status, polling the AIM in a background task
+		Use it with `async with` and `subscribe()` once per consumer, or iterate over it directly with `async for`.
+		"""
+		return AsyncWatch(lambda: self._collect(self.getReceivers()), min_interval=min_interval, max_interval=max_interval)
+
+	# Device management
+	async def getTransmitters(self, t_id:typing.Optional[str]=None, *, filter:typing.Optional[DeviceFilter]=None) -> typing.AsyncGenerator[AdderTransmitter, None]:
+		"""Request a list of available Adderlink transmitters, optionally matching a DeviceFilter"""
+
+		filter = filter or DeviceFilter()
+		if t_id is not None:
+			filter = filter.with_id(t_id)
+
+		response = await self._call("get_devices", device_type="tx", **filter.query_args())
+		for device in self._listItems(response, "devices", "device"):
+			tx = AdderTransmitter(device)
+			if not filter.matches(tx):
+				continue
+			yield tx
+
+	async def getReceivers(self, r_id:typing.Optional[str]=None, *, filter:typing.Optional[DeviceFilter]=None) -> typing.AsyncGenerator[AdderReceiver, None]:
+		"""Request a list of available Adderlink receivers, optionally matching a DeviceFilter"""
+
+		filter = filter or DeviceFilter()
+		if r_id is not None:
+			filter = filter.with_id(r_id)
+
+		response = await self._call("get_devices", device_type="rx", **filter.query_args())
+		for device in self._listItems(response, "devices", "device"):
+			rx = AdderReceiver(device)
+			if not filter.matches(rx):
+				continue
+			yield rx
+
+	async def getServers(self) -> typing.AsyncGenerator[AdderServer, None]:
+		"""Request a list of available Adderlink AIM Servers"""
+
+		response = await self._call("get_servers")
+		for server in self._listItems(response, "servers", "server"):
+			yield AdderServer(server)
+
+	async def setDeviceInfo(self, device:AdderDevice, *, description:typing.Optional[str]=None, location:typing.Optional[str]=None):
+		"""Update the information for an existing device"""
+
+		# Providing neither arguments will cause an API error anyway.  Might as well check here.
+		if description is None and location is None:
+			raise ValueError("At least one of `description` or `location` must be provided")
+
+		# Set to underscore to properly clear an existing value (passing a blank string won't work)
+		params = {"id": device.id}
+		if description is not None:
+			params.update({"desc": '_' if not len(description.strip()) else description})
+		if location is not None:
+			params.update({"loc": '_' if not len(location.strip()) else location})
+
+		self._checkSuccess(await self._call("update_device", **params))
+
+	async def rebootDevices(self, devices:typing.Union[typing.Iterable[AdderDevice], AdderDevice]):
+		"""Reboot one or more devices"""
+
+		devices = [devices] if isinstance(devices, AdderDevice) else devices
+		self._checkSuccess(await self._call("reboot_devices", ids=','.join(d.id for d in devices)))
+
+	async def replaceDevice(self, old_device:AdderDevice, new_device:AdderDevice):
+		"""Replace an old device with a new one"""
+		self._checkSuccess(await self._call("replace_device", d_id=old_device.id, r_d_id=new_device.id))
+
+	async def identifyDevice(self, device:AdderDevice):
+		"""Sends an 'identify' command to the specified device"""
+		self._checkSuccess(await self._call("identify_device", id=device.id))
+
+	# Channel management
+	async def getChannels(self, id:typing.Optional[str]=None, name:typing.Optional[str]="", *, filter:typing.Optional[ChannelFilter]=None) -> typing.AsyncGenerator[AdderChannel, None]:
+		"""Request a list of available Adderlink channels, optionally matching a ChannelFilter"""
+
+		filter = filter or ChannelFilter()
+		if id is not None:
+			filter = filter.with_id(id)
+		if name:
+			filter = filter.named(name)
+
+		response = await self._call("get_channels", **filter.query_args())
+		for channel in self._listItems(response, "channels", "channel"):
+			ch = AdderChannel(channel)
+			if not filter.matches(ch):
+				continue
+			yield ch
+
+	async def getChannelGraph(self) -> ChannelGraph:
+		"""Fetch receivers, channels and transmitters once each, and join receivers to their channels and channels to their transmitters"""
+
+		receivers, channels, transmitters = await asyncio.gather(
+			self._collect(self.getReceivers()), self._collect(self.getChannels()), self._collect(self.getTransmitters())
+		)
+		return ChannelGraph(receivers, channels, transmitters)
+
+	async def createChannel(self,
+		name:str, description:typing.Optional[str]=None, location:typing.Optional[str]=None, modes:typing.Optional[typing.List[AdderChannel.ConnectionMode]]=None,
+		video1:typing.Optional[AdderTransmitter]=None, video1_head:typing.Optional[int]=None,
+		video2:typing.Optional[AdderTransmitter]=None, video2_head:typing.Optional[int]=None,
+		audio:typing.Optional[AdderTransmitter]=None, usb:typing.Optional[AdderTransmitter]=None, serial:typing.Optional[AdderTransmitter]=None,
+		group_name:typing.Optional[str]=None) -> AdderChannel:
+		"""Create a new channel from the specified transmitters"""
+
+		modes = modes or []
+		params = {
+			"name":name,
+			"desc":description,
+			"loc":location,
+			"allowed":str().join([m.value for m in modes]).lower(),
+			"groupname":group_name
+		}
+
+		if video1:
+			params.update({"video1":video1.id, "video1head":video1_head})
+		if video2:
+			params.update({"video2":video2.id, "video2head":video2_head})
+		if audio:
+			params.update({"audio":audio.id})
+		if usb:
+			params.update({"usb":usb.id})
+		if serial:
+			params.update({"serial":serial.id})
+
+		response = await self._call("create_channel", **params)
+		self._checkSuccess(response)
+
+		if not response.get("id"):
+			raise Exception("Unknown error")
+
+		async for channel in self.getChannels(filter=ChannelFilter(id=response.get("id"), name=name)):
+			return channel
+		raise AdderRequestError(f"Created channel {response.get('id')} could not be found")
+
+	async def connectToChannel(self, channel:AdderChannel, receiver:AdderReceiver, mode:typing.Optional[AdderChannel.ConnectionMode]=AdderChannel.ConnectionMode.SHARED):
+		"""Connect a channel to a receiver"""
+		self._checkSuccess(await self._call("connect_channel", c_id=channel.id, rx_id=receiver.id, mode=mode.value))
+
+	async def connectMany(self, pairs:typing.Iterable[typing.Union[AdderPreset.Pair, typing.Tuple[AdderChannel, AdderReceiver]]], mode:typing.Optional[AdderChannel.ConnectionMode]=AdderChannel.ConnectionMode.SHARED, *, max_concurrency:int=8) -> BulkResult:
+		"""
+		Connect many channel/receiver pairs at once, with up to `max_concurrency` requests in flight
+		Every pair is attempted, whatever happens to the others.  Check the result for which succeeded.
+		"""
+
+		if int(max_concurrency) < 1:
+			raise ValueError("At least one connection must be allowed at a time")
+		pairs = as_pairs(pairs)
+		slots = asyncio.Semaphore(int(max_concurrency))
+
+		async def connect(pair:AdderPreset.Pair) -> PairResult:
+			async with slots:
+				started = time.perf_counter()
+				try:
+					await self.connectToChannel(pair.channel, pair.receiver, mode)
+				except Exception as e:
+					return PairResult(pair, e, time.perf_counter() - started)
+				return PairResult(pair, None, time.perf_counter() - started)
+
+		started = time.perf_counter()
+		results = await asyncio.gather(*(connect(pair) for pair in pairs))
+		return BulkResult(tuple(results), time.perf_counter() - started)
+
+	async def disconnectFromChannel(self, receiver:typing.Union[AdderReceiver, typing.Iterable[AdderReceiver]], force:typing.Optional[bool]=False):
+		"""Disconnect a receiver -- or iterable of receivers -- from its current channel"""
+
+		receiver = [receiver] if isinstance(receiver, AdderReceiver) else receiver
+		self._checkSuccess(await self._call("disconnect_channel", rx_id=','.join(x.id for x in receiver), force=int(force)))
+
+	async def deleteChannel(self, channel:AdderChannel):
+		"""Delete a channel.  Admin privileges are required."""
+		self._checkSuccess(await self._call("delete_channel", id=channel.id))
+
+	# Preset management
+	async def getPresets(self, id:typing.Optional[str]=None, *, filter:typing.Optional[PresetFilter]=None) -> typing.AsyncGenerator[AdderPreset, None]:
+		"""Request a list of available Adderlink presets, optionally matching a PresetFilter"""
+
+		filter = filter or PresetFilter()
+		if id is not None:
+			filter = filter.with_id(id)
+
+		response = await self._call("get_presets", **filter.query_args())
+		for preset in self._listItems(response, "connection_presets", "connection_preset"):
+			ps = AdderPreset(preset)
+			if not filter.matches(ps):
+				continue
+			yield ps
+
+	async def createPreset(self, name:str, pairs:typing.Union[typing.Iterable[AdderPreset.Pair], AdderPreset.Pair], modes:typing.Union[typing.Iterable[AdderChannel.ConnectionMode], AdderChannel.ConnectionMode]) -> AdderPreset:
+		"""Create a preset consisting of one or more channel/receiver pairs"""
+
+		if not len(name.strip()):
+			raise ValueError("'name' parameter must not be empty")
+
+		if isinstance(pairs, AdderPreset.Pair):
+			pairs = [pairs]
+		if isinstance(modes, AdderChannel.ConnectionMode):
+			modes = [modes]
+
+		response = await self._call("create_preset",
+			name=urllib.parse.quote(name),
+			pairs=','.join(f"{pair.channel.id}-{pair.receiver.id}" for pair in pairs),
+			allowed=str().join(mode.value for mode in modes)
+		)
+		self._checkSuccess(response)
+
+		if not response.get("id"):
+			raise Exception("Unknown error")
+
+		async for preset in self.getPresets(response.get("id")):
+			return preset
+		raise AdderRequestError(f"Created preset {response.get('id')} could not be found")
+
+	async def loadPreset(self, preset:AdderPreset, mode:AdderChannel.ConnectionMode, force:typing.Optional[bool]=False):
+		"""Connect a preset"""
+		self._checkSuccess(await self._call("connect_preset", id=preset.id, mode=mode.value, force=int(force)))
+
+	async def unloadPreset(self, preset:AdderPreset, force:typing.Optional[bool]=False):
+		"""Disconnect a preset"""
+		self._checkSuccess(await self._call("disconnect_preset", id=preset.id, force=int(force)))
+
+	async def deletePreset(self, preset:AdderPreset):
+		"""Delete a preset"""
+		self._checkSuccess(await self._call("delete_preset", id=preset.id))
+
+	# C-USB Lan Extender Management
+	async def getUSBReceivers(self, mac_address:typing.Optional[str]=None) -> typing.AsyncGenerator[AdderUSBReceiver, None]:
+		"""Get a list of C-USB LAN Receivers, optionally filtered by MAC address"""
+
+		response = await self._call("get_all_c_usb")
+		for usb in self._listItems(response, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") != "rx": continue
+			rx = AdderUSBReceiver(usb)
+			if mac_address is not None and mac_address != rx.mac_address:
+				continue
+			yield rx
+
+	async def getUSBExtenders(self) -> AdderUSBTopology:
+		"""Get all C-USB LAN Transmitters and Receivers with a single request, indexed by MAC address"""
+
+		response = await self._call("get_all_c_usb")
+		extenders = []
+		for usb in self._listItems(response, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") == "rx":
+				extenders.append(AdderUSBReceiver(usb))
+			elif usb.get("type","") == "tx":
+				extenders.append(AdderUSBTransmitter(usb))
+		return AdderUSBTopology(extenders)
+
+	async def getUSBTransmitters(self, mac_address:typing.Optional[str]=None) -> typing.AsyncGenerator[AdderUSBTransmitter, None]:
+		"""Get a list of C-USB LAN Transmitters, optionally filtered by MAC address"""
+
+		response = await self._call("get_all_c_usb")
+		for usb in self._listItems(response, "c_usb_lan_extenders", "c_usb"):
+			if usb.get("type","") != "tx": continue
+			tx = AdderUSBTransmitter(usb)
+			if mac_address is not None and mac_address != tx.mac_address:
+				continue
+			yield tx
+
+	async def deleteUSBExtender(self, usb:AdderUSBExtender):
+		"""Delete a C-USB LAN Transmitter or Receiver"""
+		self._checkSuccess(await self._call("delete_c_usb", mac=usb.mac_address))
+
+	async def setUSBExtenderInfo(self, usb:AdderUSBExtender, *, name:str):
+		"""Update the information for an existing USB extender"""
+		self._checkSuccess(await self._call("update_c_usb", mac=usb.mac_address, name=name))
+
+	async def connectUSBExtender(self, receiver:AdderUSBReceiver, transmitter:AdderUSBTransmitter):
+		"""Connect a C-USB LAN Receiver to a Transmitter"""
+		self._checkSuccess(await self._call("connect_c_usb", rx=receiver.mac_address, tx=transmitter.mac_address))
+
+	async def disconnectUSBExtender(self, receiver:AdderUSBReceiver):
+		"""Disconnect a C-USB LAN Receiver from its Transmitter"""
+		self._checkSuccess(await self._call("disconnect_c_usb", mac=receiver.mac_address))
+
+	@property
+	def inventory(self) -> typing.Optional[AdderInventory]:
+		"""The most recent inventory snapshot, if one has been taken since logging in"""
+		return self._inventory
+
+	@property
+	def user(self) -> AdderUser:
+		"""Get the current user"""
+		return self._user
+
+	@property
+	def server_address(self) -> urllib.parse.ParseResult:
+		"""Get the server address"""
+		return self._server_address
+
+	@property
+	def url_handler(self) -> AsyncUrlHandler:
+		"""Get the URL Handler"""
+		return self._url_handler
@@ -0,0 +1,62 @@
+import dataclasses, typing
+from .channels import AdderChannel
+from .devices import AdderReceiver
+from .presets import AdderPreset
+
+
+@dataclasses.dataclass(frozen=True)
+class PairResult:
+	"""The outcome of one operation in a bulk request"""
+
+	pair:AdderPreset.Pair
+	error:typing.Optional[Exception]	# None if it succeeded
+	latency:float						# Seconds the request took
+
+	@property
+	def succeeded(self) -> bool:
+		"""Whether the operation succeeded"""
+		return self.error is None
+
+
+@dataclasses.dataclass(frozen=True)
+class BulkResult:
+	"""The outcomes of a bulk request, in the order the pairs were given"""
+
+	results:typing.Tuple[PairResult, ...]
+	wall_time:float		# Seconds from the first request starting to the last one finishing
+
+	@property
+	def succeeded(self) -> typing.Tuple[PairResult, ...]:
+		"""The operations which succeeded"""
+		return tuple(result for result in self.results if result.succeeded)
+
+	@property
+	def failed(self) -> typing.Tuple[PairResult, ...]:
+		"""The operations which failed"""
+		return tuple(result for result in self.results if not result.succeeded)
+
+	@property
+	def ok(self) -> bool:
+		"""Whether every operation succeeded"""
+		return all(result.succeeded for result in self.results)
+
+	def __iter__(self) -> typing.Iterator[PairResult]:
+		return iter(self.results)
+
+	def __len__(self) -> int:
+		return len(self.results)
+
+
+def as_pairs(pairs:typing.Iterable[typing.Union[AdderPreset.Pair, typing.Tuple[AdderChannel, AdderReceiver]]]) -> typing.List[AdderPreset.Pair]:
+	"""Normalise channel/receiver pairs, refusing any receiver listed twice"""
+
+	normalised = [pair if isinstance(pair, AdderPreset.Pair) else AdderPreset.Pair(*pair) for pair in pairs]
+
+	# Two connections to one receiver at the same time would race, with no telling which wins
+	seen = set()
+	for pair in normalised:
+		if pair.receiver.id in seen:
+			raise ValueError(f"Receiver {pair.receiver.name or pair.receiver.id} is listed more than once")
+		seen.add(pair.receiver.id)
+
+	return normalised
@@ -0,0 +1,167 @@
+import collections, dataclasses, threading, time, typing, urllib.parse
+from .urlhandlers import UrlHandler
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+	"""Usage counters for a response cache"""
+	hits:int
+	misses:int
+	evictions:int
+	invalidations:int
+	entries:int
+
+	@property
+	def hit_ratio(self) -> float:
+		"""Fraction of cacheable calls answered from the cache"""
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
+
+
+class CachingHandler(UrlHandler):
+	"""
+	URL handler which caches the results of read calls made through another URL handler
+	Results are kept per method and arguments for a time-to-live, with the least recently used evicted first.
+	Calls which change data on the AIM are passed straight through, and drop the cached results they affect.
+	"""
+
+	# Read methods whose results each mutating method may change
+	INVALIDATES = {
+		"connect_channel":    ("get_devices", "get_channels", "get_presets"),
+		"disconnect_channel": ("get_devices", "get_channels", "get_presets"),
+		"connect_preset":     ("get_devices", "get_channels", "get_presets"),
+		"disconnect_preset":  ("get_devices", "get_channels", "get_presets"),
+		"create_channel":     ("get_devices", "get_channels"),
+		"delete_channel":     ("get_devices", "get_channels", "get_presets"),
+		"create_preset":      ("get_devices", "get_presets"),
+		"delete_preset":      ("get_devices", "get_presets"),
+		"update_device":      ("get_devices",),
+		"reboot_devices":     ("get_devices",),
+		"replace_device":     ("get_devices", "get_channels", "get_presets"),
+		"identify_device":    (),
+		"update_c_usb":       ("get_all_c_usb",),
+		"delete_c_usb":       ("get_all_c_usb",),
+		"connect_c_usb":      ("get_all_c_usb",),
+		"disconnect_c_usb":   ("get_all_c_usb",),
+		"login":              (),
+		"logout":             (),
+	}
+
+	def __init__(self, handler:UrlHandler, *, ttls:typing.Optional[typing.Dict[str,float]]=None, default_ttl:float=5.0, max_entries:int=256):
+		"""
+		Wrap a URL handler with a response cache
+		handler:UrlHandler -- The URL handler which makes the actual calls
+		ttls:dict -- Seconds to keep results for, per method (e.g. {"get_servers": 60}).  A TTL of 0 disables caching for that method.
+		default_ttl:float -- Seconds to keep results of read methods not listed in `ttls`
+		max_entries:int -- Maximum number of results to keep
+		"""
+
+		if not isinstance(handler, UrlHandler):
+			raise ValueError(f"URL handler {type(handler)} is not an instance of UrlHandler")
+		if int(max_entries) < 1:
+			raise ValueError("`max_entries` must be at least 1")
+
+		self._handler = handler
+		self._ttls = dict(ttls or {})
+		self._default_ttl = float(default_ttl)
+		self._max_entries = int(max_entries)
+
+		self._lock = threading.Lock()
+		self._entries = collections.OrderedDict()	# key -> (expiry time, response)
+		self._generations = collections.Counter()	# method -> number of times invalidated
+		self._clears = 0							# number of times everything was invalidated
+
+		self._hits = 0
+		self._misses = 0
+		self._evictions = 0
+		self._invalidations = 0
+
+	def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Return a cached result for a read call if one is fresh; otherwise make the call"""
+
+		method = args.get("method","")
+
+		if not self.is_read_call(args):
+			try:
+				return self._handler.api_call(server_address, args)
+			finally:
+				# Even a failed call may have changed something.  Unknown methods could have changed anything.
+				affected = self.INVALIDATES.get(method)
+				if affected is None:
+					self.invalidate()
+				elif affected:
+					self.invalidate(*affected)
+
+		ttl = self.ttl(method)
+		if ttl <= 0:
+			return self._handler.api_call(server_address, args)
+
+		key = self._call_key(server_address, args)
+
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None and entry[0] > time.monotonic():
+				self._entries.move_to_end(key)
+				self._hits += 1
+				return entry[1]
+
+			self._misses += 1
+			generation = (self._generations[method], self._clears)
+
+		response = self._handler.api_call(server_address, args)
+
+		# Keep unsuccessful results, and results invalidated while in flight, out of the cache
+		if response.get("success") != "1":
+			return response
+
+		with self._lock:
+			if (self._generations[method], self._clears) != generation:
+				return response
+
+			self._entries[key] = (time.monotonic() + ttl, response)
+			self._entries.move_to_end(key)
+
+			while len(self._entries) > self._max_entries:
+				self._entries.popitem(last=False)
+				self._evictions += 1
+
+		return response
+
+	def invalidate(self, *methods:str):
+		"""Drop cached results for the given read methods, or for all methods if none are given"""
+
+		with self._lock:
+			if methods:
+				self._generations.update(set(methods))
+				dropped = [key for key in self._entries if key[0] in methods]
+			else:
+				self._clears += 1
+				dropped = list(self._entries)
+
+			for key in dropped:
+				del self._entries[key]
+			self._invalidations += len(dropped)
+
+	def clear(self):
+		"""Drop all cached results"""
+		self.invalidate()
+
+	def ttl(self, method:str) -> float:
+		"""Seconds to keep the results of a method"""
+		return float(self._ttls.get(method, self._default_ttl))
+
+	def set_ttl(self, method:str, ttl:float):
+		"""Set the seconds to keep the results of a method"""
+		self._ttls[method] = float(ttl)
+		if ttl <= 0:
+			self.invalidate(method)
+
+	@property
+	def stats(self) -> CacheStats:
+		"""Cache usage counters"""
+		with self._lock:
+			return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions, invalidations=self._invalidations, entries=len(self._entries))
+
+	@property
+	def handler(self) -> UrlHandler:
+		"""The wrapped URL handler"""
+		return self._handler
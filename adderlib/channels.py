@@ -1,7 +1,8 @@
-import enum
+import enum, typing
+from .records import CompactRecord, decode_enum
 
 
-class AdderChannel:
+class AdderChannel(CompactRecord):
 	"""Adderlink channel"""
 
 	@enum.unique
@@ -19,92 +20,113 @@ class AdderChannel:
 		ENABLED  = "enabled"  # Enabled
 		HIDDEN   = "hidden"   # Never allowed
 
-	def __init__(self, properties:dict):
-		self._extended = {key: val for key,val in properties.items()}
+	__slots__ = (
+		"_id", "_name", "_description", "_location", "_type", "_tx_id", "_online", "_favourite",
+		"_view_button", "_shared_button", "_control_button", "_exclusive_button", "_device_ids"
+	)
+
+	# Undocumented fields holding the IDs of the transmitters used for each role
+	DEVICE_ROLES = {
+		"video1": "c_video1",
+		"video2": "c_video2",
+		"audio":  "c_audio",
+		"usb":    "c_usb",
+		"serial": "c_serial",
+	}
+
+	INTERNED = frozenset({
+		"c_name", "c_description", "c_location", "c_channel_type", "channel_online", "c_favourite",
+		"view_button", "shared_button", "control_button", "exclusive_button",
+	})
+
+	def _decode(self, record:dict):
+		self._id = record.get("c_id","")
+		self._name = record.get("c_name","")
+		self._description = record.get("c_description","")
+		self._location = record.get("c_location","")
+		self._type = record.get("c_channel_type","")
+		self._tx_id = record.get("c_tx_id","")
+		self._online = record.get("channel_online") == "1"
+		self._favourite = record.get("c_favourite","")
+		self._view_button = decode_enum(self.ButtonState, record.get("view_button"), self.ButtonState.UNKNOWN)
+		self._shared_button = decode_enum(self.ButtonState, record.get("shared_button"), self.ButtonState.UNKNOWN)
+		self._control_button = decode_enum(self.ButtonState, record.get("control_button"), self.ButtonState.UNKNOWN)
+		self._exclusive_button = decode_enum(self.ButtonState, record.get("exclusive_button"), self.ButtonState.UNKNOWN)
+		self._device_ids = {role: record.get(key) for role, key in self.DEVICE_ROLES.items() if record.get(key)}
 	
 	@property
 	def id(self) -> str:
 		"""Channel ID"""
-		return self._extended.get("c_id","")
+		return self._id
 	
 	@property
 	def name(self) -> str:
 		"""Channel name"""
-		return self._extended.get("c_name","")
+		return self._name
 	
 	@property
 	def description(self) -> str:
 		"""Channel description"""
-		return self._extended.get("c_description","")
+		return self._description
 	
 	@property
 	def location(self) -> str:
 		"""Channel location"""
-		return self._extended.get("c_location","")
+		return self._location
 	
 	@property
 	def type(self) -> str:
 		"""Channel type"""
 		# TODO: Investigate.  Not in the documentation
-		return self._extended.get("c_channel_type","")
+		return self._type
 
 	@property
 	def tx_id(self) -> str:
 		"""Device ID"""
 		# TODO: Investigate.  Not in the documentation
-		return self._extended.get("c_tx_id","")
+		return self._tx_id
+	
+	@property
+	def device_ids(self) -> typing.Dict[str, str]:
+		"""IDs of the transmitters used for video1, video2, audio, usb and serial, where set"""
+		# TODO: Investigate.  Not in the documentation
+		return dict(self._device_ids)
 	
 	@property
 	def is_online(self) -> bool:
 		"""Device status"""
 		# TODO: Investigate.  Not in the documentation
-		return self._extended.get("channel_online") == "1"
+		return self._online
 	
 	@property
 	def is_favorite(self) -> bool:
 		"""Whether the channel has been favorited"""
-		return self._extended.get("c_favourite") != "false"
+		return self._favourite != "false"
 	
 	@property
 	def shortcut(self) -> str:
 		"""Returns the shortcut index if set"""
-		return self._extended.get("c_favourite","") if self.is_favorite else ''
+		return self._favourite if self.is_favorite else ''
 	
 	@property
 	def view_button(self) -> ButtonState:
 		"""Indicates the state of the video-only view button"""
-		state = self._extended.get("view_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._view_button
 	
 	@property
 	def shared_button(self) -> ButtonState:
 		"""Indicates the state of the shared view button"""
-		state = self._extended.get("shared_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._shared_button
 
 	@property
 	def control_button(self) -> ButtonState:
 		"""Indicates the state of the full-control button"""
-		state = self._extended.get("control_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._control_button
 
 	@property
 	def exclusive_button(self) -> ButtonState:
 		"""Indicates the state of the video-only view button"""
-		state = self._extended.get("exclusive_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._exclusive_button
 	
 	@property
 	def view_available(self) -> bool:
@@ -129,8 +151,9 @@ class AdderChannel:
 	
 	def _print_undocumented(self):
 		"""Undocumented features"""
+		extended = self._extended
 		for property in ["c_video1","c_video1_head","c_video2","c_video2_head","c_audio","c_usb","c_serial","c_usb1", "c_audio1","c_audio2","c_sensitive","c_rdp_id"]:
-			print(f"{property.ljust(16)}: {self._extended.get(property,'Not Set')}")
+			print(f"{property.ljust(16)}: {extended.get(property,'Not Set')}")
 		
 
 
@@ -0,0 +1,267 @@
+import concurrent.futures, dataclasses, socket, threading, time, typing, urllib.parse
+from .adder import AdderAPI
+from .devices import AdderServer
+from .urlhandlers import UrlHandler
+from .inventory import AdderInventory
+
+
+def tcp_probe(address:urllib.parse.ParseResult, timeout:float) -> bool:
+	"""Whether a server accepts connections on its HTTP(S) port within `timeout` seconds"""
+
+	port = address.port or (443 if address.scheme == "https" else 80)
+	try:
+		with socket.create_connection((address.hostname, port), timeout=timeout):
+			return True
+	except (OSError, ValueError):
+		return False
+
+
+@dataclasses.dataclass(frozen=True)
+class ClusterMember:
+	"""An AIM server in a cluster, as last seen by a ClusterAdderAPI"""
+
+	address:urllib.parse.ParseResult
+	role:AdderServer.Role = AdderServer.Role.UNKNOWN			# As reported by getServers()
+	status:AdderServer.Status = AdderServer.Status.UNKNOWN		# As reported by getServers()
+	healthy:bool = True
+	failures:int = 0						# Health checks failed in a row
+	last_checked:typing.Optional[float] = None	# time.monotonic() of the last health check
+
+	@property
+	def reported_active(self) -> bool:
+		"""Whether the cluster last reported this server as the active one"""
+		return self.status is AdderServer.Status.ACTIVE
+
+
+class ClusterAdderAPI(AdderAPI):
+	"""
+	An AdderAPI for a primary and backup AIM pair, which follows the active server when the other fails
+	The servers are found with getServers() on logging in, and every `probe_interval` seconds each is checked for a connection.
+	After `failures` checks in a row go unanswered, or a request can't reach it, the active server is given up on and requests go to
+	a healthy one, preferring whichever the cluster reported active.  The session is renewed there when it is first turned down.
+	Read calls which couldn't reach a server are retried on the new one; changes are not, as they may have been made.
+	"""
+
+	def __init__(self, server_address:str, *, backup_address:typing.Optional[str]=None, probe:typing.Optional[typing.Callable[[urllib.parse.ParseResult, float], bool]]=None, probe_interval:float=0.2, probe_timeout:float=0.3, failures:int=2, discover_interval:float=10.0, **kwargs):
+		"""
+		backup_address:str -- Another server in the cluster, in case the first can't be reached to ask for the rest
+		probe:callable -- Health check, given a server address and timeout, returning whether it is up.  By default, see `tcp_probe()`.
+		probe_interval:float -- Seconds between health checks
+		probe_timeout:float -- Seconds a health check waits for an answer
+		failures:int -- Health checks to fail in a row before a server is given up on
+		discover_interval:float -- Seconds between asking the active server for the roles and statuses of the cluster
+		Other arguments are as for AdderAPI.
+		"""
+
+		if probe_interval <= 0 or probe_timeout <= 0 or discover_interval <= 0:
+			raise ValueError("Intervals and timeouts must be positive")
+		if int(failures) < 1:
+			raise ValueError("At least one failed health check is needed to give up on a server")
+
+		super().__init__(server_address, **kwargs)
+
+		self._probe = probe or tcp_probe
+		self._probe_interval = float(probe_interval)
+		self._probe_timeout = float(probe_timeout)
+		self._max_failures = int(failures)
+		self._discover_interval = float(discover_interval)
+
+		self._members = {}		# netloc -> ClusterMember, in the order found
+		self._route_lock = threading.Lock()
+		self._failovers = 0
+		self._monitor = None
+		self._stopping = threading.Event()
+
+		self._addMember(self._server_address)
+		if backup_address is not None:
+			self._addMember(self._parseAddress(backup_address))
+
+	def _parseAddress(self, address:str) -> urllib.parse.ParseResult:
+		if "//" not in address:
+			address = "//" + address
+		return urllib.parse.urlparse(address, scheme=self._server_address.scheme)
+
+	def _addMember(self, address:urllib.parse.ParseResult, **reported):
+		"""Add a server to the cluster, or update what was reported of it"""
+		member = self._members.get(address.netloc)
+		self._members[address.netloc] = dataclasses.replace(member, **reported) if member is not None else ClusterMember(address, **reported)
+
+	# Routing
+	def discover(self):
+		"""Ask the active server for the servers in the cluster, with their roles and statuses"""
+
+		servers = list(self.getServers())
+		port = f":{self._server_address.port}" if self._server_address.port else ""
+
+		with self._route_lock:
+			for server in servers:
+				# A server already known by any of its names or addresses is updated in place
+				names = {server.name} | {str(ip) for ip in server.ip_addresses if ip is not None}
+				known = next((member for member in self._members.values() if member.address.hostname in names), None)
+				if known is not None:
+					self._addMember(known.address, role=server.role, status=server.status)
+				elif server.ip_address is not None:
+					host = f"[{server.ip_address}]" if server.ip_address.version == 6 else str(server.ip_address)
+					self._addMember(self._server_address._replace(netloc=host + port), role=server.role, status=server.status)
+
+		# The active server may have changed hands without either going down
+		current = self._members.get(self._server_address.netloc)
+		if current is not None and not current.reported_active and any(member.reported_active and member.healthy for member in self._members.values()):
+			self._failover(self._server_address)
+
+	def _choose(self) -> typing.Optional[ClusterMember]:
+		"""The server requests should go to: the current one while it is healthy and not reported standby, else the best of the rest"""
+
+		current = self._members.get(self._server_address.netloc)
+		healthy = [member for member in self._members.values() if member.healthy]
+		if not healthy:
+			return None
+		if current in healthy and (current.reported_active or not any(member.reported_active for member in healthy)):
+			return current
+
+		# Reported active first, then those configured to be, then the current server
+		rank = {AdderServer.Role.PRIMARY: 0, AdderServer.Role.SOLO: 0, AdderServer.Role.BACKUP: 1}
+		return min(healthy, key=lambda member: (not member.reported_active, rank.get(member.role, 2), member is not current))
+
+	def _failover(self, failed:urllib.parse.ParseResult) -> bool:
+		"""Move requests off a server, if they're still going to it.  Returns whether they are now going elsewhere."""
+
+		with self._route_lock:
+			if self._server_address.netloc != failed.netloc:
+				return True
+			chosen = self._choose()
+			if chosen is None or chosen.address.netloc == failed.netloc:
+				return False
+
+			self._server_address = chosen.address
+			self._failovers += 1
+			return True
+
+	def _markFailed(self, address:urllib.parse.ParseResult) -> bool:
+		"""Give up on a server which couldn't be reached, and fail over if it was the active one"""
+
+		with self._route_lock:
+			member = self._members.get(address.netloc)
+			if member is not None:
+				self._members[address.netloc] = dataclasses.replace(member, healthy=False, failures=max(member.failures, self._max_failures))
+		return self._failover(address)
+
+	# Health checks
+	def check(self):
+		"""Check the health of every server once, failing over if the active one is down"""
+
+		members = list(self._members.values())
+		with concurrent.futures.ThreadPoolExecutor(max_workers=len(members), thread_name_prefix="adderlib-probe") as executor:
+			results = list(executor.map(lambda member: bool(self._probe(member.address, self._probe_timeout)), members))
+
+		checked = time.monotonic()
+		with self._route_lock:
+			for member, up in zip(members, results):
+				member = self._members[member.address.netloc]
+				failures = 0 if up else member.failures + 1
+				self._members[member.address.netloc] = dataclasses.replace(member, healthy=failures < self._max_failures, failures=failures, last_checked=checked)
+			current = self._members.get(self._server_address.netloc)
+
+		if current is not None and not current.healthy:
+			self._failover(current.address)
+
+	def _run(self):
+		last_discovered = time.monotonic()
+		while not self._stopping.wait(self._probe_interval):
+			self.check()
+			if time.monotonic() - last_discovered >= self._discover_interval:
+				last_discovered = time.monotonic()
+				try:
+					self.discover()
+				except Exception:
+					# The health checks will catch a server that's down; try again next time round
+					pass
+
+	def start(self):
+		"""Start checking the health of the servers in the background"""
+
+		if self._monitor is not None and self._monitor.is_alive():
+			return
+		self._stopping.clear()
+		self._monitor = threading.Thread(target=self._run, name="adderlib-cluster", daemon=True)
+		self._monitor.start()
+
+	def stop(self):
+		"""Stop checking the health of the servers"""
+
+		self._stopping.set()
+		if self._monitor is not None and self._monitor is not threading.current_thread():
+			self._monitor.join()
+		self._monitor = None
+
+	# Requests
+	def _request(self, args:dict) -> dict:
+		"""Make an API call on the active server, retrying read calls elsewhere if it can't be reached"""
+
+		address = self._server_address
+		try:
+			return super()._request(args)
+		except OSError:
+			if not self._markFailed(address) or not UrlHandler.is_read_call(args):
+				raise
+		return super()._request(args)
+
+	def _stream(self, args:dict, container:str, item:str) -> typing.Iterator[dict]:
+		"""Stream the items of an API list from the active server, starting again elsewhere if it can't be reached"""
+
+		address = self._server_address
+		started = False
+		try:
+			for listed in super()._stream(args, container, item):
+				started = True
+				yield listed
+			return
+		except OSError:
+			# Items already yielded can't be taken back
+			if started or not self._markFailed(address):
+				raise
+		yield from super()._stream(args, container, item)
+
+	# User authentication
+	def login(self, username:str, password:str, *, prefetch:bool=False, **kwargs) -> typing.Optional[AdderInventory]:
+		"""Log in to the active server, find the rest of the cluster, and start checking their health"""
+
+		# Whichever server was given may not be the one that's up
+		while True:
+			address = self._server_address
+			try:
+				super().login(username, password, **kwargs)
+				break
+			except OSError:
+				if not self._markFailed(address):
+					raise
+
+		# To log in again wherever requests fail over to
+		self._credentials = (username, password)
+		try:
+			self.discover()
+		except Exception:
+			pass
+		self.start()
+
+		return self.snapshot() if prefetch else None
+
+	def logout(self):
+		"""Stop checking the servers' health, and log out"""
+		self.stop()
+		super().logout()
+
+	@property
+	def active(self) -> ClusterMember:
+		"""The server requests are going to"""
+		return self._members[self._server_address.netloc]
+
+	@property
+	def members(self) -> typing.Tuple[ClusterMember, ...]:
+		"""The servers in the cluster"""
+		return tuple(self._members.values())
+
+	@property
+	def failovers(self) -> int:
+		"""Number of times requests have moved to another server"""
+		return self._failovers
@@ -0,0 +1,141 @@
+import asyncio, threading, urllib.parse
+from .urlhandlers import UrlHandler, AsyncUrlHandler
+
+class _Flight:
+	"""A call in progress, whose result is shared by every caller waiting on it"""
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.response = None
+		self.error = None
+
+
+class CoalescingHandler(UrlHandler):
+	"""
+	URL handler which merges identical concurrent read calls into a single call to another URL handler
+	While a read call is outstanding, threads making the same call (same method and arguments) wait for it
+	and share its result -- or its exception -- instead of calling the server again.
+	Calls which change data on the AIM are never merged.
+	"""
+
+	def __init__(self, handler:UrlHandler):
+		"""Wrap a URL handler, merging identical concurrent read calls made through it"""
+
+		if not isinstance(handler, UrlHandler):
+			raise ValueError(f"URL handler {type(handler)} is not an instance of UrlHandler")
+
+		self._handler = handler
+		self._lock = threading.Lock()
+		self._flights = {}	# call key -> _Flight
+
+		self._calls = 0
+		self._coalesced = 0
+
+	def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Make a call, or join an identical read call already in progress"""
+
+		if not self.is_read_call(args):
+			return self._handler.api_call(server_address, args)
+
+		key = self._call_key(server_address, args)
+
+		with self._lock:
+			flight = self._flights.get(key)
+			is_leader = flight is None
+			if is_leader:
+				flight = self._flights[key] = _Flight()
+				self._calls += 1
+			else:
+				self._coalesced += 1
+
+		if not is_leader:
+			flight.done.wait()
+			if flight.error is not None:
+				raise flight.error
+			return flight.response
+
+		try:
+			flight.response = self._handler.api_call(server_address, args)
+			return flight.response
+		except Exception as e:
+			flight.error = e
+			raise
+		finally:
+			# Later callers start a new call rather than joining this finished one
+			with self._lock:
+				del self._flights[key]
+			flight.done.set()
+
+	@property
+	def calls_made(self) -> int:
+		"""Number of read calls passed on to the wrapped handler"""
+		return self._calls
+
+	@property
+	def calls_coalesced(self) -> int:
+		"""Number of read calls answered by joining a call already in progress"""
+		return self._coalesced
+
+	@property
+	def handler(self) -> UrlHandler:
+		"""The wrapped URL handler"""
+		return self._handler
+
+
+class AsyncCoalescingHandler(AsyncUrlHandler):
+	"""
+	Asynchronous URL handler which merges identical concurrent read calls into a single call to another asynchronous URL handler
+	Tasks making the same read call while one is outstanding await its result instead of calling the server again.
+	The in-flight limit of the wrapped handler applies; this handler adds none of its own.
+	"""
+
+	def __init__(self, handler:AsyncUrlHandler):
+		"""Wrap an asynchronous URL handler, merging identical concurrent read calls made through it"""
+
+		if not isinstance(handler, AsyncUrlHandler):
+			raise ValueError(f"URL handler {type(handler)} is not an instance of AsyncUrlHandler")
+
+		super().__init__(max_in_flight=handler.max_in_flight)
+		self._handler = handler
+		self._flights = {}	# call key -> asyncio.Future
+
+		self._calls = 0
+		self._coalesced = 0
+
+	async def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Make a call, or join an identical read call already in progress"""
+
+		if not UrlHandler.is_read_call(args):
+			return await self._handler.api_call(server_address, args)
+
+		key = UrlHandler._call_key(server_address, args)
+
+		flight = self._flights.get(key)
+		if flight is not None:
+			self._coalesced += 1
+			# Shield the shared call, so one waiter being cancelled does not cancel it for the others
+			return await asyncio.shield(flight)
+
+		flight = self._flights[key] = asyncio.get_running_loop().create_task(self._handler.api_call(server_address, args))
+		flight.add_done_callback(lambda _: self._flights.pop(key, None))
+		self._calls += 1
+
+		return await asyncio.shield(flight)
+
+	async def _api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		return await self._handler.api_call(server_address, args)
+
+	@property
+	def calls_made(self) -> int:
+		"""Number of read calls passed on to the wrapped handler"""
+		return self._calls
+
+	@property
+	def calls_coalesced(self) -> int:
+		"""Number of read calls answered by joining a call already in progress"""
+		return self._coalesced
+
+	@property
+	def handler(self) -> AsyncUrlHandler:
+		"""The wrapped URL handler"""
+		return self._handler
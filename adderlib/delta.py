@@ -0,0 +1,123 @@
+import dataclasses, enum, typing
+from .records import CompactRecord
+
+
+@dataclasses.dataclass(frozen=True)
+class AdderChange:
+	"""A change to one record between two successive snapshots"""
+
+	@enum.unique
+	class ChangeType(enum.Enum):
+		ADDED               = "added"
+		REMOVED             = "removed"
+		STATUS_CHANGED      = "status_changed"
+		CONNECTION_STARTED  = "connection_started"
+		CONNECTION_ENDED    = "connection_ended"
+		DESCRIPTION_CHANGED = "description_changed"
+		LOCATION_CHANGED    = "location_changed"
+		OTHER_CHANGED       = "other_changed"	# Something else changed, such as the firmware or the name
+
+	type:ChangeType
+	id:str
+	before:typing.Optional[CompactRecord]	# None if the record was added
+	after:typing.Optional[CompactRecord]	# None if the record was removed
+	old_value:typing.Any = None
+	new_value:typing.Any = None
+
+	@property
+	def record(self) -> CompactRecord:
+		"""The record as it is now, or as it was last seen if it was removed"""
+		return self.after if self.after is not None else self.before
+
+
+def _connection(record) -> typing.Tuple[bool, typing.Any]:
+	"""Whether a record is connected, and since when.  Records with no connection (transmitters, channels) are never connected."""
+	return bool(getattr(record, "is_connected", False)), getattr(record, "connection_start", None)
+
+def compare(before:CompactRecord, after:CompactRecord) -> typing.List[AdderChange]:
+	"""The changes between two versions of a record with the same ID"""
+
+	if before.fingerprint == after.fingerprint:
+		return []
+
+	changes = []
+	Change = AdderChange.ChangeType
+
+	for change_type, field in ((Change.STATUS_CHANGED, "status"), (Change.DESCRIPTION_CHANGED, "description"), (Change.LOCATION_CHANGED, "location")):
+		old, new = getattr(before, field, None), getattr(after, field, None)
+		if old != new:
+			changes.append(AdderChange(change_type, after.id, before, after, old, new))
+
+	(was_connected, old_start), (is_connected, new_start) = _connection(before), _connection(after)
+	# A receiver switched straight to another channel has ended one connection and started another
+	switched = was_connected and is_connected and old_start != new_start
+	if was_connected and (not is_connected or switched):
+		changes.append(AdderChange(Change.CONNECTION_ENDED, after.id, before, after, getattr(before, "channel_name", None), None))
+	if is_connected and (not was_connected or switched):
+		changes.append(AdderChange(Change.CONNECTION_STARTED, after.id, before, after, None, getattr(after, "channel_name", None)))
+
+	if not changes:
+		changes.append(AdderChange(Change.OTHER_CHANGED, after.id, before, after))
+	return changes
+
+
+class DeltaTracker:
+	"""
+	Works out what has changed between successive polls of the same list, such as AdderAPI.getReceivers()
+	Each record's fingerprint is kept from one poll to the next, so records which haven't changed are passed over after a single
+	comparison, and only the ones which have are looked at field by field.
+	"""
+
+	def __init__(self, records:typing.Optional[typing.Iterable[CompactRecord]]=None):
+		"""Start tracking, optionally from an initial list of records, which will not be reported as added"""
+
+		# Kept apart rather than as (fingerprint, record) pairs, as a tuple per record keeps the garbage collector busy
+		self._fingerprints = {}	# id -> fingerprint
+		self._records = {}		# id -> record
+		if records is not None:
+			self.update(records)
+
+	def update(self, records:typing.Iterable[CompactRecord]) -> typing.List[AdderChange]:
+		"""Take the next poll of records, and return the changes since the last one"""
+
+		changes = []
+		previous, previous_fingerprints = self._records, self._fingerprints
+		current, fingerprints = {}, {}
+
+		for record in records:
+			id, fingerprint = record.id, record.fingerprint
+			current[id] = record
+			fingerprints[id] = fingerprint
+
+			seen = previous_fingerprints.get(id)
+			if seen is None:
+				changes.append(AdderChange(AdderChange.ChangeType.ADDED, id, None, record))
+			elif seen != fingerprint:
+				changes.extend(compare(previous[id], record))
+
+		if len(current) != len(previous) or changes:
+			for id, record in previous.items():
+				if id not in current:
+					changes.append(AdderChange(AdderChange.ChangeType.REMOVED, id, record, None))
+
+		self._records, self._fingerprints = current, fingerprints
+		return changes
+
+	def get(self, id:str) -> typing.Optional[CompactRecord]:
+		"""The record with the given ID as of the last poll"""
+		return self._records.get(id)
+
+	def __contains__(self, id:str) -> bool:
+		return id in self._records
+
+	def __iter__(self):
+		return iter(self._records.values())
+
+	def __len__(self) -> int:
+		return len(self._records)
+
+
+def diff(before:typing.Iterable[CompactRecord], after:typing.Iterable[CompactRecord]) -> typing.List[AdderChange]:
+	"""The changes between two lists of records, matched by ID"""
+	tracker = DeltaTracker(before)
+	return tracker.update(after)
@@ -1,6 +1,7 @@
 import enum, abc, ipaddress, typing
 from datetime import datetime
 from dataclasses import dataclass
+from .records import CompactRecord, decode_int, decode_flag, decode_ip, decode_datetime, decode_enum
 
 @dataclass
 class NetworkInterface:
@@ -10,7 +11,7 @@ class NetworkInterface:
 	is_online:bool
 
 
-class AdderDevice(abc.ABC):
+class AdderDevice(CompactRecord, abc.ABC):
 	"""Abstract Adder device"""
 	@enum.unique
 	class DeviceType(enum.Enum):
@@ -43,119 +44,140 @@ class AdderDevice(abc.ABC):
 		ALIF4021R = '4'
 		ALIFE300R = '8'
 	
-	
-	def __init__(self, properties:dict):
-		# Do a lil copy
-		self._extended = {key: val for key,val in properties.items()}
+	__slots__ = (
+		"_name", "_description", "_location", "_date_added", "_id", "_serial_number", "_ip_addresses", "_mac_addresses",
+		"_online", "_firmware", "_backup_firmware", "_status", "_configured", "_valid_firmware", "_valid_backup_firmware", "_model"
+	)
+
+	INTERNED = frozenset({
+		"d_description", "d_location", "d_firmware", "d_backup_firmware", "d_type", "d_version", "d_variant", "d_status",
+		"d_online", "d_online2", "d_configured", "d_valid_firmware", "d_valid_backup_firmware",
+	})
+
+	def _decode(self, record:dict):
+		self._name = record.get("d_name","")
+		self._description = record.get("d_description","")
+		self._location = record.get("d_location","")
+		self._date_added = decode_datetime(record.get("d_date_added"))
+
+		self._id = record.get("d_id","")
+		self._serial_number = record.get("d_serial_number","")
+		self._ip_addresses = (decode_ip(record.get("d_ip_address")), decode_ip(record.get("d_ip_address2")))
+		self._mac_addresses = (record.get("d_mac_address",""), record.get("d_mac_address2",""))
+		self._online = (decode_int(record.get("d_online"), -1) > 0, decode_int(record.get("d_online2"), -1) > 0)
+
+		self._firmware = record.get("d_firmware","")
+		self._backup_firmware = record.get("d_backup_firmware","")
+
+		self._status = decode_enum(self.DeviceStatus, decode_int(record.get("d_status"), -1), self.DeviceStatus.UNKNOWN)
+		self._configured = decode_flag(record.get("d_configured"))
+		self._valid_firmware = decode_flag(record.get("d_valid_firmware"))
+		self._valid_backup_firmware = decode_flag(record.get("d_valid_backup_firmware"))
+
+		model_code = record.get("d_variant") if record.get("d_version") == '2' else record.get("d_version")
+		self._model = decode_enum(self.DeviceModel, model_code, self.DeviceModel.UNKNOWN)
 	
 	# Human-friendly descriptions
 	@property
 	def name(self) -> str:
 		"""Device name"""
-		return self._extended.get("d_name","")
+		return self._name
 
 	@property
 	def description(self) -> str:
 		"""Device description"""
-		return self._extended.get("d_description","")
+		return self._description
 
 	@property
 	def location(self) -> str:
 		"""Device location"""
-		return self._extended.get("d_location","")
+		return self._location
 	
 	@property
-	def date_dadded(self) -> datetime:
+	def date_dadded(self) -> typing.Optional[datetime]:
 		"""The date/time this device was set up"""
-		return datetime.fromisoformat(self._extended.get("d_date_added"))
+		return self._date_added
 	
 	# Addresses and IDs
 	@property
 	def id(self) -> str:
 		"""Device ID"""
-		return self._extended.get("d_id","")
+		return self._id
 	
 	@property
 	def serial_number(self) -> str:
 		"""Device serial number"""
-		return self._extended.get("d_serial_number","")
+		return self._serial_number
 	
 	@property
 	def ip_addresses(self) -> typing.Tuple[typing.Union[ipaddress.IPv4Address,ipaddress.IPv6Address,None]]:
 		"""IP addresses on the network"""
-		return (
-			ipaddress.ip_address(self._extended.get("d_ip_address")) if self._extended.get("d_ip_address") else None,
-			ipaddress.ip_address(self._extended.get("d_ip_address2")) if self._extended.get("d_ip_address2") else None,
-		)
+		return self._ip_addresses
 	
 	@property
 	def ip_address(self) -> typing.Union[ipaddress.IPv4Address,ipaddress.IPv6Address,None]:
 		"""Primary IP address of the device"""
-		return self.ip_addresses[0] or None
+		return self._ip_addresses[0]
 
 	@property
 	def mac_addresses(self) -> typing.Tuple[str]:
 		"""MAC addresses of the interfaces"""
-		return (self._extended.get("d_mac_address",""), self._extended.get("d_mac_address2",""))
+		return self._mac_addresses
 	
 	@property
 	def mac_address(self) -> str:
 		"""Primary MAC address"""
-		return self.mac_addresses[0]
+		return self._mac_addresses[0]
+
+	@property
+	def is_online(self) -> bool:
+		"""If the primary interface is online"""
+		return self._online[0]
 
 	@property
 	def network_interfaces(self) -> typing.Tuple[NetworkInterface]:
 		"""Return network interfaces"""
 		return (
-			NetworkInterface(self.ip_addresses[0], self.mac_addresses[0], int(self._extended.get("d_online",-1))>0),
-			NetworkInterface(self.ip_addresses[1], self.mac_addresses[1], int(self._extended.get("d_online2",-1))>0)
+			NetworkInterface(self._ip_addresses[0], self._mac_addresses[0], self._online[0]),
+			NetworkInterface(self._ip_addresses[1], self._mac_addresses[1], self._online[1])
 		)
 
 	# Firmware verions
 	@property
 	def firmware(self) -> str:
 		"""Current firmware version"""
-		return self._extended.get("d_firmware","")
+		return self._firmware
 	
 	@property
 	def backup_firmware(self) -> str:
 		"""Backup firmware version"""
-		return self._extended.get("d_backup_firmware","")
+		return self._backup_firmware
 	
 	# Status
 	@property
 	def status(self) -> DeviceStatus:
 		"""Device status"""
-		try:
-			return self.DeviceStatus(int(self._extended.get("d_status")))
-		except Exception as e:
-			return self.DeviceStatus(-1)
+		return self._status
 
 	@property
 	def is_configured(self) -> bool:
 		"""If the device has been set up"""
-		return int(self._extended.get("d_configured",0)) > 0
+		return self._configured
 	
 	@property
 	def is_firmware_valid(self) -> bool:
 		"""If the current firmware is in working order"""
-		return int(self._extended.get("d_valid_firmware")) > 0
+		return self._valid_firmware
 	
 	@property
 	def is_backup_firmware_valid(self) -> bool:
 		"""If the current firmware is in working order"""
-		return int(self._extended.get("d_valid_backup_firmware")) > 0
+		return self._valid_backup_firmware
 	
 	@property
 	def model(self) -> DeviceModel:
 		"""Device model"""
-		try:
-			if self._extended.get("d_version") == '2':
-				return self.DeviceModel(self._extended.get("d_variant"))
-			else:
-				return self.DeviceModel(self._extended.get("d_version"))
-		except:
-			return self.DeviceModel.UNKNOWN
+		return self._model
 
 	def __repr__(self):
 		return f"<{self.__class__.__name__} name=\"{self.name}\" location=\"{self.location}\" model={self.model.name} id={self.id}>"
@@ -164,15 +186,22 @@ class AdderDevice(abc.ABC):
 class AdderTransmitter(AdderDevice):
 	"""Adderlink Transmitter (TX) Device"""
 
+	__slots__ = ("_channel_count", "_preset_count")
+
+	def _decode(self, record:dict):
+		super()._decode(record)
+		self._channel_count = decode_int(record.get("count_transmitter_channels"))
+		self._preset_count = decode_int(record.get("count_transmitter_presets"))
+
 	@property
 	def channel_count(self) -> int:
 		"""Number of channels that use this device"""
-		return int(self._extended.get("count_transmitter_channels",0))
+		return self._channel_count
 	
 	@property
 	def preset_count(self) -> int:
 		"""Number of presets that use this device"""
-		return int(self._extended.get("count_transmitter_presets",0))
+		return self._preset_count
 
 
 class AdderReceiver(AdderDevice):
@@ -188,37 +217,46 @@ class AdderReceiver(AdderDevice):
 		EXCLUSIVE  =  2
 		SHARED     =  3
 	
+	__slots__ = (
+		"_connection_start", "_connection_end", "_connection_control", "_channel_name",
+		"_last_username", "_last_userid", "_group_count", "_preset_count", "_user_count"
+	)
+
+	INTERNED = AdderDevice.INTERNED | {"c_name", "u_username", "u_id", "con_control", "con_exclusive"}
+
+	def _decode(self, record:dict):
+		super()._decode(record)
+		self._connection_start = decode_datetime(record.get("con_start_time"))
+		self._connection_end = decode_datetime(record.get("con_end_time"))
+		self._connection_control = decode_enum(self.ConnectionControlType, decode_int(record.get("con_control"), -1), self.ConnectionControlType.UNKNOWN)
+		self._channel_name = record.get("c_name","")
+		self._last_username = record.get("u_username","")
+		self._last_userid = record.get("u_id","")
+		self._group_count = decode_int(record.get("count_receiver_groups"))
+		self._preset_count = decode_int(record.get("count_receiver_presets"))
+		self._user_count = decode_int(record.get("count_users"))
+
 	# Connection info
 
 	@property
 	def connection_start(self) -> typing.Optional[datetime]:
 		"""Time the last known connection started"""
-		if self._extended.get("con_start_time"):
-			return datetime.fromisoformat(self._extended.get("con_start_time"))
-		else:
-			return None
+		return self._connection_start
 		
 	@property
 	def connection_end(self) -> typing.Optional[datetime]:
 		"""Time the last known connection was ended.  Returns None if connection is current."""
-		if self._extended.get("con_end_time"):
-			return datetime.fromisoformat(self._extended.get("con_end_time"))
-		else:
-			return None
+		return self._connection_end
 
 	@property
 	def connection_control(self) -> ConnectionControlType:
 		"""Control mode of the last known connection"""
-		con_type = int(self._extended.get("con_control", -1))
-		try:
-			return self.ConnectionControlType(con_type)
-		except Exception:
-			return self.ConnectionControlType(-1)
+		return self._connection_control
 	
 	@property
 	def channel_name(self) -> str:
 		"""The name of the last known channel this receiver was connected"""
-		return self._extended.get("c_name","")
+		return self._channel_name
 
 	@property
 	def is_connected(self) -> bool:
@@ -229,13 +267,12 @@ class AdderReceiver(AdderDevice):
 	@property
 	def last_username(self) -> str:
 		"""Last known username"""
-		return self._extended.get("u_username","")
+		return self._last_username
 	
 	@property
 	def last_userid(self) -> str:
 		"""Last known user ID"""
-		print(self._extended)
-		return self._extended.get("u_id","")
+		return self._last_userid
 	
 	@property
 	def current_username(self) -> str:
@@ -251,41 +288,47 @@ class AdderReceiver(AdderDevice):
 	@property
 	def group_count(self) -> int:
 		"""Number of receiver groups this belongs to"""
-		return int(self._extended.get("count_receiver_groups",0))
+		return self._group_count
 
 	@property
 	def preset_count(self) -> int:
 		"""Number of receiver presets this belongs to"""
-		return int(self._extended.get("count_receiver_presets",0))
+		return self._preset_count
 	
 	@property
 	def user_count(self) -> int:
 		"""Number of users with access to this receiver"""
-		return int(self._extended.get("count_users",0)) 
+		return self._user_count
 
-class AdderUSBExtender(abc.ABC):
+class AdderUSBExtender(CompactRecord, abc.ABC):
 	"""Abstract Adder C-USB LAN Extender Device"""
 	
-	def __init__(self, properties:dict):
-		# Do a lil copy
-		self._extended = {key: val for key,val in properties.items()}
+	__slots__ = ("_name", "_ip_address", "_mac_address", "_online")
+
+	INTERNED = frozenset({"type", "online"})
+
+	def _decode(self, record:dict):
+		self._name = record.get("name","")
+		self._ip_address = decode_ip(record.get("ip"))
+		self._mac_address = record.get("mac") or ""
+		self._online = record.get("online") == "1"
 	
 	@property
 	def name(self) -> str:
 		"""Device name"""
-		return self._extended.get("name","")
+		return self._name
 	
 	@property
 	def ip_address(self) -> typing.Union[ipaddress.IPv4Address, ipaddress.IPv6Address, None]:
-		return ipaddress.ip_address(self._extended.get("ip")) if self._extended.get("ip") else None
+		return self._ip_address
 
 	@property
 	def mac_address(self) -> str:
-		return self._extended.get("mac","")
+		return self._mac_address
 	
 	@property
 	def is_online(self) -> bool:
-		return self._extended.get("online") == "1"
+		return self._online
 	
 	@property
 	def network_interface(self) -> NetworkInterface:
@@ -294,15 +337,24 @@ class AdderUSBExtender(abc.ABC):
 class AdderUSBTransmitter(AdderUSBExtender):
 	"""Adder C-USB LAN Network Transmitter"""
 
+	__slots__ = ()
+
 class AdderUSBReceiver(AdderUSBExtender):
 	"""Adder C-USB Lan Network Receiver"""
 
+	__slots__ = ("_connected_to",)
+
+	def _decode(self, record:dict):
+		super()._decode(record)
+		# An unconnected receiver has an empty <connectedTo/>, which parses as None
+		self._connected_to = record.get("connectedTo") or ""
+
 	@property
 	def connected_to(self) -> str:
 		"""MAC address of the connected transmitter"""
-		return self._extended.get("connectedTo","")
+		return self._connected_to
 
-class AdderServer:
+class AdderServer(CompactRecord):
 	"""An Adder Server Device"""
 
 	@enum.unique
@@ -332,70 +384,67 @@ class AdderServer:
 		BONDED  = 3
 		UNKNOWN = -1
 
+	__slots__ = ("_name", "_description", "_location", "_role", "_status", "_ip_addresses", "_mac_addresses", "_dual_ethernet_config")
+
+	INTERNED = frozenset({"description", "location", "role", "status", "eth1"})
 
-	def __init__(self, properties:dict):
-		# Do a lil copy
-		self._extended = {key: val for key,val in properties.items()}
+	def _decode(self, record:dict):
+		self._name = record.get("name","")
+		self._description = record.get("description","")
+		self._location = record.get("location","")
+		self._role = decode_enum(self.Role, record.get("role"), self.Role.UNKNOWN)
+		self._status = decode_enum(self.Status, record.get("status"), self.Status.UNKNOWN)
+		self._ip_addresses = (decode_ip(record.get("ip")), decode_ip(record.get("ip2")))
+		self._mac_addresses = (record.get("mac",""), record.get("mac2",""))
+		self._dual_ethernet_config = decode_enum(self.DualEthernetConfig, decode_int(record.get("eth1"), -1), self.DualEthernetConfig.UNKNOWN)
 	
 	# Human-friendly descriptions
 	@property
 	def name(self) -> str:
 		"""Server name"""
-		return self._extended.get("name","")
+		return self._name
 
 	@property
 	def description(self) -> str:
 		"""Server description"""
-		return self._extended.get("description","")
+		return self._description
 
 	@property
 	def location(self) -> str:
 		"""Server location"""
-		return self._extended.get("location","")
+		return self._location
 	
 	@property
 	def role(self) -> Role:
 		"""The configured role of the AIM"""
-		try:
-			return self.Role(self._extended.get("role"))
-		except Exception:
-			return self.Role("unknown")
+		return self._role
 	
 	@property
 	def status(self) -> Status:
 		"""The current status of the AIM"""
-		try:
-			return self.Status(self._extended.get("status"))
-		except Exception:
-			return self.Status("unknown")
+		return self._status
 	
 	@property
 	def ip_addresses(self) -> typing.Tuple[typing.Union[ipaddress.IPv4Address,ipaddress.IPv6Address,None]]:
 		"""IP addresses on the network"""
-		return (
-			ipaddress.ip_address(self._extended.get("ip")) if self._extended.get("ip") else None,
-			ipaddress.ip_address(self._extended.get("ip2")) if self._extended.get("ip2") else None,
-		)
+		return self._ip_addresses
 	
 	@property
 	def ip_address(self) -> typing.Union[ipaddress.IPv4Address,ipaddress.IPv6Address,None]:
 		"""Primary IP address of the device"""
-		return self.ip_addresses[0] or None
+		return self._ip_addresses[0]
 
 	@property
 	def mac_addresses(self) -> typing.Tuple[str]:
 		"""MAC addresses of the interfaces"""
-		return (self._extended.get("mac",""), self._extended.get("mac2",""))
+		return self._mac_addresses
 	
 	@property
 	def mac_address(self) -> str:
 		"""Primary MAC address"""
-		return self.mac_addresses[0]
+		return self._mac_addresses[0]
 
 	@property
 	def dual_ethernet_config(self) -> DualEthernetConfig:
 		"""The configuration of the second ethernet port"""
-		try:
-			return self.DualEthernetConfig(int(self._extended.get("eth1",-1)))
-		except Exception:
-			return self.DualEthernetConfig(-1)
\ No newline at end of file
+		return self._dual_ethernet_config
\ No newline at end of file
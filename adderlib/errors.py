@@ -0,0 +1,19 @@
+import typing
+
+class AdderRequestError(Exception):
+	"""Adder API request has not returned success"""
+
+	def __init__(self, *args, code:typing.Optional[str]=None):
+		super().__init__(*args)
+		self.code = code	# The AIM's error code, if it gave one
+
+
+def raise_for_failure(response:dict, context:str=""):
+	"""Raise AdderRequestError for a response which has not returned success, giving the AIM's first error"""
+
+	if response.get("success") == "1":
+		return
+
+	error = (response.get("errors") or {}).get("error") or {}
+	error = error[0] if isinstance(error, list) else error
+	raise AdderRequestError(f"{context}Error {error.get('code','?')}: {error.get('msg','?')}", code=error.get("code"))
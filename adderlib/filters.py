@@ -0,0 +1,218 @@
+import dataclasses, typing
+from .devices import AdderDevice
+from .channels import AdderChannel
+from .presets import AdderPreset
+
+def _contains(value:typing.Optional[str], search:typing.Optional[str]) -> bool:
+	"""Case-insensitive substring search, as used by the AIM's `filter_*` parameters"""
+	return search is None or search.lower() in (value or "").lower()
+
+
+@dataclasses.dataclass(frozen=True)
+class DeviceFilter:
+	"""
+	Criteria for selecting transmitters or receivers
+	`name`, `description` and `location` are search strings passed to the AIM as `filter_d_*` parameters, as is `status` unless it is ONLINE.
+	`id` and `predicate` cannot be sent to the AIM, and are applied to each device as it is received.
+	Pushed-down criteria are checked again locally, so results are also correct from servers which ignore a filter.
+	"""
+	name:typing.Optional[str] = None
+	description:typing.Optional[str] = None
+	location:typing.Optional[str] = None
+	status:typing.Optional[AdderDevice.DeviceStatus] = None
+	id:typing.Optional[str] = None
+	predicate:typing.Optional[typing.Callable[[AdderDevice], bool]] = None
+
+	# Device statuses which the `status` parameter of `get_devices` can select
+	STATUS_ARGS = {
+		AdderDevice.DeviceStatus.OFFLINE:         "offline",
+		AdderDevice.DeviceStatus.REBOOTING:       "rebooting",
+		AdderDevice.DeviceStatus.UPGRADING:       "upgrading_firmware",
+		AdderDevice.DeviceStatus.BACKUP_FIRMWARE: "backup_mode",
+	}
+
+	def named(self, name:str) -> "DeviceFilter":
+		"""Also require the device name to contain `name`"""
+		return dataclasses.replace(self, name=name)
+
+	def described(self, description:str) -> "DeviceFilter":
+		"""Also require the device description to contain `description`"""
+		return dataclasses.replace(self, description=description)
+
+	def located(self, location:str) -> "DeviceFilter":
+		"""Also require the device location to contain `location`"""
+		return dataclasses.replace(self, location=location)
+
+	def with_status(self, status:AdderDevice.DeviceStatus) -> "DeviceFilter":
+		"""Also require the device to have the given status"""
+		return dataclasses.replace(self, status=status)
+
+	def with_id(self, id:str) -> "DeviceFilter":
+		"""Also require the device to have the given ID"""
+		return dataclasses.replace(self, id=id)
+
+	def where(self, predicate:typing.Callable[[AdderDevice], bool]) -> "DeviceFilter":
+		"""Also require an arbitrary predicate to hold, combined with any existing predicate"""
+		if self.predicate is not None:
+			first = self.predicate
+			return dataclasses.replace(self, predicate=lambda device: first(device) and predicate(device))
+		return dataclasses.replace(self, predicate=predicate)
+
+	def query_args(self) -> dict:
+		"""API arguments for the criteria the AIM can apply itself"""
+
+		args = {}
+		if self.name is not None:
+			args["filter_d_name"] = self.name
+		if self.description is not None:
+			args["filter_d_description"] = self.description
+		if self.location is not None:
+			args["filter_d_location"] = self.location
+		if self.status in self.STATUS_ARGS:
+			args["status"] = self.STATUS_ARGS[self.status]
+		return args
+
+	def matches(self, device:AdderDevice) -> bool:
+		"""Whether a device meets all of the criteria"""
+		return (
+			(self.id is None or device.id == self.id)
+			and (self.status is None or device.status == self.status)
+			and _contains(device.name, self.name)
+			and _contains(device.description, self.description)
+			and _contains(device.location, self.location)
+			and (self.predicate is None or bool(self.predicate(device)))
+		)
+
+	@property
+	def is_local_only(self) -> bool:
+		"""Whether none of the criteria can be applied by the AIM"""
+		return not self.query_args()
+
+
+@dataclasses.dataclass(frozen=True)
+class ChannelFilter:
+	"""
+	Criteria for selecting channels
+	`name`, `description` and `location` are search strings passed to the AIM as `filter_c_*` parameters.
+	`favourites_only` and `receiver_id` are passed as `filter_favourites` and `device_id`.
+	`id`, `tx_id` and `predicate` cannot be sent to the AIM, and are applied to each channel as it is received.
+	"""
+	name:typing.Optional[str] = None
+	description:typing.Optional[str] = None
+	location:typing.Optional[str] = None
+	favourites_only:bool = False
+	receiver_id:typing.Optional[str] = None
+	id:typing.Optional[str] = None
+	tx_id:typing.Optional[str] = None
+	predicate:typing.Optional[typing.Callable[[AdderChannel], bool]] = None
+
+	def named(self, name:str) -> "ChannelFilter":
+		"""Also require the channel name to contain `name`"""
+		return dataclasses.replace(self, name=name)
+
+	def described(self, description:str) -> "ChannelFilter":
+		"""Also require the channel description to contain `description`"""
+		return dataclasses.replace(self, description=description)
+
+	def located(self, location:str) -> "ChannelFilter":
+		"""Also require the channel location to contain `location`"""
+		return dataclasses.replace(self, location=location)
+
+	def favourites(self) -> "ChannelFilter":
+		"""Only select the user's favourite channels"""
+		return dataclasses.replace(self, favourites_only=True)
+
+	def for_receiver(self, receiver_id:str) -> "ChannelFilter":
+		"""Check connection mode availability against the given receiver"""
+		return dataclasses.replace(self, receiver_id=receiver_id)
+
+	def with_id(self, id:str) -> "ChannelFilter":
+		"""Also require the channel to have the given ID"""
+		return dataclasses.replace(self, id=id)
+
+	def with_tx_id(self, tx_id:str) -> "ChannelFilter":
+		"""Also require the channel to use the given transmitter"""
+		return dataclasses.replace(self, tx_id=tx_id)
+
+	def where(self, predicate:typing.Callable[[AdderChannel], bool]) -> "ChannelFilter":
+		"""Also require an arbitrary predicate to hold, combined with any existing predicate"""
+		if self.predicate is not None:
+			first = self.predicate
+			return dataclasses.replace(self, predicate=lambda channel: first(channel) and predicate(channel))
+		return dataclasses.replace(self, predicate=predicate)
+
+	def query_args(self) -> dict:
+		"""API arguments for the criteria the AIM can apply itself"""
+
+		args = {}
+		if self.name is not None:
+			args["filter_c_name"] = self.name
+		if self.description is not None:
+			args["filter_c_description"] = self.description
+		if self.location is not None:
+			args["filter_c_location"] = self.location
+		if self.favourites_only:
+			args["filter_favourites"] = 1
+		if self.receiver_id is not None:
+			args["device_id"] = self.receiver_id
+		return args
+
+	def matches(self, channel:AdderChannel) -> bool:
+		"""Whether a channel meets all of the criteria"""
+		return (
+			(self.id is None or channel.id == self.id)
+			and (self.tx_id is None or channel.tx_id == self.tx_id)
+			and (not self.favourites_only or channel.is_favorite)
+			and _contains(channel.name, self.name)
+			and _contains(channel.description, self.description)
+			and _contains(channel.location, self.location)
+			and (self.predicate is None or bool(self.predicate(channel)))
+		)
+
+	@property
+	def is_local_only(self) -> bool:
+		"""Whether none of the criteria can be applied by the AIM"""
+		return not self.query_args()
+
+
+@dataclasses.dataclass(frozen=True)
+class PresetFilter:
+	"""
+	Criteria for selecting presets
+	The AIM documents no filters for `get_presets`, so all criteria are applied to each preset as it is received.
+	"""
+	name:typing.Optional[str] = None
+	id:typing.Optional[str] = None
+	predicate:typing.Optional[typing.Callable[[AdderPreset], bool]] = None
+
+	def named(self, name:str) -> "PresetFilter":
+		"""Also require the preset name to contain `name`"""
+		return dataclasses.replace(self, name=name)
+
+	def with_id(self, id:str) -> "PresetFilter":
+		"""Also require the preset to have the given ID"""
+		return dataclasses.replace(self, id=id)
+
+	def where(self, predicate:typing.Callable[[AdderPreset], bool]) -> "PresetFilter":
+		"""Also require an arbitrary predicate to hold, combined with any existing predicate"""
+		if self.predicate is not None:
+			first = self.predicate
+			return dataclasses.replace(self, predicate=lambda preset: first(preset) and predicate(preset))
+		return dataclasses.replace(self, predicate=predicate)
+
+	def query_args(self) -> dict:
+		"""API arguments for the criteria the AIM can apply itself"""
+		return {}
+
+	def matches(self, preset:AdderPreset) -> bool:
+		"""Whether a preset meets all of the criteria"""
+		return (
+			(self.id is None or preset.id == self.id)
+			and _contains(preset.name, self.name)
+			and (self.predicate is None or bool(self.predicate(preset)))
+		)
+
+	@property
+	def is_local_only(self) -> bool:
+		"""Whether none of the criteria can be applied by the AIM"""
+		return True
@@ -0,0 +1,287 @@
+import array, collections, itertools, math, time, typing
+from datetime import datetime, timedelta
+from .devices import AdderDevice, AdderReceiver
+
+# NumPy is optional.  Without it, columns are kept in `array` and `bytes` objects instead.
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+
+class FleetMask:
+	"""
+	A selection of rows in a FleetTable, as returned by its filters
+	Masks from the same table combine with `&`, `|` and `~`.
+	"""
+
+	def __init__(self, data):
+		# A NumPy bool array, or `bytes` of 0s and 1s
+		self._data = data
+
+	def _combine(self, other:"FleetMask", op) -> "FleetMask":
+		if not isinstance(other, FleetMask):
+			return NotImplemented
+		if len(self._data) != len(other._data):
+			raise ValueError("Masks are from tables of different sizes")
+
+		if numpy is not None and isinstance(self._data, numpy.ndarray):
+			return FleetMask(op(self._data, other._data))
+
+		# Rows are one byte each, so the bytes can be combined as one big integer
+		size = len(self._data)
+		result = op(int.from_bytes(self._data, "big"), int.from_bytes(other._data, "big"))
+		return FleetMask(result.to_bytes(size, "big"))
+
+	def __and__(self, other:"FleetMask") -> "FleetMask":
+		return self._combine(other, lambda a, b: a & b)
+
+	def __or__(self, other:"FleetMask") -> "FleetMask":
+		return self._combine(other, lambda a, b: a | b)
+
+	def __invert__(self) -> "FleetMask":
+		if numpy is not None and isinstance(self._data, numpy.ndarray):
+			return FleetMask(~self._data)
+		return FleetMask(self._data.translate(_FLIP))
+
+	def count(self) -> int:
+		"""Number of rows selected"""
+		if numpy is not None and isinstance(self._data, numpy.ndarray):
+			return int(numpy.count_nonzero(self._data))
+		return self._data.count(1)
+
+	def rows(self) -> typing.List[int]:
+		"""Indexes of the rows selected, in table order"""
+		if numpy is not None and isinstance(self._data, numpy.ndarray):
+			return numpy.flatnonzero(self._data).tolist()
+		return list(itertools.compress(range(len(self._data)), self._data))
+
+	def __len__(self) -> int:
+		return len(self._data)
+
+	def __repr__(self):
+		return f"<{self.__class__.__name__} selected={self.count()} of={len(self)}>"
+
+# Byte translation swapping 0s and 1s
+_FLIP = bytes([1, 0]) + bytes(254)
+
+
+def _firmware_key(version:str) -> typing.Tuple[int, ...]:
+	"""Sort key for firmware versions such as 4.3.48200"""
+	return tuple(int(part) if part.isdigit() else -1 for part in (version or "").split("."))
+
+def _epoch(value:typing.Optional[datetime]) -> float:
+	return value.timestamp() if value is not None else math.nan
+
+
+class FleetTable:
+	"""
+	Transmitters and receivers stored as columns, for queries across a whole fleet
+	Categorical columns (type, status, model, online, firmware, location) hold a small code per device, and the connection
+	start and end times hold seconds since the epoch, or NaN.  Filters work on whole columns at once and return a FleetMask;
+	the matching device objects are only looked up when asked for.  NumPy is used if installed.
+	"""
+
+	CATEGORICAL = ("type", "status", "model", "online", "firmware", "location")
+	TIMES = ("connection_start", "connection_end")
+
+	def __init__(self, devices:typing.Iterable[AdderDevice], *, use_numpy:typing.Optional[bool]=None):
+		"""
+		Build a table from devices, such as the output of AdderAPI.getTransmitters() and getReceivers()
+		use_numpy:bool -- Whether to store columns in NumPy arrays.  By default, NumPy is used if it is installed.
+		"""
+
+		if use_numpy and numpy is None:
+			raise ValueError("NumPy was requested, but is not installed")
+		self._use_numpy = numpy is not None if use_numpy is None else bool(use_numpy)
+
+		self._devices = list(devices)
+		self._categories = {name: [] for name in self.CATEGORICAL}	# column -> labels, in order of code
+		codes = {name: array.array("L") for name in self.CATEGORICAL}
+		times = {name: array.array("d") for name in self.TIMES}
+		lookup = {name: {} for name in self.CATEGORICAL}				# column -> {label: code}
+
+		for device in self._devices:
+			is_rx = isinstance(device, AdderReceiver)
+			values = (
+				AdderDevice.DeviceType.RX if is_rx else AdderDevice.DeviceType.TX,
+				device.status, device.model, device.is_online, device.firmware, device.location
+			)
+			for name, value in zip(self.CATEGORICAL, values):
+				code = lookup[name].get(value)
+				if code is None:
+					code = lookup[name][value] = len(self._categories[name])
+					self._categories[name].append(value)
+				codes[name].append(code)
+
+			times["connection_start"].append(_epoch(device.connection_start) if is_rx else math.nan)
+			times["connection_end"].append(_epoch(device.connection_end) if is_rx else math.nan)
+
+		if self._use_numpy:
+			self._columns = {name: numpy.frombuffer(column, dtype=numpy.uint32 if column.itemsize == 4 else numpy.uint64) if len(column) else numpy.zeros(0, dtype=numpy.uint32) for name, column in codes.items()}
+			self._columns.update({name: numpy.frombuffer(column, dtype=numpy.float64) if len(column) else numpy.zeros(0) for name, column in times.items()})
+		else:
+			self._columns = {**codes, **times}
+
+	@classmethod
+	def from_api(cls, api, **kwargs) -> "FleetTable":
+		"""Build a table of all transmitters and receivers available through an AdderAPI"""
+		return cls(itertools.chain(api.getTransmitters(), api.getReceivers()), **kwargs)
+
+	# Filters
+	def _match_categories(self, column:str, predicate:typing.Callable[[typing.Any], bool]) -> FleetMask:
+		"""Select rows whose label in a categorical column meets a predicate, testing each label only once"""
+
+		if column not in self._categories:
+			raise ValueError(f"'{column}' is not a categorical column; expected one of {', '.join(self.CATEGORICAL)}")
+
+		matches = [bool(predicate(label)) for label in self._categories[column]]
+		codes = self._columns[column]
+
+		if self._use_numpy:
+			return FleetMask(numpy.array(matches, dtype=bool)[codes] if matches else numpy.zeros(0, dtype=bool))
+		return FleetMask(bytes(map(bytes(matches).__getitem__, codes)))
+
+	def all(self) -> FleetMask:
+		"""Select every row"""
+		if self._use_numpy:
+			return FleetMask(numpy.ones(len(self), dtype=bool))
+		return FleetMask(bytes([1]) * len(self))
+
+	def where(self, column:str, predicate:typing.Callable[[typing.Any], bool]) -> FleetMask:
+		"""Select rows whose value in a categorical column meets an arbitrary predicate"""
+		return self._match_categories(column, predicate)
+
+	def is_type(self, *types:AdderDevice.DeviceType) -> FleetMask:
+		"""Select transmitters or receivers"""
+		return self._match_categories("type", lambda label: label in types)
+
+	def is_status(self, *statuses:AdderDevice.DeviceStatus) -> FleetMask:
+		"""Select devices with any of the given statuses"""
+		return self._match_categories("status", lambda label: label in statuses)
+
+	def is_model(self, *models:AdderDevice.DeviceModel) -> FleetMask:
+		"""Select devices of any of the given models"""
+		return self._match_categories("model", lambda label: label in models)
+
+	def is_online(self, online:bool=True) -> FleetMask:
+		"""Select devices whose primary interface is online, or offline"""
+		return self._match_categories("online", lambda label: label == online)
+
+	def located(self, *locations:str) -> FleetMask:
+		"""Select devices at any of the given locations"""
+		return self._match_categories("location", lambda label: label in locations)
+
+	def firmware_below(self, version:str) -> FleetMask:
+		"""Select devices running firmware older than the given version"""
+		limit = _firmware_key(version)
+		return self._match_categories("firmware", lambda label: _firmware_key(label) < limit)
+
+	def connected_longer_than(self, duration:typing.Union[timedelta, float], *, now:typing.Optional[float]=None) -> FleetMask:
+		"""Select receivers with a connection that is current, and that started more than `duration` (or seconds) ago"""
+
+		seconds = duration.total_seconds() if isinstance(duration, timedelta) else float(duration)
+		cutoff = (time.time() if now is None else float(now)) - seconds
+		start, end = self._columns["connection_start"], self._columns["connection_end"]
+
+		if self._use_numpy:
+			# NaN compares False, so receivers without a start time are left out
+			return FleetMask((start < cutoff) & numpy.isnan(end))
+		return FleetMask(bytes(s < cutoff and e != e for s, e in zip(start, end)))
+
+	# Results
+	def _rows(self, mask:typing.Optional[FleetMask]) -> typing.List[int]:
+		if mask is None:
+			return list(range(len(self)))
+		if len(mask) != len(self):
+			raise ValueError("Mask is from a table of a different size")
+		return mask.rows()
+
+	def _sort_keys(self, column:str) -> typing.Sequence:
+		"""Per-row keys ordering a column by its values, rather than by its codes"""
+
+		if column in self.TIMES:
+			return self._columns[column]
+		if column not in self._categories:
+			raise ValueError(f"Unknown column '{column}'")
+
+		labels = self._categories[column]
+		key = {
+			"firmware": _firmware_key,
+			"online":   int,
+		}.get(column, lambda label: label.value if hasattr(label, "value") else str(label or ""))
+		order = sorted(range(len(labels)), key=lambda code: key(labels[code]))
+		ranks = [0] * len(labels)
+		for rank, code in enumerate(order):
+			ranks[code] = rank
+
+		if self._use_numpy:
+			return numpy.array(ranks, dtype=numpy.int64)[self._columns[column]] if ranks else numpy.zeros(0, dtype=numpy.int64)
+		return array.array("q", map(ranks.__getitem__, self._columns[column]))
+
+	def rows(self, mask:typing.Optional[FleetMask]=None, *, sort_by:typing.Optional[str]=None, descending:bool=False) -> typing.List[int]:
+		"""Indexes of the selected rows (or all of them), in table order or sorted by a column"""
+
+		rows = self._rows(mask)
+		if sort_by is None:
+			return rows
+
+		keys = self._sort_keys(sort_by)
+		if self._use_numpy:
+			selected = numpy.asarray(rows, dtype=numpy.int64)
+			column = keys[selected]
+			# Keep missing times last either way, as NaN would otherwise sort to one end
+			order = numpy.argsort(-column if descending else column, kind="stable")
+			return selected[order].tolist()
+
+		present = [row for row in rows if keys[row] == keys[row]]
+		missing = [row for row in rows if keys[row] != keys[row]]
+		return sorted(present, key=keys.__getitem__, reverse=descending) + missing
+
+	def devices(self, mask:typing.Optional[FleetMask]=None, *, sort_by:typing.Optional[str]=None, descending:bool=False) -> typing.List[AdderDevice]:
+		"""The device objects for the selected rows (or all of them), in table order or sorted by a column"""
+		return [self._devices[row] for row in self.rows(mask, sort_by=sort_by, descending=descending)]
+
+	def count_by(self, column:str, mask:typing.Optional[FleetMask]=None) -> typing.Dict[typing.Any, int]:
+		"""Number of the selected rows (or all of them) with each value of a categorical column, most common first"""
+
+		if column not in self._categories:
+			raise ValueError(f"'{column}' is not a categorical column; expected one of {', '.join(self.CATEGORICAL)}")
+		if mask is not None and len(mask) != len(self):
+			raise ValueError("Mask is from a table of a different size")
+
+		labels = self._categories[column]
+		codes = self._columns[column]
+
+		if self._use_numpy:
+			selected = codes if mask is None else codes[mask._data]
+			counts = numpy.bincount(selected, minlength=len(labels)).tolist() if len(labels) else []
+			tally = {labels[code]: count for code, count in enumerate(counts) if count}
+		else:
+			selected = codes if mask is None else itertools.compress(codes, mask._data)
+			tally = {labels[code]: count for code, count in collections.Counter(selected).items()}
+
+		return dict(sorted(tally.items(), key=lambda item: item[1], reverse=True))
+
+	def column(self, name:str):
+		"""The array backing a column: codes into `categories(name)` for categorical columns, or epoch seconds for times"""
+		if name not in self._columns:
+			raise ValueError(f"Unknown column '{name}'")
+		return self._columns[name]
+
+	def categories(self, name:str) -> typing.Tuple:
+		"""The labels of a categorical column, indexed by code"""
+		if name not in self._categories:
+			raise ValueError(f"'{name}' is not a categorical column; expected one of {', '.join(self.CATEGORICAL)}")
+		return tuple(self._categories[name])
+
+	@property
+	def uses_numpy(self) -> bool:
+		"""Whether the columns are NumPy arrays"""
+		return self._use_numpy
+
+	def __len__(self) -> int:
+		return len(self._devices)
+
+	def __repr__(self):
+		return f"<{self.__class__.__name__} devices={len(self)} backend={'numpy' if self._use_numpy else 'array'}>"
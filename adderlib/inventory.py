@@ -0,0 +1,109 @@
+import dataclasses, typing
+from datetime import datetime
+from .devices import AdderTransmitter, AdderReceiver, AdderServer, AdderUSBExtender, AdderUSBTransmitter, AdderUSBReceiver
+from .channels import AdderChannel
+from .presets import AdderPreset
+
+class AdderUSBTopology:
+	"""
+	The C-USB LAN extenders from a single `get_all_c_usb` response, indexed by MAC address
+	Looking up an extender, or the transmitter a receiver is connected to, takes constant time however many extenders there are.
+	"""
+
+	def __init__(self, extenders:typing.Iterable[AdderUSBExtender]):
+		extenders = tuple(extenders)
+		self._transmitters = tuple(usb for usb in extenders if isinstance(usb, AdderUSBTransmitter))
+		self._receivers = tuple(usb for usb in extenders if isinstance(usb, AdderUSBReceiver))
+
+		# MAC addresses are compared case-insensitively
+		self._by_mac = {usb.mac_address.lower(): usb for usb in extenders if usb.mac_address}
+		self._receivers_by_tx = {}
+		for rx in self._receivers:
+			if rx.connected_to:
+				self._receivers_by_tx.setdefault(rx.connected_to.lower(), []).append(rx)
+
+	def get(self, mac_address:str) -> typing.Optional[AdderUSBExtender]:
+		"""The extender with the given MAC address, if there is one"""
+		return self._by_mac.get(mac_address.lower())
+
+	def connected_to(self, receiver:AdderUSBReceiver) -> typing.Optional[AdderUSBTransmitter]:
+		"""The transmitter a receiver is connected to, if it is connected to one listed here"""
+		if not receiver.connected_to:
+			return None
+		tx = self._by_mac.get(receiver.connected_to.lower())
+		return tx if isinstance(tx, AdderUSBTransmitter) else None
+
+	def receivers_of(self, transmitter:AdderUSBTransmitter) -> typing.Tuple[AdderUSBReceiver, ...]:
+		"""The receivers connected to a transmitter"""
+		return tuple(self._receivers_by_tx.get((transmitter.mac_address or "").lower(), ()))
+
+	def connections(self) -> typing.Iterator[typing.Tuple[AdderUSBReceiver, AdderUSBTransmitter]]:
+		"""Each connected receiver, with the transmitter it is connected to"""
+		for rx in self._receivers:
+			tx = self.connected_to(rx)
+			if tx is not None:
+				yield rx, tx
+
+	@property
+	def transmitters(self) -> typing.Tuple[AdderUSBTransmitter, ...]:
+		"""The C-USB LAN transmitters"""
+		return self._transmitters
+
+	@property
+	def receivers(self) -> typing.Tuple[AdderUSBReceiver, ...]:
+		"""The C-USB LAN receivers"""
+		return self._receivers
+
+	def __contains__(self, mac_address:str) -> bool:
+		return mac_address.lower() in self._by_mac
+
+	def __iter__(self) -> typing.Iterator[AdderUSBExtender]:
+		yield from self._transmitters
+		yield from self._receivers
+
+	def __len__(self) -> int:
+		return len(self._transmitters) + len(self._receivers)
+
+	def __repr__(self):
+		return f"<{self.__class__.__name__} transmitters={len(self._transmitters)} receivers={len(self._receivers)}>"
+
+
+@dataclasses.dataclass(frozen=True)
+class AdderInventory:
+	"""
+	Everything available to the user on an AIM, as fetched by a single snapshot
+	Each list is a tuple in the order the AIM returned it.  `fetched_at` holds the time each list finished
+	downloading, and `wall_time` the seconds taken by the snapshot as a whole.
+	"""
+	transmitters:typing.Tuple[AdderTransmitter, ...]
+	receivers:typing.Tuple[AdderReceiver, ...]
+	channels:typing.Tuple[AdderChannel, ...]
+	presets:typing.Tuple[AdderPreset, ...]
+	servers:typing.Tuple[AdderServer, ...]
+	usb_extenders:AdderUSBTopology
+	started_at:datetime
+	fetched_at:typing.Mapping[str, datetime]
+	wall_time:float
+
+	# Names of the lists in an inventory
+	LISTS = ("transmitters", "receivers", "channels", "presets", "servers", "usb_extenders")
+
+	@property
+	def usb_transmitters(self) -> typing.Tuple[AdderUSBTransmitter, ...]:
+		"""The C-USB LAN transmitters"""
+		return self.usb_extenders.transmitters
+
+	@property
+	def usb_receivers(self) -> typing.Tuple[AdderUSBReceiver, ...]:
+		"""The C-USB LAN receivers"""
+		return self.usb_extenders.receivers
+
+	@property
+	def finished_at(self) -> datetime:
+		"""The time the last list finished downloading"""
+		return max(self.fetched_at.values(), default=self.started_at)
+
+	@property
+	def counts(self) -> typing.Dict[str, int]:
+		"""The number of entries in each list"""
+		return {name: len(getattr(self, name)) for name in self.LISTS}
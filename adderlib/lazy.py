@@ -0,0 +1,86 @@
+import typing
+from .records import CompactRecord
+
+
+class LazyRecord:
+	"""
+	A newly created channel or preset, known by its ID until anything more is asked of it
+	The AIM only returns the ID of what it creates, so the rest has to be fetched.  A lazy record puts that off until a property
+	other than its ID (or one given when it was created, such as its name) is first read, and it can be used in place of the real
+	thing anywhere only the ID is needed, such as AdderAPI.connectToChannel().
+	"""
+
+	__slots__ = ("_id", "_record_type", "_fetch", "_known", "_record")
+
+	def __init__(self, record_type:typing.Type[CompactRecord], id:str, fetch:typing.Callable[[str], typing.Optional[CompactRecord]], **known):
+		"""
+		record_type:type -- The type of record this stands in for, such as AdderChannel
+		id:str -- The ID of the record
+		fetch:callable -- Fetches the record with a given ID, or returns None if there isn't one
+		known -- Properties already known, which can be read without fetching
+		"""
+
+		self._id = id
+		self._record_type = record_type
+		self._fetch = fetch
+		self._known = known
+		self._record = None
+
+	@property
+	def id(self) -> str:
+		"""The ID of the record"""
+		return self._id
+
+	@property
+	def record_type(self) -> typing.Type[CompactRecord]:
+		"""The type of record this stands in for"""
+		return self._record_type
+
+	@property
+	def is_hydrated(self) -> bool:
+		"""Whether the record has been fetched"""
+		return self._record is not None
+
+	def hydrate(self) -> CompactRecord:
+		"""The full record, fetched the first time it is needed"""
+
+		if self._record is None:
+			record = self._fetch(self._id)
+			if record is None:
+				raise LookupError(f"{self._record_type.__name__} {self._id} could not be found")
+			self._set_record(record)
+		return self._record
+
+	def _set_record(self, record:CompactRecord):
+		"""Hydrate from a record fetched elsewhere, such as in a batch"""
+		if not isinstance(record, self._record_type) or record.id != self._id:
+			raise ValueError(f"Record {record!r} is not {self._record_type.__name__} {self._id}")
+		self._record = record
+
+	def __getattr__(self, name:str):
+		# Only called for what isn't defined here: known values first, then the full record
+		if name.startswith("_"):
+			raise AttributeError(name)
+		if self._record is None and name in self._known:
+			return self._known[name]
+		return getattr(self.hydrate(), name)
+
+	def __repr__(self):
+		return f"<{self.__class__.__name__} {self._record_type.__name__} id={self._id} hydrated={self.is_hydrated}>"
+
+
+def hydrate_all(lazy_records:typing.Iterable[LazyRecord], records:typing.Iterable[CompactRecord]) -> typing.List[CompactRecord]:
+	"""Hydrate lazy records from one list of fetched records, returning the full records in the same order"""
+
+	lazy_records = list(lazy_records)
+	wanted = {lazy.id for lazy in lazy_records if not lazy.is_hydrated}
+	found = {record.id: record for record in records if record.id in wanted}
+
+	missing = wanted - found.keys()
+	if missing:
+		raise LookupError(f"Records could not be found with IDs: {', '.join(sorted(missing))}")
+
+	for lazy in lazy_records:
+		if not lazy.is_hydrated:
+			lazy._set_record(found[lazy.id])
+	return [lazy.hydrate() for lazy in lazy_records]
@@ -0,0 +1,131 @@
+import collections, concurrent.futures, threading, typing
+from .errors import raise_for_failure
+
+def list_items(response:dict, container:str, item:str) -> list:
+	"""List the `item` elements of the `container` list in a successful API response"""
+
+	if response.get("success") != "1" or not response.get(container):
+		return []
+
+	# `xmltodict` only returns a list of nodes if there are more than one
+	items = response.get(container).get(item) or []
+	return items if isinstance(items, list) else [items]
+
+
+class PagedList:
+	"""
+	Iterates over the items of an API list one page at a time, fetching the following pages in the background
+	While the caller works through page N, up to `prefetch` further pages are already being requested.
+	If the server ignores paging and answers page 1 with something other than the requested page, that
+	response is taken as the whole list and no further pages are requested.  A page the AIM turns down raises AdderRequestError.
+	"""
+
+	def __init__(self, fetch:typing.Callable[[dict], dict], args:dict, container:str, item:str, *, page_size:int, prefetch:int=1):
+		"""
+		fetch:Callable -- Makes an API call with the given arguments and returns the response
+		args:dict -- The API arguments for the list, to which `page` and `results_per_page` are added
+		container:str, item:str -- Names of the list element and its items in the response
+		page_size:int -- Number of items to request per page
+		prefetch:int -- Number of pages to request ahead of the page being consumed (0 to disable)
+		"""
+
+		if int(page_size) < 1:
+			raise ValueError("`page_size` must be at least 1")
+		if int(prefetch) < 0:
+			raise ValueError("`prefetch` must not be negative")
+
+		self._fetch = fetch
+		self._args = dict(args)
+		self._container = container
+		self._item = item
+		self._page_size = int(page_size)
+		self._prefetch = int(prefetch)
+
+		self._pages_fetched = 0
+		self._pages_lock = threading.Lock()	# Pages are fetched from the prefetch threads too
+		self._paging_supported = None
+
+	def _fetch_page(self, page:int) -> dict:
+		args = dict(self._args)
+		args.update({"page": page, "results_per_page": self._page_size})
+		response = self._fetch(args)
+		with self._pages_lock:
+			self._pages_fetched += 1
+
+		# A failed page would otherwise look like the end of the list, cutting it short
+		raise_for_failure(response, f"Page {page}: ")
+		return response
+
+	def _is_paged(self, response:dict, page:int) -> bool:
+		"""Whether a response honours the requested page"""
+		return str(response.get("page")) == str(page) and str(response.get("results_per_page")) == str(self._page_size)
+
+	@staticmethod
+	def _last_page(response:dict, page_size:int) -> typing.Optional[int]:
+		"""The last page number, if the response reports a total (`total_devices`, `total_presets`...)"""
+		for key, value in response.items():
+			if str(key).startswith("total_") and str(value).isnumeric():
+				return max((int(value) + page_size - 1) // page_size, 1)
+		return None
+
+	def __iter__(self) -> typing.Iterator[dict]:
+
+		first = self._fetch_page(1)
+		items = list_items(first, self._container, self._item)
+		self._paging_supported = self._is_paged(first, 1)
+		last_page = self._last_page(first, self._page_size)
+
+		# A server ignoring paging has sent the whole list; a short page is the last one
+		if not self._paging_supported or len(items) < self._page_size or last_page == 1:
+			yield from items
+			return
+
+		next_page = 2
+		pending = collections.deque()	# (page number, future) in page order
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(self._prefetch, 1), thread_name_prefix="adderlib-prefetch")
+
+		def request_ahead(count:int):
+			nonlocal next_page
+			while len(pending) < count and (last_page is None or next_page <= last_page):
+				pending.append((next_page, executor.submit(self._fetch_page, next_page)))
+				next_page += 1
+
+		try:
+			# Request the next pages before handing over the current one
+			request_ahead(self._prefetch)
+			yield from items
+
+			while True:
+				request_ahead(1)
+				if not pending:
+					break
+
+				page, future = pending.popleft()
+				response = future.result()
+				items = list_items(response, self._container, self._item)
+
+				if len(items) == self._page_size and self._is_paged(response, page):
+					request_ahead(self._prefetch)
+				else:
+					# That was the end of the list, so pages requested beyond it are not needed
+					last_page = page
+					for _, extra in pending:
+						extra.cancel()
+					pending.clear()
+
+				yield from items
+
+		finally:
+			for _, extra in pending:
+				extra.cancel()
+			executor.shutdown(wait=False)
+
+	@property
+	def pages_fetched(self) -> int:
+		"""Number of pages requested so far"""
+		return self._pages_fetched
+
+	@property
+	def paging_supported(self) -> typing.Optional[bool]:
+		"""Whether the server honoured the paging request, or None before the first page has arrived"""
+		return self._paging_supported
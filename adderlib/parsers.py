@@ -0,0 +1,297 @@
+import abc, collections, typing
+from xml.parsers import expat
+import xmltodict
+
+class ItemStreamParser:
+	"""
+	Incremental parser for API responses which list items, such as `get_devices` or `get_channels`
+	Data is fed in chunks as it arrives.  Each `item` element inside the `container` element is built
+	into a dictionary as soon as its closing tag is seen, and handed back from feed().
+	Items take the same shape as those produced by `xmltodict`:  attributes are prefixed with '@', and empty elements are None.
+	Other elements of the response (`success`, `count_devices`, `errors`, ...) are collected in `header`.
+	"""
+
+	def __init__(self, container:str, item:str):
+		self._container = container
+		self._item = item
+
+		self._parser = expat.ParserCreate()
+		self._parser.buffer_text = True
+		self._parser.StartElementHandler = self._start_element
+		self._parser.EndElementHandler = self._end_element
+		self._parser.CharacterDataHandler = self._character_data
+
+		self._header = {}
+		self._items = collections.deque()
+
+		# Stack of [tag, attributes/children dict, text fragments] for the open elements
+		self._stack = []
+		self._item_count = 0
+
+	def feed(self, data:typing.Union[bytes,str]) -> typing.Iterator[dict]:
+		"""Parse the next chunk of the response and return any items completed by it"""
+		self._parser.Parse(data, False)
+		return self._drain()
+
+	def close(self) -> typing.Iterator[dict]:
+		"""Finish parsing the response and return any remaining items"""
+		self._parser.Parse(b"", True)
+		return self._drain()
+
+	def _drain(self) -> typing.Iterator[dict]:
+		while self._items:
+			yield self._items.popleft()
+
+	def _start_element(self, tag:str, attributes:dict):
+		self._stack.append([tag, {f"@{key}":val for key,val in attributes.items()}, []])
+
+	def _character_data(self, data:str):
+		if self._stack:
+			self._stack[-1][2].append(data)
+
+	def _end_element(self, tag:str):
+		tag, children, text = self._stack.pop()
+		text = "".join(text).strip()
+
+		# Mirror `xmltodict`: text-only elements collapse to their text, empty elements to None
+		if children:
+			if text:
+				children["#text"] = text
+			value = children
+		else:
+			value = text or None
+
+		depth = len(self._stack)
+
+		# api_response > container > item
+		if depth == 2 and tag == self._item and self._stack[1][0] == self._container:
+			self._items.append(value if isinstance(value, dict) else {})
+			self._item_count += 1
+			return
+
+		# Top-level fields are kept for the caller
+		elif depth == 1:
+			self._header[tag] = value
+			return
+
+		elif not depth:
+			return
+
+		parent = self._stack[-1][1]
+		if tag in parent:
+			if not isinstance(parent[tag], list):
+				parent[tag] = [parent[tag]]
+			parent[tag].append(value)
+		else:
+			parent[tag] = value
+
+	@property
+	def header(self) -> dict:
+		"""Fields of the response outside of the item list, parsed so far"""
+		return self._header
+
+	@property
+	def item_count(self) -> int:
+		"""Number of items parsed so far"""
+		return self._item_count
+
+
+class StreamedList:
+	"""
+	The items of an API list response, yielded as they are parsed
+	A response which was not successful yields no items, so once the items have been read, `header` holds the rest of the
+	response (`success`, `errors`, ...) to tell a failed list from an empty one.
+	"""
+
+	__slots__ = ("_items", "_header")
+
+	def __init__(self, items:typing.Iterable[dict], header:dict):
+		"""
+		items -- The items, as they are parsed
+		header:dict -- The fields of the response outside of the list, filled in as they are parsed
+		"""
+		self._items = iter(items)
+		self._header = header
+
+	def __iter__(self) -> "StreamedList":
+		return self
+
+	def __next__(self) -> dict:
+		return next(self._items)
+
+	@property
+	def header(self) -> dict:
+		"""Fields of the response outside of the item list, parsed so far"""
+		return self._header
+
+	@property
+	def succeeded(self) -> typing.Optional[bool]:
+		"""Whether the response was successful, or None if that hasn't been parsed yet"""
+		return None if "success" not in self._header else self._header.get("success") == "1"
+
+
+class ResponseParser(abc.ABC):
+	"""Abstract parser backend which turns API response XML into Python data structures"""
+
+	@abc.abstractmethod
+	def parse(self, data:typing.Union[bytes,str]) -> dict:
+		"""Parse a complete API response, returning the contents of `<api_response>`"""
+		pass
+
+	@abc.abstractmethod
+	def iterparse(self, chunks:typing.Iterable[typing.Union[bytes,str]], container:str, item:str) -> StreamedList:
+		"""Parse an API response as it arrives in chunks, yielding each `item` of the `container` list from a successful response"""
+		pass
+
+
+class XmltodictParser(ResponseParser):
+	"""
+	General-purpose parser backend using `xmltodict`
+	This is the default backend.  Any response can be parsed; list items keep nested elements and attributes.
+	"""
+
+	def parse(self, data:typing.Union[bytes,str]) -> xmltodict.OrderedDict:
+		return xmltodict.parse(data).get("api_response")
+
+	def iterparse(self, chunks:typing.Iterable[typing.Union[bytes,str]], container:str, item:str) -> StreamedList:
+		parser = ItemStreamParser(container, item)
+		return StreamedList(self._iterparse(parser, chunks), parser.header)
+
+	@staticmethod
+	def _iterparse(parser:ItemStreamParser, chunks:typing.Iterable[typing.Union[bytes,str]]) -> typing.Iterator[dict]:
+		for chunk in chunks:
+			for parsed in parser.feed(chunk):
+				if parser.header.get("success") == "1":
+					yield parsed
+
+		for parsed in parser.close():
+			if parser.header.get("success") == "1":
+				yield parsed
+
+
+class RecordParser(ResponseParser):
+	"""
+	Fast parser backend which builds flat record dictionaries straight from the expat event stream
+	Items of the known list responses (`get_devices`, `get_channels`, `get_presets`, `get_servers`, `get_all_c_usb`)
+	become plain `{field: text}` dictionaries, skipping the generic tree building of `xmltodict`.
+	Unlike `xmltodict`, the item list of a parsed response is always a list, even for a single item.
+	Any elements nested within an item are flattened into the item's record.
+	"""
+
+	# Container element -> item element
+	KNOWN_LISTS = {
+		"devices":             "device",
+		"channels":            "channel",
+		"connection_presets":  "connection_preset",
+		"servers":             "server",
+		"c_usb_lan_extenders": "c_usb",
+	}
+
+	def parse(self, data:typing.Union[bytes,str]) -> dict:
+		response = {}
+		for _ in self._run([data], response, self.KNOWN_LISTS, None):
+			pass
+		return response
+
+	def iterparse(self, chunks:typing.Iterable[typing.Union[bytes,str]], container:str, item:str) -> StreamedList:
+		# Records are streamed rather than added to the response, which is left with everything else
+		response = {}
+		return StreamedList(self._iterparse(chunks, response, container, item), response)
+
+	def _iterparse(self, chunks:typing.Iterable[typing.Union[bytes,str]], response:dict, container:str, item:str) -> typing.Iterator[dict]:
+		records = collections.deque()
+
+		for _ in self._run(chunks, response, {container: item}, records):
+			while records:
+				record = records.popleft()
+				if response.get("success") == "1":
+					yield record
+
+	@staticmethod
+	def _run(chunks:typing.Iterable[typing.Union[bytes,str]], response:dict, lists:dict, streamed:typing.Optional[collections.deque]) -> typing.Iterator[None]:
+		"""
+		Drive an expat parser over the chunks, filling `response` with the contents of `<api_response>`
+		If `streamed` is given, records of the `lists` are appended there instead of to the response.
+		The parse advances by one chunk each time this generator is iterated.
+		"""
+
+		parser = expat.ParserCreate()
+		parser.buffer_text = True
+
+		# Parser state, kept in closures for speed
+		path  = []	# Names of the open elements outside of records
+		nodes = []	# Dictionaries of the open elements outside of records
+		text  = []
+		record = None
+		record_item = None
+
+		def start_element(tag, attributes):
+			nonlocal record, record_item
+			text.clear()
+
+			if record is not None:
+				return
+
+			# The root element fills the response directly
+			if not path:
+				path.append(tag)
+				nodes.append(response)
+				return
+
+			# Start of a record in a known list
+			if len(path) == 2 and lists.get(path[1]) == tag:
+				record = {f"@{key}":val for key,val in attributes.items()}
+				record_item = tag
+				return
+
+			path.append(tag)
+			nodes.append({f"@{key}":val for key,val in attributes.items()})
+
+		def end_element(tag):
+			nonlocal record, record_item
+
+			if record is not None:
+				if tag != record_item:
+					record[tag] = "".join(text).strip() or None
+				elif streamed is not None:
+					streamed.append(record)
+					record = record_item = None
+				else:
+					nodes[-1].setdefault(record_item, []).append(record)
+					record = record_item = None
+				text.clear()
+				return
+
+			path.pop()
+			node = nodes.pop()
+			value = "".join(text).strip()
+			text.clear()
+
+			if not path:
+				return
+
+			# Mirror `xmltodict`: text-only elements collapse to their text, empty elements to None
+			if node:
+				if value:
+					node["#text"] = value
+				value = node
+			else:
+				value = value or None
+
+			parent = nodes[-1]
+			if tag in parent:
+				if not isinstance(parent[tag], list):
+					parent[tag] = [parent[tag]]
+				parent[tag].append(value)
+			else:
+				parent[tag] = value
+
+		parser.StartElementHandler = start_element
+		parser.EndElementHandler = end_element
+		parser.CharacterDataHandler = text.append
+
+		for chunk in chunks:
+			parser.Parse(chunk, False)
+			yield
+		parser.Parse(b"", True)
+		yield
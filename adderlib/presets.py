@@ -1,8 +1,9 @@
 import enum, dataclasses
 from .devices import AdderReceiver
 from .channels import AdderChannel
+from .records import CompactRecord, decode_enum
 
-class AdderPreset:
+class AdderPreset(CompactRecord):
 	"""Adderlink Preset"""
 
 	@dataclasses.dataclass
@@ -26,82 +27,81 @@ class AdderPreset:
 		ENABLED  = "enabled"  # Enabled
 		HIDDEN   = "hidden"   # Never allowed
 
-	def __init__(self, properties:dict):
-		self._extended = {key: val for key,val in properties.items()}
+	__slots__ = (
+		"_id", "_name", "_description", "_pair_count", "_pair_problem_count", "_active", "_connected_rx_count",
+		"_view_button", "_shared_button", "_control_button", "_exclusive_button"
+	)
+
+	INTERNED = frozenset({"cp_description", "cp_active", "view_button", "shared_button", "control_button", "exclusive_button"})
+
+	@staticmethod
+	def _decode_count(value) -> int:
+		return int(value) if str(value).isnumeric() else 0
+
+	def _decode(self, record:dict):
+		self._id = record.get("cp_id","")
+		self._name = record.get("cp_name","")
+		self._description = record.get("cp_description","")
+		self._pair_count = self._decode_count(record.get("cp_pairs",""))
+		self._pair_problem_count = self._decode_count(record.get("problem_cp_pairs",""))
+		self._active = decode_enum(self.ActiveState, record.get("cp_active",""), self.ActiveState.UNKNOWN)
+		self._connected_rx_count = self._decode_count(record.get("connected_rx_count",""))
+		self._view_button = decode_enum(self.ButtonState, record.get("view_button"), self.ButtonState.UNKNOWN)
+		self._shared_button = decode_enum(self.ButtonState, record.get("shared_button"), self.ButtonState.UNKNOWN)
+		self._control_button = decode_enum(self.ButtonState, record.get("control_button"), self.ButtonState.UNKNOWN)
+		self._exclusive_button = decode_enum(self.ButtonState, record.get("exclusive_button"), self.ButtonState.UNKNOWN)
 	
 	@property
 	def id(self) -> str:
 		"""Preset ID"""
-		return self._extended.get("cp_id","")
+		return self._id
 	
 	@property
 	def name(self) -> str:
 		"""Preset name"""
-		return self._extended.get("cp_name","")
+		return self._name
 	
 	@property
 	def description(self) -> str:
 		"""Preset description"""
-		return self._extended.get("cp_description","")
+		return self._description
 	
 	@property
 	def pair_count(self) -> int:
 		"""Number of valid channel/receiver pairs"""
-		cp_pairs = self._extended.get("cp_pairs","")
-		return int(cp_pairs) if str(cp_pairs).isnumeric() else 0
+		return self._pair_count
 	
 	@property
 	def pair_problem_count(self) -> int:
 		"""Number of problematic channel/receiver pairs"""
-		problem_cp_pairs = self._extended.get("problem_cp_pairs","")
-		return int(problem_cp_pairs) if str(problem_cp_pairs).isnumeric() else 0
+		return self._pair_problem_count
 	
 	@property
 	def currently_active(self) -> ActiveState:
 		"""Determines if any of the channel/receiver pairs are currently active"""
-		try:
-			return self.ActiveState(self._extended.get("cp_active",""))
-		except ValueError:
-			return self.ActiveState.UNKNOWN
+		return self._active
 
 	@property
 	def connected_rx_count(self) -> int:
 		"""The number of receivers already connected to this preset"""
-		rx_count = self._extended.get("connected_rx_count","")
-		return int(rx_count) if str(rx_count).isnumeric() else 0
+		return self._connected_rx_count
 
 	@property
 	def view_button(self) -> ButtonState:
 		"""Indicates the state of the video-only view button"""
-		state = self._extended.get("view_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._view_button
 	
 	@property
 	def shared_button(self) -> ButtonState:
 		"""Indicates the state of the shared view button"""
-		state = self._extended.get("shared_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._shared_button
 
 	@property
 	def control_button(self) -> ButtonState:
 		"""Indicates the state of the full-control button"""
-		state = self._extended.get("control_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
+		return self._control_button
 
 	@property
 	def exclusive_button(self) -> ButtonState:
 		"""Indicates the state of the video-only view button"""
-		state = self._extended.get("exclusive_button")
-		try:
-			return self.ButtonState(state)
-		except ValueError:
-			return self.ButtonState.UNKNOWN
\ No newline at end of file
+		return self._exclusive_button
\ No newline at end of file
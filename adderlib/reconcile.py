@@ -0,0 +1,213 @@
+import dataclasses, time, typing
+from .channels import AdderChannel
+from .devices import AdderReceiver
+from .presets import AdderPreset
+from .relations import ChannelGraph
+from .bulk import BulkResult
+
+
+@dataclasses.dataclass(frozen=True)
+class DisconnectResult:
+	"""The outcome of disconnecting one receiver"""
+
+	receiver:AdderReceiver
+	error:typing.Optional[Exception]	# None if it succeeded
+	latency:float						# Seconds the request took
+
+	@property
+	def succeeded(self) -> bool:
+		"""Whether the receiver was disconnected"""
+		return self.error is None
+
+
+@dataclasses.dataclass(frozen=True)
+class ReconcileResult(BulkResult):
+	"""The outcomes of carrying out a plan: a DisconnectResult for each disconnection, then a PairResult for each connection made"""
+
+	skipped:typing.Tuple[AdderPreset.Pair, ...] = ()	# Connections not attempted, after the disconnections they waited on failed
+
+	@property
+	def ok(self) -> bool:
+		"""Whether every operation was made, and succeeded"""
+		return not self.skipped and super().ok
+
+
+@dataclasses.dataclass(frozen=True)
+class RoutingPlan:
+	"""
+	The fewest operations to bring the receivers from their live routing to the desired routing
+	All the disconnections go in one request, first.  Connections follow in waves: a wave only switches receivers onto channels
+	which the waves before it have freed up, so the connections within a wave can be made in any order.
+	"""
+
+	disconnect:typing.Tuple[AdderReceiver, ...]
+	connect:typing.Tuple[typing.Tuple[AdderPreset.Pair, ...], ...]	# Waves of connections, in the order they must be made
+	unchanged:typing.Tuple[AdderReceiver, ...]							# Receivers already as desired
+	mode:AdderChannel.ConnectionMode
+
+	@property
+	def connections(self) -> typing.Tuple[AdderPreset.Pair, ...]:
+		"""All the connections to make, in order"""
+		return tuple(pair for wave in self.connect for pair in wave)
+
+	@property
+	def call_count(self) -> int:
+		"""Number of API requests the plan will take"""
+		return (1 if self.disconnect else 0) + len(self.connections)
+
+	@property
+	def is_empty(self) -> bool:
+		"""Whether the routing is already as desired"""
+		return not self.disconnect and not self.connect
+
+	def describe(self) -> typing.List[str]:
+		"""The plan as lines of text, such as for a dry run"""
+
+		lines = []
+		if self.disconnect:
+			lines.append(f"Disconnect {', '.join(rx.name or rx.id for rx in self.disconnect)}")
+		for number, wave in enumerate(self.connect, 1):
+			for pair in wave:
+				lines.append(f"Connect {pair.receiver.name or pair.receiver.id} to {pair.channel.name or pair.channel.id}" + (f" (wave {number})" if len(self.connect) > 1 else ""))
+		lines.append(f"{self.call_count} API call{'' if self.call_count == 1 else 's'}, {len(self.unchanged)} receiver{'' if len(self.unchanged) == 1 else 's'} unchanged")
+		return lines
+
+	def __str__(self) -> str:
+		return "\n".join(self.describe())
+
+
+class RoutingReconciler:
+	"""
+	Brings the routing of receivers to channels in line with a desired state
+	The desired state maps receivers (or their IDs) to channels (or their names), or to None for disconnected.  Receivers
+	left out of it are left alone.  The live state is fetched once, and compared with the desired state to plan the fewest
+	operations needed.
+	"""
+
+	# Modes in which a channel can only be used by one receiver at a time, so must be let go of before another can connect
+	EXCLUSIVE_MODES = frozenset({AdderChannel.ConnectionMode.EXCLUSIVE, AdderChannel.ConnectionMode.PRIVATE})
+
+	def __init__(self, api):
+		"""api:AdderAPI -- A logged-in API to read and change the routing with"""
+		self._api = api
+
+	def _resolve(self, desired:typing.Mapping, graph:ChannelGraph) -> typing.Dict[str, typing.Tuple[AdderReceiver, typing.Optional[AdderChannel]]]:
+		"""Match the desired state up with live receivers and channels, by receiver ID"""
+
+		receivers = {rx.id: rx for rx in graph.receivers}
+		channels = {ch.id: ch for ch in graph.channels}
+		resolved = {}
+
+		for receiver, channel in desired.items():
+			rx_id = receiver.id if isinstance(receiver, AdderReceiver) else str(receiver)
+			if rx_id not in receivers:
+				raise ValueError(f"Receiver {rx_id} was not found")
+
+			if isinstance(channel, AdderChannel):
+				if channel.id not in channels:
+					raise ValueError(f"Channel {channel.name or channel.id} was not found")
+				channel = channels[channel.id]
+			elif channel is not None:
+				name, channel = channel, graph.channel_named(channel)
+				if channel is None:
+					raise ValueError(f"Channel '{name}' was not found")
+
+			resolved[rx_id] = (receivers[rx_id], channel)
+
+		return resolved
+
+	def plan(self, desired:typing.Mapping[typing.Union[AdderReceiver, str], typing.Union[AdderChannel, str, None]], mode:AdderChannel.ConnectionMode=AdderChannel.ConnectionMode.SHARED) -> RoutingPlan:
+		"""Fetch the live routing, and plan the operations to reach the desired routing"""
+
+		graph = ChannelGraph(self._api.getReceivers(), self._api.getChannels(), ())
+		disconnect, connect, unchanged = [], {}, []
+
+		for rx_id, (rx, channel) in self._resolve(desired, graph).items():
+			current = graph.channel_for(rx) if rx.is_connected else None
+
+			if channel is None:
+				(disconnect if rx.is_connected else unchanged).append(rx)
+			elif current is not None and current.id == channel.id:
+				unchanged.append(rx)
+			else:
+				connect[rx_id] = (rx, channel, current)
+
+		waves, freed = self._order(connect) if mode in self.EXCLUSIVE_MODES else ([list(connect)], [])
+		return RoutingPlan(
+			disconnect=tuple(disconnect + freed),
+			connect=tuple(tuple(AdderPreset.Pair(connect[rx_id][1], connect[rx_id][0]) for rx_id in wave) for wave in waves if wave),
+			unchanged=tuple(unchanged),
+			mode=mode
+		)
+
+	@staticmethod
+	def _order(connect:dict) -> typing.Tuple[typing.List[typing.List[str]], typing.List[AdderReceiver]]:
+		"""
+		Put connections in waves, so no receiver connects to a channel before the receivers leaving it have gone
+		Receivers swapping channels between them would wait on each other forever, so one of them must be disconnected first.
+		Returns the waves of receiver IDs, and the receivers to disconnect first.
+		"""
+
+		# Receivers still holding each channel they're about to leave
+		leaving = {}
+		for rx_id, (_, _, current) in connect.items():
+			if current is not None:
+				leaving.setdefault(current.id, set()).add(rx_id)
+
+		waiting_on = {rx_id: set(leaving.get(channel.id, ())) - {rx_id} for rx_id, (_, channel, _) in connect.items()}
+		waves, freed = [], []
+
+		while waiting_on:
+			wave = sorted(rx_id for rx_id, blockers in waiting_on.items() if not blockers)
+			if not wave:
+				# A cycle: free up one receiver's channel by disconnecting it along with the others, then carry on
+				rx_id = min(waiting_on)
+				freed.append(connect[rx_id][0])
+				for blockers in waiting_on.values():
+					blockers.discard(rx_id)
+				continue
+
+			waves.append(wave)
+			for rx_id in wave:
+				del waiting_on[rx_id]
+			for blockers in waiting_on.values():
+				blockers.difference_update(wave)
+
+		return waves, freed
+
+	def apply(self, plan:RoutingPlan, *, force:bool=False, max_concurrency:int=8) -> ReconcileResult:
+		"""
+		Carry out a plan: the disconnections in one request, then each wave of connections in parallel
+		In exclusive modes, connections may be waiting on channels the disconnections free up, so if they fail, no connections
+		are attempted and all are reported as skipped.
+		"""
+
+		started = time.perf_counter()
+		results = []
+
+		if plan.disconnect:
+			request_started = time.perf_counter()
+			try:
+				self._api.disconnectFromChannel(plan.disconnect, force)
+			except Exception as e:
+				error = e
+			else:
+				error = None
+			latency = time.perf_counter() - request_started
+			results.extend(DisconnectResult(rx, error, latency) for rx in plan.disconnect)
+
+			if error is not None and plan.mode in self.EXCLUSIVE_MODES:
+				return ReconcileResult(tuple(results), time.perf_counter() - started, skipped=plan.connections)
+
+		for wave in plan.connect:
+			results.extend(self._api.connectMany(wave, plan.mode, max_concurrency=max_concurrency))
+
+		return ReconcileResult(tuple(results), time.perf_counter() - started)
+
+	def reconcile(self, desired:typing.Mapping[typing.Union[AdderReceiver, str], typing.Union[AdderChannel, str, None]], mode:AdderChannel.ConnectionMode=AdderChannel.ConnectionMode.SHARED, *, dry_run:bool=False, force:bool=False, max_concurrency:int=8) -> typing.Tuple[RoutingPlan, typing.Optional[ReconcileResult]]:
+		"""Plan and carry out the operations to reach the desired routing.  With `dry_run`, only plan them."""
+
+		plan = self.plan(desired, mode)
+		if dry_run or plan.is_empty:
+			return plan, None
+		return plan, self.apply(plan, force=force, max_concurrency=max_concurrency)
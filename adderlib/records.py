@@ -0,0 +1,129 @@
+import ipaddress, socket, typing
+from datetime import datetime
+
+# Upper bounds on the shared tables, so a long-running program can't grow them without limit
+MAX_INTERNED = 65536
+MAX_SHAPES   = 1024
+
+_interned = {}	# string -> the one copy of it handed out
+_shapes = {}	# tuple of record keys -> the one copy of it handed out
+_members = {}	# enum type -> {value: member}
+
+def intern(value):
+	"""Return a shared copy of a string, so records repeating a value hold one object between them"""
+
+	if not isinstance(value, str):
+		return value
+
+	shared = _interned.get(value)
+	if shared is None:
+		# Unlike `sys.intern`, entries here can be let go of
+		if len(_interned) >= MAX_INTERNED:
+			_interned.clear()
+		shared = _interned.setdefault(value, value)
+	return shared
+
+def _shared_keys(keys:tuple) -> tuple:
+	"""Return a shared copy of a record's key tuple, so records of the same shape hold one tuple between them"""
+
+	shared = _shapes.get(keys)
+	if shared is None:
+		if len(_shapes) >= MAX_SHAPES:
+			_shapes.clear()
+		shared = _shapes.setdefault(keys, keys)
+	return shared
+
+# Decoders for API values, which fall back to a default rather than raise
+def decode_int(value, default:int=0) -> int:
+	"""Decode an integer"""
+	try:
+		return int(value)
+	except (TypeError, ValueError):
+		return default
+
+def decode_flag(value) -> bool:
+	"""Decode a 0/1 flag"""
+	return decode_int(value, 0) > 0
+
+def decode_ip(value) -> typing.Union[ipaddress.IPv4Address, ipaddress.IPv6Address, None]:
+	"""Decode an IP address, or None if there isn't one"""
+	if not value:
+		return None
+	try:
+		# Unpacking IPv4 addresses ourselves is several times quicker than having `ipaddress` parse them
+		return ipaddress.IPv4Address(socket.inet_pton(socket.AF_INET, value))
+	except (OSError, TypeError):
+		pass
+	try:
+		return ipaddress.ip_address(value)
+	except ValueError:
+		return None
+
+def decode_datetime(value) -> typing.Optional[datetime]:
+	"""Decode a date/time such as 2012-07-13 22:17:22, or None if there isn't one"""
+	try:
+		return datetime.fromisoformat(value) if value else None
+	except (TypeError, ValueError):
+		return None
+
+def decode_enum(enum_type, value, default):
+	"""Decode an enum member by value, or the default if there is no such member"""
+	members = _members.get(enum_type)
+	if members is None:
+		members = _members[enum_type] = {member.value: member for member in enum_type}
+	try:
+		return members.get(value, default)
+	except TypeError:
+		return default
+
+
+class CompactRecord:
+	"""
+	Base for entities which decode their API record once, into slots
+	Subclasses decode the fields they know in `_decode()`, so properties need not parse anything.  The record itself is kept as
+	a tuple of values beside a key tuple shared by all records of the same shape, and is rebuilt as `_extended` on demand.
+	"""
+
+	__slots__ = ("_keys", "_values", "_fingerprint")
+
+	# Keys whose values tend to repeat across records, such as firmware versions and locations
+	INTERNED:typing.FrozenSet[str] = frozenset()
+
+	def __init__(self, properties:dict):
+		# The record is decoded here and never kept as a dict, so there's no need to copy it
+		interned = self.INTERNED
+		record = {key: intern(val) if key in interned else val for key,val in properties.items()}
+
+		self._keys = _shared_keys(tuple(record))
+		self._values = tuple(record.values())
+		self._fingerprint = None
+		self._decode(record)
+
+	def _decode(self, record:dict):
+		"""Decode the fields of a record into slots"""
+
+	@property
+	def fingerprint(self) -> int:
+		"""
+		A hash of the record as received, worked out on first use
+		Records with different fingerprints certainly differ; records with the same fingerprint are, to all intents, identical.
+		"""
+
+		if self._fingerprint is None:
+			# Attributes such as @item give the record's position in the list, which isn't part of the record itself.
+			# The parser puts attributes ahead of elements, so they can be sliced off.
+			start = 0
+			while start < len(self._keys) and self._keys[start][:1] == "@":
+				start += 1
+			content = (self._keys[start:], self._values[start:])
+			try:
+				self._fingerprint = hash(content)
+			except TypeError:
+				# Nested elements come through as dicts or lists, which can't be hashed directly
+				self._fingerprint = hash(repr(content))
+		return self._fingerprint
+
+	@property
+	def _extended(self) -> dict:
+		"""The record as received from the API, including any fields not decoded"""
+		return dict(zip(self._keys, self._values))
@@ -0,0 +1,82 @@
+import typing
+from .devices import AdderReceiver, AdderTransmitter
+from .channels import AdderChannel
+from .inventory import AdderInventory
+
+class ChannelGraph:
+	"""
+	Receivers, channels and transmitters joined up in advance
+	Receivers are joined to channels by the name of their last known channel, and channels to the transmitters whose IDs they
+	list for video, audio, USB and serial.  Every lookup is then a dictionary access, with no further requests to the AIM.
+	"""
+
+	def __init__(self, receivers:typing.Iterable[AdderReceiver], channels:typing.Iterable[AdderChannel], transmitters:typing.Iterable[AdderTransmitter]):
+		"""Join lists of receivers, channels and transmitters, each fetched once"""
+
+		self._receivers = tuple(receivers)
+		self._channels = tuple(channels)
+		self._transmitters = tuple(transmitters)
+
+		# Channel names needn't be unique, so the first channel listed with a name is the one joined to
+		self._channel_by_name = {}
+		for channel in self._channels:
+			self._channel_by_name.setdefault(channel.name, channel)
+		tx_by_id = {tx.id: tx for tx in self._transmitters}
+
+		self._channel_of = {}		# receiver id -> channel
+		self._receivers_on = {}		# channel id -> [receiver]
+		for rx in self._receivers:
+			channel = self._channel_by_name.get(rx.channel_name) if rx.channel_name else None
+			if channel is not None:
+				self._channel_of[rx.id] = channel
+				self._receivers_on.setdefault(channel.id, []).append(rx)
+
+		self._transmitters_of = {}	# channel id -> {role: transmitter}
+		self._channels_using = {}	# transmitter id -> [channel]
+		for channel in self._channels:
+			roles = {role: tx_by_id[tx_id] for role, tx_id in channel.device_ids.items() if tx_id in tx_by_id}
+			self._transmitters_of[channel.id] = roles
+
+			for tx in {tx.id: tx for tx in roles.values()}.values():
+				self._channels_using.setdefault(tx.id, []).append(channel)
+
+	@classmethod
+	def from_inventory(cls, inventory:AdderInventory) -> "ChannelGraph":
+		"""Join the receivers, channels and transmitters of an inventory snapshot"""
+		return cls(inventory.receivers, inventory.channels, inventory.transmitters)
+
+	def channel_for(self, receiver:AdderReceiver) -> typing.Optional[AdderChannel]:
+		"""The last known channel of a receiver"""
+		return self._channel_of.get(receiver.id)
+
+	def receivers_on(self, channel:AdderChannel, *, connected_only:bool=False) -> typing.Tuple[AdderReceiver, ...]:
+		"""Receivers whose last known channel is this one, optionally only those still connected"""
+		receivers = self._receivers_on.get(channel.id, ())
+		return tuple(rx for rx in receivers if rx.is_connected) if connected_only else tuple(receivers)
+
+	def transmitters_for(self, channel:AdderChannel) -> typing.Dict[str, AdderTransmitter]:
+		"""The transmitters a channel uses, by role: video1, video2, audio, usb and serial"""
+		return dict(self._transmitters_of.get(channel.id, {}))
+
+	def channels_using(self, transmitter:AdderTransmitter) -> typing.Tuple[AdderChannel, ...]:
+		"""Channels which use a transmitter in any role"""
+		return tuple(self._channels_using.get(transmitter.id, ()))
+
+	def channel_named(self, name:str) -> typing.Optional[AdderChannel]:
+		"""The channel with the given name"""
+		return self._channel_by_name.get(name)
+
+	@property
+	def receivers(self) -> typing.Tuple[AdderReceiver, ...]:
+		"""The receivers joined"""
+		return self._receivers
+
+	@property
+	def channels(self) -> typing.Tuple[AdderChannel, ...]:
+		"""The channels joined"""
+		return self._channels
+
+	@property
+	def transmitters(self) -> typing.Tuple[AdderTransmitter, ...]:
+		"""The transmitters joined"""
+		return self._transmitters
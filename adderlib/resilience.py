@@ -0,0 +1,163 @@
+import collections, concurrent.futures, dataclasses, random, threading, time, typing, urllib.parse
+from .urlhandlers import UrlHandler
+
+@dataclasses.dataclass(frozen=True)
+class ResilienceStats:
+	"""Usage counters for a ResilientHandler"""
+	calls:int			# Read calls made through the handler
+	retries:int			# Attempts made again after one failed
+	hedges:int			# Duplicate requests sent while the first was slow
+	hedges_won:int		# Hedged calls answered by the duplicate first
+	failures:int		# Read calls which failed however many times they were tried
+
+
+class ResilientHandler(UrlHandler):
+	"""
+	URL handler which retries and hedges read calls made through another URL handler
+	A read call which fails is made again after a jittered, exponentially growing wait.  With `hedge`, a read call still unanswered
+	after the `hedge_quantile` of recent response times is sent again alongside, and whichever answers first is used.
+	Calls which change data on the AIM are passed straight through: they are never retried or hedged, as they may have been made.
+	"""
+
+	def __init__(self, handler:UrlHandler, *, retries:int=2, backoff:float=0.1, max_backoff:float=2.0, retry_on:typing.Tuple[typing.Type[Exception], ...]=(Exception,), hedge:bool=False, hedge_quantile:float=0.95, hedge_delay:float=0.5, min_hedge_delay:float=0.01, window:int=200, min_samples:int=20, max_workers:int=8):
+		"""
+		Wrap a URL handler with retries and hedging for read calls
+		handler:UrlHandler -- The URL handler which makes the actual calls
+		retries:int -- Most times to make a failed read call again
+		backoff:float -- Most seconds to wait before the first retry, doubling for each retry after it.  The wait is a random fraction of it.
+		max_backoff:float -- Most seconds to wait before any retry
+		retry_on:tuple -- Exceptions worth retrying after
+		hedge:bool -- Whether to send a duplicate of a read call that is slow to be answered
+		hedge_quantile:float -- Fraction of recent read calls which should be answered before a duplicate is sent
+		hedge_delay:float -- Seconds to wait before sending a duplicate, until there are `min_samples` response times to go on
+		min_hedge_delay:float -- Fewest seconds to wait before sending a duplicate
+		window:int -- Number of recent response times to keep, per method
+		min_samples:int -- Response times needed for a method before its quantile is used
+		max_workers:int -- Most requests to have going at once for hedged calls
+		"""
+
+		if not isinstance(handler, UrlHandler):
+			raise ValueError(f"URL handler {type(handler)} is not an instance of UrlHandler")
+		if int(retries) < 0:
+			raise ValueError("`retries` must not be negative")
+		if backoff < 0 or max_backoff < 0 or hedge_delay < 0 or min_hedge_delay < 0:
+			raise ValueError("Waits must not be negative")
+		if not 0 < hedge_quantile < 1:
+			raise ValueError("`hedge_quantile` must be between 0 and 1")
+		if int(window) < 1 or int(min_samples) < 1 or int(max_workers) < 2:
+			raise ValueError("`window` and `min_samples` must be at least 1, and `max_workers` at least 2")
+
+		self._handler = handler
+		self._retries = int(retries)
+		self._backoff = float(backoff)
+		self._max_backoff = float(max_backoff)
+		self._retry_on = tuple(retry_on)
+		self._hedge = bool(hedge)
+		self._hedge_quantile = float(hedge_quantile)
+		self._hedge_delay = float(hedge_delay)
+		self._min_hedge_delay = float(min_hedge_delay)
+		self._window = int(window)
+		self._min_samples = int(min_samples)
+		self._max_workers = int(max_workers)
+
+		self._lock = threading.Lock()
+		self._latencies = collections.defaultdict(lambda: collections.deque(maxlen=self._window))	# method -> seconds
+		self._executor = None
+
+		self._calls = 0
+		self._retried = 0
+		self._hedges = 0
+		self._hedges_won = 0
+		self._failures = 0
+
+	def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Make a call, retrying and hedging it if it only reads data"""
+
+		if not self.is_read_call(args):
+			return self._handler.api_call(server_address, args)
+
+		with self._lock:
+			self._calls += 1
+
+		for attempt in range(self._retries + 1):
+			try:
+				return self._hedged_call(server_address, args) if self._hedge else self._timed_call(server_address, args)
+			except self._retry_on:
+				if attempt == self._retries:
+					with self._lock:
+						self._failures += 1
+					raise
+			# "Full jitter": spread out the retries of callers which failed together
+			time.sleep(random.uniform(0, min(self._max_backoff, self._backoff * 2 ** attempt)))
+			with self._lock:
+				self._retried += 1
+
+	def _timed_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Make a call, noting how long it took to answer"""
+
+		started = time.monotonic()
+		response = self._handler.api_call(server_address, args)
+		with self._lock:
+			self._latencies[args.get("method","")].append(time.monotonic() - started)
+		return response
+
+	def _hedged_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Make a call, and again alongside if the first is slow.  The first answer wins; the other is left to finish."""
+
+		executor = self._get_executor()
+		first = executor.submit(self._timed_call, server_address, args)
+		try:
+			return first.result(timeout=self.hedge_delay(args.get("method","")))
+		except concurrent.futures.TimeoutError:
+			pass
+
+		second = executor.submit(self._timed_call, server_address, args)
+		with self._lock:
+			self._hedges += 1
+
+		pending = {first, second}
+		while True:
+			done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+			# Prefer an answer to an error, while the other may yet give one
+			for future in done:
+				if future.exception() is None:
+					if future is second:
+						with self._lock:
+							self._hedges_won += 1
+					return future.result()
+			if not pending:
+				raise first.exception()
+
+	def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+		with self._lock:
+			if self._executor is None:
+				self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="adderlib-hedge")
+			return self._executor
+
+	def hedge_delay(self, method:str) -> float:
+		"""Seconds a read call of a method waits for an answer before a duplicate is sent"""
+
+		with self._lock:
+			latencies = sorted(self._latencies.get(method, ()))
+		if len(latencies) < self._min_samples:
+			return max(self._hedge_delay, self._min_hedge_delay)
+		return max(latencies[int(self._hedge_quantile * (len(latencies) - 1))], self._min_hedge_delay)
+
+	def close(self):
+		"""Stop the threads used for hedged calls, once any in progress have finished"""
+
+		with self._lock:
+			executor, self._executor = self._executor, None
+		if executor is not None:
+			executor.shutdown(wait=True)
+
+	@property
+	def stats(self) -> ResilienceStats:
+		"""Retry and hedging counters"""
+		with self._lock:
+			return ResilienceStats(calls=self._calls, retries=self._retried, hedges=self._hedges, hedges_won=self._hedges_won, failures=self._failures)
+
+	@property
+	def handler(self) -> UrlHandler:
+		"""The wrapped URL handler"""
+		return self._handler
@@ -0,0 +1,171 @@
+import concurrent.futures, dataclasses, threading, time, typing
+from .devices import AdderDevice, AdderReceiver, AdderTransmitter
+
+
+@dataclasses.dataclass(frozen=True)
+class WaveResult:
+	"""How one wave of a rolling reboot went"""
+
+	devices:typing.Tuple[AdderDevice, ...]
+	started:float					# Seconds into the rollout the wave was started
+	reboot_time:float				# Seconds the reboot request took
+	recovery_time:float				# Seconds from the reboot request until every device was back online, or the wave gave up
+	error:typing.Optional[Exception]	# The error from the reboot request, if it failed
+	not_recovered:typing.Tuple[AdderDevice, ...]	# Devices which didn't come back online in time
+
+	@property
+	def ok(self) -> bool:
+		"""Whether every device in the wave rebooted and came back online"""
+		return self.error is None and not self.not_recovered
+
+	@property
+	def duration(self) -> float:
+		"""Seconds the wave took, from start to finish"""
+		return self.reboot_time + self.recovery_time
+
+
+@dataclasses.dataclass(frozen=True)
+class RolloutResult:
+	"""How a rolling reboot went, wave by wave"""
+
+	waves:typing.Tuple[WaveResult, ...]
+	skipped:typing.Tuple[AdderDevice, ...]	# Devices in waves which weren't started, after an earlier wave failed
+	wall_time:float
+
+	@property
+	def ok(self) -> bool:
+		"""Whether every device was rebooted and came back online"""
+		return not self.skipped and all(wave.ok for wave in self.waves)
+
+	@property
+	def failed(self) -> typing.Tuple[WaveResult, ...]:
+		"""The waves which didn't go to plan"""
+		return tuple(wave for wave in self.waves if not wave.ok)
+
+
+class _StatusBoard:
+	"""Device statuses, fetched at most once per interval however many waves are waiting on them"""
+
+	def __init__(self, api, interval:float, transmitters:bool, receivers:bool):
+		self._api = api
+		self._interval = interval
+		self._lists = [get for get, wanted in ((api.getTransmitters, transmitters), (api.getReceivers, receivers)) if wanted]
+		self._statuses = {}
+		self._fetched = None
+		self._lock = threading.Lock()
+
+	def statuses(self) -> typing.Dict[str, AdderDevice.DeviceStatus]:
+		with self._lock:
+			if self._fetched is None or time.monotonic() - self._fetched >= self._interval:
+				try:
+					self._statuses = {device.id: device.status for get in self._lists for device in get()}
+				except Exception:
+					# The AIM may be busy with devices coming back; try again next time round
+					pass
+				self._fetched = time.monotonic()
+			return self._statuses
+
+
+class RollingReboot:
+	"""
+	Reboots devices a wave at a time, waiting for each wave to come back online before starting the next
+	Up to `concurrency` waves may be rebooting at once.  Device status is polled once per interval for all the waves waiting,
+	and if a wave fails to come back the rest are called off.
+	"""
+
+	def __init__(self, api, *, wave_size:int=10, concurrency:int=1, poll_interval:float=5.0, wave_timeout:float=600.0, min_downtime:float=10.0, stop_on_failure:bool=True):
+		"""
+		api:AdderAPI -- A logged-in API to reboot devices with
+		wave_size:int -- Most devices to reboot at once in a wave
+		concurrency:int -- Most waves to have rebooting at once
+		poll_interval:float -- Seconds between checks on device status
+		wave_timeout:float -- Seconds to wait for a wave to come back online before giving up on it
+		min_downtime:float -- Seconds after a reboot before a device reporting ONLINE is believed, in case it was polled before it went down
+		stop_on_failure:bool -- Whether to call off the waves not yet started if one fails
+		"""
+
+		if int(wave_size) < 1 or int(concurrency) < 1:
+			raise ValueError("Wave size and concurrency must be at least 1")
+		if poll_interval <= 0 or wave_timeout <= 0 or min_downtime < 0:
+			raise ValueError("Poll interval and wave timeout must be positive, and minimum downtime must not be negative")
+
+		self._api = api
+		self._wave_size = int(wave_size)
+		self._concurrency = int(concurrency)
+		self._poll_interval = float(poll_interval)
+		self._wave_timeout = float(wave_timeout)
+		self._min_downtime = float(min_downtime)
+		self._stop_on_failure = bool(stop_on_failure)
+
+	def waves(self, devices:typing.Iterable[AdderDevice]) -> typing.List[typing.Tuple[AdderDevice, ...]]:
+		"""Split devices into waves, in the order given"""
+		devices = list({device.id: device for device in devices}.values())
+		return [tuple(devices[start:start+self._wave_size]) for start in range(0, len(devices), self._wave_size)]
+
+	def _wait_online(self, devices:typing.Tuple[AdderDevice, ...], board:_StatusBoard, rebooted_at:float) -> typing.Tuple[AdderDevice, ...]:
+		"""Wait until every device has been down and is back online.  Returns those which aren't by the timeout."""
+
+		waiting = {device.id: device for device in devices}
+		been_down = set()
+
+		while True:
+			statuses = board.statuses()
+			believable = time.monotonic() - rebooted_at >= self._min_downtime
+
+			for id in list(waiting):
+				status = statuses.get(id, AdderDevice.DeviceStatus.UNKNOWN)
+				if status is not AdderDevice.DeviceStatus.ONLINE:
+					been_down.add(id)
+				elif id in been_down or believable:
+					del waiting[id]
+
+			if not waiting or time.monotonic() - rebooted_at >= self._wave_timeout:
+				return tuple(waiting.values())
+			time.sleep(self._poll_interval)
+
+	def run(self, devices:typing.Iterable[AdderDevice]) -> RolloutResult:
+		"""Reboot the devices in waves, and report how each wave went"""
+
+		waves = self.waves(devices)
+		all_devices = [device for wave in waves for device in wave]
+		board = _StatusBoard(
+			self._api, self._poll_interval,
+			transmitters=any(isinstance(device, AdderTransmitter) for device in all_devices),
+			receivers=any(isinstance(device, AdderReceiver) for device in all_devices)
+		)
+
+		started = time.monotonic()
+		failed = threading.Event()
+
+		def reboot(wave:typing.Tuple[AdderDevice, ...]) -> typing.Optional[WaveResult]:
+			if failed.is_set():
+				return None
+
+			wave_started = time.monotonic()
+			try:
+				self._api.rebootDevices(wave)
+			except Exception as e:
+				error, not_recovered = e, wave
+			else:
+				error, not_recovered = None, ()
+			rebooted_at = time.monotonic()
+
+			if error is None:
+				not_recovered = self._wait_online(wave, board, rebooted_at)
+
+			result = WaveResult(wave, wave_started - started, rebooted_at - wave_started, time.monotonic() - rebooted_at, error, not_recovered)
+			if not result.ok and self._stop_on_failure:
+				failed.set()
+			return result
+
+		if not waves:
+			return RolloutResult((), (), 0.0)
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=min(self._concurrency, len(waves)), thread_name_prefix="adderlib-reboot") as executor:
+			outcomes = list(executor.map(reboot, waves))
+
+		return RolloutResult(
+			waves=tuple(result for result in outcomes if result is not None),
+			skipped=tuple(device for wave, result in zip(waves, outcomes) if result is None for device in wave),
+			wall_time=time.monotonic() - started
+		)
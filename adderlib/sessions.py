@@ -0,0 +1,269 @@
+import concurrent.futures, contextlib, threading, time, typing
+from .adder import AdderAPI, AdderRequestError
+from .users import AdderUser
+from .inventory import AdderInventory
+from .paging import list_items
+from .parsers import StreamedList
+from .errors import raise_for_failure
+from .tokens import TokenStore
+
+
+class SessionPool:
+	"""
+	Logged-in sessions on the AIM, lent out to one request at a time each up to `max_in_flight`
+	A request borrows whichever session has the fewest requests in flight.  When every session is at its limit, it waits for
+	one to come free.
+	"""
+
+	def __init__(self, *, max_in_flight:int=2, timeout:typing.Optional[float]=None):
+		"""
+		max_in_flight:int -- Most requests to have going at once on any one session
+		timeout:float -- Most seconds to wait for a session to come free, or None to wait as long as it takes
+		"""
+
+		if int(max_in_flight) < 1:
+			raise ValueError("At least one request must be allowed in flight per session")
+		if timeout is not None and timeout < 0:
+			raise ValueError("Timeout must not be negative")
+
+		self._max_in_flight = int(max_in_flight)
+		self._timeout = timeout
+		self._users = []
+		self._in_flight = []		# Requests in flight, per session
+		self._next = 0				# Where to start looking, so idle sessions take turns
+		self._draining = False
+		self._condition = threading.Condition()
+
+	def fill(self, users:typing.Iterable[AdderUser]):
+		"""Add logged-in sessions to the pool"""
+
+		with self._condition:
+			for user in users:
+				self._users.append(user)
+				self._in_flight.append(0)
+			self._draining = False
+			self._condition.notify_all()
+
+	def drain(self) -> typing.List[AdderUser]:
+		"""Take every session out of the pool, once the requests in flight have finished.  New requests are turned away meanwhile."""
+
+		with self._condition:
+			self._draining = True
+			self._condition.notify_all()
+			self._condition.wait_for(lambda: not any(self._in_flight))
+			users, self._users, self._in_flight = self._users, [], []
+			return users
+
+	@contextlib.contextmanager
+	def session(self) -> typing.Iterator[AdderUser]:
+		"""Borrow a session for the length of a request"""
+
+		deadline = None if self._timeout is None else time.monotonic() + self._timeout
+
+		with self._condition:
+			while True:
+				if not self._users or self._draining:
+					raise AdderRequestError("Not logged in")
+
+				count = len(self._users)
+				index = min(((self._next + offset) % count for offset in range(count)), key=self._in_flight.__getitem__)
+				if self._in_flight[index] < self._max_in_flight:
+					break
+
+				remaining = None if deadline is None else deadline - time.monotonic()
+				if remaining is not None and remaining <= 0:
+					raise TimeoutError(f"No session came free within {self._timeout} seconds")
+				self._condition.wait(remaining)
+
+			self._in_flight[index] += 1
+			self._next = (index + 1) % count
+			user = self._users[index]
+
+		try:
+			yield user
+		finally:
+			with self._condition:
+				self._in_flight[index] -= 1
+				self._condition.notify_all()
+
+	@property
+	def max_in_flight(self) -> int:
+		"""Most requests to have going at once on any one session"""
+		return self._max_in_flight
+
+	@property
+	def in_flight(self) -> int:
+		"""Requests in flight across all the sessions"""
+		with self._condition:
+			return sum(self._in_flight)
+
+	@property
+	def users(self) -> typing.Tuple[AdderUser, ...]:
+		"""The sessions in the pool"""
+		with self._condition:
+			return tuple(self._users)
+
+	def __len__(self) -> int:
+		return len(self._users)
+
+
+class PooledAdderAPI(AdderAPI):
+	"""
+	An AdderAPI for threads to share, logged in several times over
+	Requests are spread across a pool of sessions, each with a limit on requests in flight, so a worker pool can keep several
+	going at the AIM at once.  A session the AIM turns down is logged in again.  Logging in and out waits for other threads.
+	"""
+
+	def __init__(self, server_address:str, *, sessions:int=4, max_in_flight:int=2, wait_timeout:typing.Optional[float]=None, **kwargs):
+		"""
+		sessions:int -- Number of sessions to log in
+		max_in_flight:int -- Most requests to have going at once on any one session
+		wait_timeout:float -- Most seconds a request waits for a session to come free, or None to wait as long as it takes
+		Other arguments are as for AdderAPI.
+		"""
+
+		if int(sessions) < 1:
+			raise ValueError("At least one session is needed")
+
+		super().__init__(server_address, **kwargs)
+		self._sessions = int(sessions)
+		self._pool = SessionPool(max_in_flight=max_in_flight, timeout=wait_timeout)
+		self._renew_lock = threading.Lock()
+		self._stored_as = {}		# session -> name its token is kept under in the token store
+
+	def _call(self, user:AdderUser, args:dict) -> dict:
+		"""Make an API call on a borrowed session, logging it in again if the AIM turns it down"""
+
+		token = user.token
+		response = self._url_handler.api_call(self._server_address, dict(args, token=token))
+		if self._credentials is not None and self._isTokenError(response):
+			response = self._url_handler.api_call(self._server_address, dict(args, token=self._renewUser(user, token)))
+		return response
+
+	def _request(self, args:dict) -> dict:
+		"""Make an API call on a session from the pool"""
+
+		if "token" not in args:
+			return self._url_handler.api_call(self._server_address, args)
+
+		with self._pool.session() as user:
+			return self._call(user, args)
+
+	def _stream(self, args:dict, container:str, item:str) -> typing.Iterator[dict]:
+		"""
+		Stream the items of an API list on a session from the pool
+		The list is read in full before the session is given back, so a caller working through it can make other requests
+		without waiting on a session of its own.
+		"""
+
+		with self._pool.session() as user:
+			stream = self._url_handler.api_stream(self._server_address, dict(args, token=user.token), container, item)
+			listed = list(stream)
+
+			if isinstance(stream, StreamedList):
+				# A failed list streams as an empty one; the rest of the response says why
+				if stream.succeeded is False:
+					response = self._call(user, args) if self._isTokenError(stream.header) else stream.header
+					raise_for_failure(response)
+					listed = list_items(response, container, item)
+			elif not listed:
+				# Handlers which don't say how the response went can't tell a failed list from an empty one, so check with a whole response
+				response = self._call(user, args)
+				raise_for_failure(response)
+				listed = list_items(response, container, item)
+
+		yield from listed
+
+	def _renewUser(self, user:AdderUser, stale_token:str) -> str:
+		"""Log a session in again in place of one the AIM turned down, and return the new token"""
+
+		with self._renew_lock:
+			if user.token == stale_token:
+				username, password = self._credentials
+				user.set_logged_in(username, self._authenticate(username, password))
+				if self._token_store is not None:
+					self._token_store.save(self._server_address.geturl(), self._stored_as[user], user.token)
+			return user.token
+
+	def _logoutToken(self, token:str) -> bool:
+		response = self._url_handler.api_call(self._server_address, {"v":self._api_version, "method":"logout", "token":token})
+		return response.get("success") == "1"
+
+	@staticmethod
+	def _storedName(username:str, index:int) -> str:
+		"""Name a session's token is kept under in a token store: the first as the user, the rest numbered after it"""
+		return username if index == 0 else f"{username}#{index + 1}"
+
+	def login(self, username:str, password:str, *, prefetch:bool=False, token_store:typing.Optional[TokenStore]=None) -> typing.Optional[AdderInventory]:
+		"""
+		Log the user in once for each session, at once, optionally taking an inventory snapshot straight away
+		With a `token_store`, each session picks up a token kept from an earlier run if there is one, as for AdderAPI.login().
+		"""
+
+		with self._session_lock:
+			if self._user.logged_in:
+				raise AdderRequestError(f"Already logged in as {self._user.username}")
+
+			server = self._server_address.geturl()
+			names = [self._storedName(username, index) for index in range(self._sessions)]
+			tokens = [token_store.load(server, name) if token_store is not None else None for name in names]
+			missing = [index for index, token in enumerate(tokens) if not token]
+
+			with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(missing), 1), thread_name_prefix="adderlib-login") as executor:
+				futures = {index: executor.submit(self._authenticate, username, password) for index in missing}
+				concurrent.futures.wait(futures.values())
+
+			errors = [future.exception() for future in futures.values() if future.exception() is not None]
+			if errors:
+				# All or nothing: don't leave the sessions that did log in lying about on the AIM
+				for future in futures.values():
+					if future.exception() is None:
+						self._logoutToken(future.result())
+				raise errors[0]
+
+			for index, future in futures.items():
+				tokens[index] = future.result()
+				if token_store is not None:
+					token_store.save(server, names[index], tokens[index])
+
+			self._user.set_logged_in(username, tokens[0])
+			users = [self._user]
+			for token in tokens[1:]:
+				users.append(AdderUser())
+				users[-1].set_logged_in(username, token)
+
+			self._token_store = token_store
+			self._stored_as = dict(zip(users, names))
+			self._credentials = (username, password)
+			self._pool.fill(users)
+
+		return self.snapshot() if prefetch else None
+
+	def logout(self):
+		"""Log every session out, once the requests in flight have finished"""
+
+		with self._session_lock:
+			if self._switcher is not None:
+				self._switcher.close()
+				self._switcher = None
+
+			users = self._pool.drain()
+			logged_out = [self._logoutToken(user.token) for user in users]
+			for user, out in zip(users, logged_out):
+				if out and self._token_store is not None:
+					# Logged out, the token is no use to anyone
+					self._token_store.discard(self._server_address.geturl(), self._stored_as[user])
+				user.set_logged_out()
+			self._user.set_logged_out()
+			self._token_store = None
+			self._stored_as = {}
+			self._credentials = None
+			self._inventory = None
+
+			if not all(logged_out):
+				raise AdderRequestError(f"{logged_out.count(False)} of {len(users)} sessions could not be logged out")
+
+	@property
+	def pool(self) -> SessionPool:
+		"""The pool of sessions requests are spread across"""
+		return self._pool
@@ -0,0 +1,270 @@
+import bisect, ipaddress, itertools, typing
+from .devices import AdderDevice
+from .channels import AdderChannel
+from .inventory import AdderInventory
+from .records import decode_ip
+
+def _folded(value:typing.Optional[str]) -> str:
+	"""Case-insensitive form of a name or location"""
+	return (value or "").casefold()
+
+def _macs(device:AdderDevice) -> typing.Iterator[str]:
+	return (mac.lower() for mac in device.mac_addresses if mac)
+
+def _ips(device:AdderDevice) -> typing.Iterator[typing.Union[ipaddress.IPv4Address, ipaddress.IPv6Address]]:
+	return (ip for ip in device.ip_addresses if ip is not None)
+
+def _one(value) -> tuple:
+	return (value,) if value else ()
+
+
+class IndexedCollection:
+	"""
+	Entities kept by ID, with hash indexes for exact lookups and sorted indexes for prefix and range queries
+	Hash indexes map each entity to any number of keys (a device has two MAC addresses, for instance); sorted indexes map it to one.
+	Updates only touch the indexes whose keys have changed.
+	"""
+
+	def __init__(self, *, hashed:typing.Optional[typing.Dict[str, typing.Callable]]=None, ordered:typing.Optional[typing.Dict[str, typing.Callable]]=None):
+		"""
+		hashed:dict -- Hash index names, each with a function returning the keys of an entity
+		ordered:dict -- Sorted index names, each with a function returning the key of an entity
+		"""
+
+		self._hashed_keys = dict(hashed or {})
+		self._ordered_keys = dict(ordered or {})
+
+		self._entities = {}	# id -> entity
+		self._hashed = {name: {} for name in self._hashed_keys}		# index -> {key: {id: entity}}
+		self._ordered = {name: [] for name in self._ordered_keys}	# index -> sorted [(key, id)]
+
+	# Maintenance
+	def upsert(self, entity) -> bool:
+		"""Add an entity, or replace the one with the same ID.  Returns whether it is new."""
+
+		old = self._entities.get(entity.id)
+		self._entities[entity.id] = entity
+
+		for name, keys_of in self._hashed_keys.items():
+			index = self._hashed[name]
+			new_keys = set(keys_of(entity))
+			old_keys = set(keys_of(old)) if old is not None else set()
+
+			for key in old_keys - new_keys:
+				self._unlink(index, key, entity.id)
+			# Entries under unchanged keys still need to point at the new object
+			for key in new_keys:
+				index.setdefault(key, {})[entity.id] = entity
+
+		for name, key_of in self._ordered_keys.items():
+			new_key = key_of(entity)
+			if old is not None:
+				old_key = key_of(old)
+				if old_key == new_key:
+					continue
+				self._remove_ordered(self._ordered[name], old_key, entity.id)
+			bisect.insort(self._ordered[name], (new_key, entity.id))
+
+		return old is None
+
+	def remove(self, id:str) -> bool:
+		"""Remove the entity with the given ID.  Returns whether there was one."""
+
+		entity = self._entities.pop(id, None)
+		if entity is None:
+			return False
+
+		for name, keys_of in self._hashed_keys.items():
+			for key in set(keys_of(entity)):
+				self._unlink(self._hashed[name], key, id)
+		for name, key_of in self._ordered_keys.items():
+			self._remove_ordered(self._ordered[name], key_of(entity), id)
+		return True
+
+	def sync(self, entities:typing.Iterable) -> typing.Tuple[int, int, int]:
+		"""Bring the collection in line with a fresh list of entities.  Returns the numbers added, updated and removed."""
+
+		seen = set()
+		added = updated = 0
+		for entity in entities:
+			seen.add(entity.id)
+			if self.upsert(entity):
+				added += 1
+			else:
+				updated += 1
+
+		stale = [id for id in self._entities if id not in seen]
+		for id in stale:
+			self.remove(id)
+
+		return added, updated, len(stale)
+
+	@staticmethod
+	def _unlink(index:dict, key, id:str):
+		bucket = index.get(key)
+		if bucket is not None:
+			bucket.pop(id, None)
+			if not bucket:
+				del index[key]
+
+	@staticmethod
+	def _remove_ordered(entries:list, key, id:str):
+		pos = bisect.bisect_left(entries, (key, id))
+		if pos < len(entries) and entries[pos] == (key, id):
+			del entries[pos]
+
+	# Queries
+	def get(self, id:str):
+		"""The entity with the given ID, if there is one"""
+		return self._entities.get(id)
+
+	def lookup(self, index:str, key) -> tuple:
+		"""All entities with the given key in a hash index"""
+		if index not in self._hashed:
+			raise ValueError(f"No hash index named '{index}'")
+		return tuple(self._hashed[index].get(key, {}).values())
+
+	def first(self, index:str, key):
+		"""An entity with the given key in a hash index, if there is one"""
+		return next(iter(self.lookup(index, key)), None)
+
+	def range(self, index:str, low, high) -> list:
+		"""Entities whose key in a sorted index is at least `low` and below `high`, in key order"""
+
+		if index not in self._ordered:
+			raise ValueError(f"No sorted index named '{index}'")
+
+		entries = self._ordered[index]
+		start = bisect.bisect_left(entries, (low,))
+		stop = bisect.bisect_left(entries, (high,), lo=start)
+		return [self._entities[id] for _, id in entries[start:stop]]
+
+	def prefix(self, index:str, prefix:str) -> list:
+		"""Entities whose key in a sorted index starts with `prefix`, in key order"""
+
+		if index not in self._ordered:
+			raise ValueError(f"No sorted index named '{index}'")
+
+		entries = self._ordered[index]
+		start = bisect.bisect_left(entries, (prefix,))
+		matches = itertools.takewhile(lambda entry: entry[0].startswith(prefix), itertools.islice(entries, start, None))
+		return [self._entities[id] for _, id in matches]
+
+	def __contains__(self, id:str) -> bool:
+		return id in self._entities
+
+	def __iter__(self):
+		return iter(self._entities.values())
+
+	def __len__(self) -> int:
+		return len(self._entities)
+
+
+class InventoryStore:
+	"""
+	Indexed transmitters, receivers and channels from an inventory snapshot
+	Devices can be found by ID, MAC address, IP address, serial number or name, and by name or location prefix.  Channels can be found
+	by ID, name or transmitter, and by name prefix.  Names and locations are matched case-insensitively.  Calling `update()` with a
+	newer snapshot changes only what has changed.
+	"""
+
+	def __init__(self, inventory:typing.Optional[AdderInventory]=None):
+		"""Build the indexes, optionally from an inventory snapshot"""
+
+		self._devices = IndexedCollection(
+			hashed={
+				"mac":    _macs,
+				"ip":     _ips,
+				"serial": lambda device: _one(device.serial_number),
+				"name":   lambda device: _one(_folded(device.name)),
+			},
+			ordered={
+				"name":     lambda device: _folded(device.name),
+				"location": lambda device: _folded(device.location),
+			}
+		)
+		self._channels = IndexedCollection(
+			hashed={
+				"name":  lambda channel: _one(_folded(channel.name)),
+				"tx_id": lambda channel: _one(channel.tx_id),
+			},
+			ordered={
+				"name": lambda channel: _folded(channel.name),
+			}
+		)
+		self._inventory = None
+
+		if inventory is not None:
+			self.update(inventory)
+
+	def update(self, inventory:AdderInventory) -> typing.Dict[str, typing.Tuple[int, int, int]]:
+		"""Bring the indexes in line with a newer snapshot.  Returns the numbers of devices and channels added, updated and removed."""
+
+		changes = {
+			"devices":  self._devices.sync(itertools.chain(inventory.transmitters, inventory.receivers)),
+			"channels": self._channels.sync(inventory.channels),
+		}
+		self._inventory = inventory
+		return changes
+
+	# Devices
+	def device(self, id:str) -> typing.Optional[AdderDevice]:
+		"""The transmitter or receiver with the given ID"""
+		return self._devices.get(id)
+
+	def device_by_mac(self, mac_address:str) -> typing.Optional[AdderDevice]:
+		"""The device with the given MAC address on either interface"""
+		return self._devices.first("mac", mac_address.lower())
+
+	def device_by_ip(self, ip_address:typing.Union[str, ipaddress.IPv4Address, ipaddress.IPv6Address]) -> typing.Optional[AdderDevice]:
+		"""The device with the given IP address on either interface"""
+		ip_address = decode_ip(ip_address) if isinstance(ip_address, str) else ip_address
+		return self._devices.first("ip", ip_address)
+
+	def device_by_serial(self, serial_number:str) -> typing.Optional[AdderDevice]:
+		"""The device with the given serial number"""
+		return self._devices.first("serial", serial_number)
+
+	def devices_named(self, name:str) -> typing.Tuple[AdderDevice, ...]:
+		"""Devices with the given name"""
+		return self._devices.lookup("name", _folded(name))
+
+	def devices_by_name_prefix(self, prefix:str) -> typing.List[AdderDevice]:
+		"""Devices whose names start with `prefix`, in name order"""
+		return self._devices.prefix("name", _folded(prefix))
+
+	def devices_by_location_prefix(self, prefix:str) -> typing.List[AdderDevice]:
+		"""Devices whose locations start with `prefix`, in location order"""
+		return self._devices.prefix("location", _folded(prefix))
+
+	# Channels
+	def channel(self, id:str) -> typing.Optional[AdderChannel]:
+		"""The channel with the given ID"""
+		return self._channels.get(id)
+
+	def channels_named(self, name:str) -> typing.Tuple[AdderChannel, ...]:
+		"""Channels with the given name"""
+		return self._channels.lookup("name", _folded(name))
+
+	def channels_for_transmitter(self, tx_id:str) -> typing.Tuple[AdderChannel, ...]:
+		"""Channels using the given transmitter"""
+		return self._channels.lookup("tx_id", tx_id)
+
+	def channels_by_name_prefix(self, prefix:str) -> typing.List[AdderChannel]:
+		"""Channels whose names start with `prefix`, in name order"""
+		return self._channels.prefix("name", _folded(prefix))
+
+	@property
+	def devices(self) -> IndexedCollection:
+		"""The indexed transmitters and receivers"""
+		return self._devices
+
+	@property
+	def channels(self) -> IndexedCollection:
+		"""The indexed channels"""
+		return self._channels
+
+	@property
+	def inventory(self) -> typing.Optional[AdderInventory]:
+		"""The snapshot the indexes were last updated from"""
+		return self._inventory
@@ -0,0 +1,162 @@
+import collections, hashlib, re, threading, typing
+from .channels import AdderChannel
+from .devices import AdderReceiver
+from .presets import AdderPreset
+from .filters import PresetFilter
+from .bulk import as_pairs
+from .lazy import LazyRecord
+from .errors import AdderRequestError
+
+
+class PresetSwitcher:
+	"""
+	Switches a batch of channel/receiver pairs in one request, by way of a temporary preset
+	The pairs are made into a preset, which is then loaded: the AIM switches every receiver at once, rather than one request
+	at a time.  Presets are kept for reuse when the same batch comes round again, up to `keep` of them, and deleted once
+	no longer needed -- including when creating or loading one fails.
+	"""
+
+	# Temporary presets are named with this prefix, followed by a digest of their pairs
+	PREFIX = "adderlib-batch-"
+
+	# AIM error codes for a preset name that is already taken
+	NAME_IN_USE_CODES = frozenset({"20"})
+
+	# AIM error codes for a preset that no longer exists.  None are documented, so such errors are also judged by their message.
+	PRESET_MISSING_CODES = frozenset()
+
+	def __init__(self, api, *, keep:int=8, prefix:str=PREFIX, max_attempts:int=3):
+		"""
+		api:AdderAPI -- A logged-in API to create and load presets with
+		keep:int -- Most presets to keep for reuse.  With 0, each preset is deleted as soon as it has been loaded.
+		prefix:str -- Start of the names of temporary presets, to tell them apart from everyone else's
+		max_attempts:int -- Most names to try for a new preset, in case one is taken
+		"""
+
+		if int(keep) < 0:
+			raise ValueError("Number of presets to keep must not be negative")
+		if not prefix.strip():
+			raise ValueError("A prefix is needed to tell temporary presets apart")
+		if int(max_attempts) < 1:
+			raise ValueError("At least one attempt must be allowed")
+
+		self._api = api
+		self._keep = int(keep)
+		self._prefix = prefix
+		self._max_attempts = int(max_attempts)
+		self._presets = collections.OrderedDict()	# batch key -> preset, least recently used first
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _batch_key(pairs:typing.Iterable[AdderPreset.Pair]) -> typing.Tuple[typing.Tuple[str, str], ...]:
+		"""The same pairs in any order make the same batch"""
+		return tuple(sorted((pair.channel.id, pair.receiver.id) for pair in pairs))
+
+	def _name(self, key:tuple, attempt:int) -> str:
+		digest = hashlib.sha1(",".join(f"{c_id}-{rx_id}" for c_id, rx_id in key).encode()).hexdigest()[:12]
+		return f"{self._prefix}{digest}" + (f"-{attempt+1}" if attempt else "")
+
+	def _create(self, key:tuple, pairs:typing.List[AdderPreset.Pair]) -> LazyRecord:
+		"""Create a preset for a batch, trying another name if one is taken"""
+
+		# Allowing every mode lets one preset serve a batch whatever mode it is loaded in
+		modes = list(AdderChannel.ConnectionMode)
+		for attempt in range(self._max_attempts):
+			try:
+				# Only the ID is needed to load and delete it, so there's no need to fetch it back
+				return self._api.createPreset(self._name(key, attempt), pairs, modes, lazy=True)
+			except AdderRequestError as e:
+				# Anything other than the name being taken would only fail again under another name
+				if attempt + 1 == self._max_attempts or not self._isNameInUse(e):
+					raise
+
+	@classmethod
+	def _isNameInUse(cls, error:AdderRequestError) -> bool:
+		"""Whether creating a preset failed because its name is taken"""
+
+		if error.code is not None:
+			return str(error.code).strip() in cls.NAME_IN_USE_CODES
+		return re.search(r"name.*\b(in use|taken|exists)", str(error), re.IGNORECASE) is not None
+
+	@classmethod
+	def _isPresetMissing(cls, error:AdderRequestError) -> bool:
+		"""Whether loading a preset failed because it no longer exists, such as if someone else deleted it"""
+
+		if error.code is not None and str(error.code).strip() in cls.PRESET_MISSING_CODES:
+			return True
+		return re.search(r"preset.*\b(not found|not exist|does not exist|unknown|invalid)|\b(no such|unknown|invalid) preset", str(error), re.IGNORECASE) is not None
+
+	def _delete(self, preset:AdderPreset):
+		"""Delete a preset, as tidying up shouldn't hide whatever went wrong to need it"""
+		try:
+			self._api.deletePreset(preset)
+		except Exception:
+			pass
+
+	def switch(self, pairs:typing.Iterable[typing.Union[AdderPreset.Pair, typing.Tuple[AdderChannel, AdderReceiver]]], mode:AdderChannel.ConnectionMode=AdderChannel.ConnectionMode.SHARED, *, force:bool=False) -> LazyRecord:
+		"""Connect all the pairs at once, and return the preset used"""
+
+		pairs = as_pairs(pairs)
+		if not pairs:
+			raise ValueError("No pairs to switch")
+		key = self._batch_key(pairs)
+
+		with self._lock:
+			preset = self._presets.pop(key, None)
+			if preset is not None:
+				try:
+					self._api.loadPreset(preset, mode, force)
+				except AdderRequestError as e:
+					# Someone may have deleted it, so start afresh with a new one.  Any other failure would only happen again.
+					if not self._isPresetMissing(e):
+						self._presets[key] = preset
+						raise
+					self._delete(preset)
+				else:
+					self._presets[key] = preset
+					return preset
+
+			preset = self._create(key, pairs)
+			try:
+				self._api.loadPreset(preset, mode, force)
+			except Exception:
+				self._delete(preset)
+				raise
+
+			if self._keep:
+				self._presets[key] = preset
+				while len(self._presets) > self._keep:
+					self._delete(self._presets.popitem(last=False)[1])
+			else:
+				self._delete(preset)
+
+			return preset
+
+	def close(self):
+		"""Delete all the presets kept for reuse"""
+
+		with self._lock:
+			presets, self._presets = list(self._presets.values()), collections.OrderedDict()
+		for preset in presets:
+			self._delete(preset)
+
+	def purge(self) -> int:
+		"""Delete every temporary preset on the AIM with this prefix, such as any left behind by a crashed program.  Returns how many."""
+
+		with self._lock:
+			self._presets.clear()
+			stale = [preset for preset in self._api.getPresets(filter=PresetFilter(name=self._prefix)) if preset.name.startswith(self._prefix)]
+			for preset in stale:
+				self._api.deletePreset(preset)
+		return len(stale)
+
+	@property
+	def presets(self) -> typing.Tuple[LazyRecord, ...]:
+		"""The presets kept for reuse, least recently used first"""
+		return tuple(self._presets.values())
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
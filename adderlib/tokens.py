@@ -0,0 +1,116 @@
+import contextlib, json, os, pathlib, stat, tempfile, time, typing
+
+# File locking is done with `fcntl` where available (Linux, macOS), and `msvcrt` on Windows
+try:
+	import fcntl
+except ImportError:
+	fcntl = None
+try:
+	import msvcrt
+except ImportError:
+	msvcrt = None
+
+
+def default_path() -> pathlib.Path:
+	"""Where tokens are kept unless told otherwise: $ADDERLIB_TOKENS, or tokens.json in the user's cache directory"""
+
+	if os.environ.get("ADDERLIB_TOKENS"):
+		return pathlib.Path(os.environ["ADDERLIB_TOKENS"])
+	cache = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+	return pathlib.Path(cache, "adderlib", "tokens.json")
+
+
+class TokenStore:
+	"""
+	Session tokens kept on disk between runs, keyed on AIM server and username
+	Short-lived scripts can pick up the session a previous run left, rather than logging in and out every time.  The file is
+	readable by its owner only, and is locked while it is read or written so that scripts running at once don't trip over
+	each other.  A file that others can read is ignored, as its tokens may have been seen.
+	"""
+
+	def __init__(self, path:typing.Optional[typing.Union[str, pathlib.Path]]=None):
+		"""path -- The file to keep tokens in.  By default, see `default_path()`."""
+		self._path = pathlib.Path(path) if path is not None else default_path()
+
+	@contextlib.contextmanager
+	def _locked(self):
+		"""Hold an exclusive lock on the store, by way of a lock file beside it"""
+
+		self._path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+		fd = os.open(self._path.with_name(self._path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o600)
+		try:
+			if fcntl is not None:
+				fcntl.flock(fd, fcntl.LOCK_EX)
+			elif msvcrt is not None:
+				msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+			yield
+		finally:
+			if fcntl is not None:
+				fcntl.flock(fd, fcntl.LOCK_UN)
+			elif msvcrt is not None:
+				os.lseek(fd, 0, os.SEEK_SET)
+				msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+			os.close(fd)
+
+	def _read(self) -> dict:
+		"""The stored tokens, or none if the file is missing, unreadable or not private.  Call with the lock held."""
+
+		try:
+			info = self._path.stat()
+		except FileNotFoundError:
+			return {}
+		if os.name == "posix" and info.st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+			return {}
+
+		try:
+			with self._path.open("r") as file:
+				tokens = json.load(file)
+		except (OSError, ValueError):
+			return {}
+		return tokens if isinstance(tokens, dict) else {}
+
+	def _write(self, tokens:dict):
+		"""Replace the stored tokens in one go, so a reader never sees half a file.  Call with the lock held."""
+
+		fd, temp_path = tempfile.mkstemp(dir=self._path.parent, prefix=self._path.name, suffix=".tmp")
+		try:
+			# mkstemp creates files readable by the owner only
+			with os.fdopen(fd, "w") as file:
+				json.dump(tokens, file)
+			os.replace(temp_path, self._path)
+		except BaseException:
+			with contextlib.suppress(OSError):
+				os.unlink(temp_path)
+			raise
+
+	@staticmethod
+	def _key(server:str, username:str) -> str:
+		return f"{server}|{username}"
+
+	def load(self, server:str, username:str) -> typing.Optional[str]:
+		"""The token stored for a user on a server, if there is one"""
+
+		with self._locked():
+			entry = self._read().get(self._key(server, username))
+		return entry.get("token") if isinstance(entry, dict) else None
+
+	def save(self, server:str, username:str, token:str):
+		"""Store a user's token for a server, replacing any stored before"""
+
+		with self._locked():
+			tokens = self._read()
+			tokens[self._key(server, username)] = {"token": token, "saved": time.time()}
+			self._write(tokens)
+
+	def discard(self, server:str, username:str):
+		"""Forget a user's token for a server"""
+
+		with self._locked():
+			tokens = self._read()
+			if tokens.pop(self._key(server, username), None) is not None:
+				self._write(tokens)
+
+	@property
+	def path(self) -> pathlib.Path:
+		"""The file tokens are kept in"""
+		return self._path
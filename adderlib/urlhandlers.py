@@ -1,25 +1,75 @@
-import abc, pathlib, urllib.parse
-import requests, xmltodict
+import abc, asyncio, dataclasses, pathlib, ssl, threading, typing, urllib.parse, weakref
+import requests, requests.adapters, xmltodict
+from .parsers import ResponseParser, XmltodictParser, StreamedList
 
 #class InvalidServerAddressError(RuntimeError):
 #	"""The server address provided is missing or invalid"""
 
 class UrlHandler(abc.ABC):
-	"""Abstract URL Handler"""
+	"""
+	Abstract URL Handler
+	Class properties:
+		parser:ResponseParser -- The parser backend for API responses (default: XmltodictParser)
+	"""
+
+	parser:ResponseParser = XmltodictParser()
 
 	@abc.abstractclassmethod
 	def api_call(cls, server_address:urllib.parse.ParseResult, args:dict) -> dict:
 		"""
 		Handle a call to the REST API and return a dictionary result
 		Data from the Adder API is returned as an XML document and should be returned as a dictionary
-		_parse_response() is provided as a good-enough method via xmltodict, but can be overloaded if desired
+		_parse_response() is provided as a good-enough method via the `parser` backend, but can be overloaded if desired
 		"""
 		pass
 
+	def api_stream(self, server_address:urllib.parse.ParseResult, args:dict, container:str, item:str) -> StreamedList:
+		"""
+		Handle a call to the REST API which returns a list, yielding each `item` of the `container` list as a dictionary
+		Nothing is yielded if the call was not successful: the `header` of the StreamedList returned tells why.
+		This default implementation waits for the full result of api_call().  Handlers may override it to yield items as they arrive.
+		"""
+
+		header = {}
+
+		def items():
+			response = self.api_call(server_address, args)
+			header.update((key, value) for key, value in response.items() if key != container)
+
+			if response.get("success") != "1" or not response.get(container):
+				return
+
+			# `xmltodict` only returns a list of nodes if there are more than one
+			listed = response.get(container).get(item) or []
+			yield from listed if isinstance(listed, list) else [listed]
+
+		return StreamedList(items(), header)
+
+	@staticmethod
+	def is_read_call(args:dict) -> bool:
+		"""Whether an API call only reads data from the AIM, and so is safe to cache or repeat"""
+		return str(args.get("method","")).startswith("get_")
+
+	@staticmethod
+	def _call_key(server_address:urllib.parse.ParseResult, args:dict) -> tuple:
+		"""A hashable key identifying a call: the method first, then the server and remaining arguments"""
+		return (args.get("method",""), server_address.geturl(), tuple(sorted((str(key), str(val)) for key, val in args.items() if key != "method")))
+
 	@classmethod
-	def _parse_response(cls, data:str) -> xmltodict.OrderedDict:
+	def _parse_response(cls, data:str) -> dict:
 		"""Parse an API response to a Python data structure"""
-		return xmltodict.parse(data).get("api_response")
+		return cls.parser.parse(data)
+	
+	@classmethod
+	def _parse_stream(cls, chunks:typing.Iterable[bytes], container:str, item:str) -> StreamedList:
+		"""Parse an API response as it arrives in chunks, yielding each `item` of the `container` list once it is complete"""
+		return cls.parser.iterparse(chunks, container, item)
+
+	@staticmethod
+	def _relay(parsed:typing.Iterator[dict], header:dict) -> typing.Iterator[dict]:
+		"""Yield the items of a parsed stream, then copy its header for the StreamedList handed to the caller"""
+		yield from parsed
+		header.update(getattr(parsed, "header", {}))
 
 	@classmethod
 	def _build_url(cls, server_address:urllib.parse.ParseResult, args:dict) -> str:
@@ -30,6 +80,7 @@ class RequestsHandler(UrlHandler):
 	"""Request handler using the `requests` library"""
 
 	timeout:int=5
+	stream_chunk_size:int=16384
 
 	@classmethod
 	def api_call(cls, server_address:urllib.parse.ParseResult, args:dict) -> xmltodict.OrderedDict:
@@ -41,6 +92,157 @@ class RequestsHandler(UrlHandler):
 			raise Exception(f"Error contacting {server_address.netloc}: Returned {response.status_code}")
 
 		return cls._parse_response(response.content)
+	
+	@classmethod
+	def api_stream(cls, server_address:urllib.parse.ParseResult, args:dict, container:str, item:str) -> StreamedList:
+		"""GET a call to the API, yielding list items as they are downloaded"""
+
+		header = {}
+
+		def items():
+			with requests.get(cls._build_url(server_address, args), timeout=cls.timeout, stream=True) as response:
+
+				if not response.ok:
+					raise Exception(f"Error contacting {server_address.netloc}: Returned {response.status_code}")
+				
+				yield from cls._relay(cls._parse_stream(response.iter_content(cls.stream_chunk_size), container, item), header)
+
+		return StreamedList(items(), header)
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionStats:
+	"""Connection usage counters for a pooled URL handler"""
+	requests_sent:int
+	connections_opened:int
+
+	@property
+	def connections_reused(self) -> int:
+		"""Number of requests which were sent over an already-open connection"""
+		return max(self.requests_sent - self.connections_opened, 0)
+	
+	@property
+	def reuse_ratio(self) -> float:
+		"""Fraction of requests which reused a kept-alive connection"""
+		return self.connections_reused / self.requests_sent if self.requests_sent else 0.0
+
+
+class SessionHandler(UrlHandler):
+	"""
+	Request handler using a pooled, keep-alive `requests.Session`
+	Connections to the AIM are kept open between calls, saving a TCP (and TLS) handshake per request.
+	Instance properties:
+		timeout:float -- Seconds to wait for the server to respond (default: 5)
+		pool_size:int -- Maximum number of connections kept alive per AIM host (default: 4)
+		pool_block:bool -- Wait for a free connection rather than opening an extra one when the pool is exhausted (default: False)
+		max_hosts:int -- Number of AIM hosts to keep connection pools for (default: 4)
+		stream_chunk_size:int -- Bytes to read at a time when streaming list responses (default: 16384)
+		parser:ResponseParser -- The parser backend for API responses (default: XmltodictParser)
+	"""
+
+	def __init__(self, *, timeout:float=5, pool_size:int=4, pool_block:bool=False, max_hosts:int=4, stream_chunk_size:int=16384, parser:typing.Optional[ResponseParser]=None):
+
+		if int(pool_size) < 1:
+			raise ValueError("`pool_size` must be at least 1")
+
+		self.timeout = timeout
+		self.stream_chunk_size = int(stream_chunk_size)
+		self.parser = parser or type(self).parser
+		self._pool_size = int(pool_size)
+		self._pool_block = bool(pool_block)
+
+		adapter = requests.adapters.HTTPAdapter(pool_connections=max(int(max_hosts),1), pool_maxsize=self._pool_size, pool_block=self._pool_block)
+		self._session = requests.Session()
+		self._session.mount("http://", adapter)
+		self._session.mount("https://", adapter)
+
+		self._stats_lock = threading.Lock()
+		self._requests_sent = 0
+		self._connections_opened = 0
+		self._pool_connections = weakref.WeakKeyDictionary()	# urllib3 connection pool -> connections already counted
+	
+	def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""GET a call to the API over a kept-alive connection"""
+
+		response = self._session.get(self._build_url(server_address, args), timeout=self.timeout)
+		self._count_request(response)
+
+		if not response.ok:
+			raise Exception(f"Error contacting {server_address.netloc}: Returned {response.status_code}")
+
+		return self._parse_response(response.content)
+	
+	def api_stream(self, server_address:urllib.parse.ParseResult, args:dict, container:str, item:str) -> StreamedList:
+		"""GET a call to the API over a kept-alive connection, yielding list items as they are downloaded"""
+
+		header = {}
+
+		def items():
+			with self._session.get(self._build_url(server_address, args), timeout=self.timeout, stream=True) as response:
+				self._count_request(response)
+
+				if not response.ok:
+					raise Exception(f"Error contacting {server_address.netloc}: Returned {response.status_code}")
+				
+				yield from self._relay(self._parse_stream(response.iter_content(self.stream_chunk_size), container, item), header)
+
+		return StreamedList(items(), header)
+	
+	def _parse_response(self, data:str) -> dict:
+		"""Parse an API response with this handler's parser backend"""
+		return self.parser.parse(data)
+	
+	def _parse_stream(self, chunks:typing.Iterable[bytes], container:str, item:str) -> StreamedList:
+		"""Parse a streamed API response with this handler's parser backend"""
+		return self.parser.iterparse(chunks, container, item)
+	
+	def _count_request(self, response:requests.Response):
+		"""Update the connection counters from the connection pool which served a response"""
+
+		# urllib3 tracks how many connections each host pool has had to open
+		pool = getattr(response.raw, "_pool", None)
+
+		with self._stats_lock:
+			self._requests_sent += 1
+
+			if pool is None or not hasattr(pool, "num_connections"):
+				return
+			
+			opened = pool.num_connections - self._pool_connections.get(pool, 0)
+			self._pool_connections[pool] = pool.num_connections
+			self._connections_opened += max(opened, 0)
+	
+	def reset_stats(self):
+		"""Reset the connection counters"""
+		with self._stats_lock:
+			self._requests_sent = 0
+			self._connections_opened = 0
+	
+	def close(self):
+		"""Close all pooled connections"""
+		self._session.close()
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	@property
+	def stats(self) -> ConnectionStats:
+		"""Connection reuse counters"""
+		with self._stats_lock:
+			return ConnectionStats(requests_sent=self._requests_sent, connections_opened=self._connections_opened)
+	
+	@property
+	def pool_size(self) -> int:
+		"""Maximum number of connections kept alive per AIM host"""
+		return self._pool_size
+	
+	@property
+	def session(self) -> requests.Session:
+		"""The underlying `requests.Session`"""
+		return self._session
 
 
 class DebugHandler(UrlHandler):
@@ -49,10 +251,12 @@ class DebugHandler(UrlHandler):
 	Class properties:
 		dirpath:str  -- A path to the directory containing the sample XML responses (default: ./example_xml)
 		verbose:bool -- Flag to print debug data to stdout (default: False)
+		stream_chunk_size:int -- Bytes to read at a time when streaming list responses (default: 1024)
 	"""
 
 	dirpath: pathlib.Path = "./example_xml"
 	verbose: bool = False
+	stream_chunk_size: int = 1024
 
 	@classmethod
 	def api_call(cls, server_address:urllib.parse.ParseResult, args:dict) -> xmltodict.OrderedDict:
@@ -76,4 +280,164 @@ class DebugHandler(UrlHandler):
 			raise FileNotFoundError(f"No example XML found for method '{method}' in {cls.dirpath}")
 
 		with path_response.open('r') as file_response:
-			return cls._parse_response(file_response.read())
\ No newline at end of file
+			return cls._parse_response(file_response.read())
+	
+	@classmethod
+	def api_stream(cls, server_address:urllib.parse.ParseResult, args:dict, container:str, item:str) -> StreamedList:
+		"""Stream sample XML return data for the given query"""
+
+		header = {}
+
+		def items():
+			method = args.get("method")
+			if not method:
+				raise Exception("Invalid API call: No method specified.")
+
+			path_response = pathlib.Path(cls.dirpath, method).with_suffix(".xml")
+
+			if cls.verbose:
+				print(f"Streaming:      {cls._build_url(server_address, args)}")
+				print(f"Using response: {path_response}")
+
+			if not path_response.is_file():
+				raise FileNotFoundError(f"No example XML found for method '{method}' in {cls.dirpath}")
+
+			with path_response.open('rb') as file_response:
+				yield from cls._relay(cls._parse_stream(iter(lambda: file_response.read(cls.stream_chunk_size), b""), container, item), header)
+
+		return StreamedList(items(), header)
+
+
+class AsyncUrlHandler(abc.ABC):
+	"""
+	Abstract asynchronous URL Handler
+	At most `max_in_flight` calls are awaited on the server at once; further calls wait their turn.
+	Class properties:
+		parser:ResponseParser -- The parser backend for API responses (default: XmltodictParser)
+	"""
+
+	parser:ResponseParser = XmltodictParser()
+
+	def __init__(self, *, max_in_flight:int=8):
+
+		if int(max_in_flight) < 1:
+			raise ValueError("`max_in_flight` must be at least 1")
+		
+		self._max_in_flight = int(max_in_flight)
+		self._semaphore = None
+		self._semaphore_loop = None
+		self._in_flight = 0
+	
+	async def api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""Handle a call to the REST API and return a dictionary result, once a slot is free"""
+
+		async with self._get_semaphore():
+			self._in_flight += 1
+			try:
+				return await self._api_call(server_address, args)
+			finally:
+				self._in_flight -= 1
+	
+	@abc.abstractmethod
+	async def _api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> dict:
+		"""
+		Perform a call to the REST API and return a dictionary result
+		Subclasses implement this; the in-flight limit is applied by api_call()
+		"""
+		pass
+
+	def _get_semaphore(self) -> asyncio.Semaphore:
+		"""The in-flight limiter for the running event loop"""
+
+		# Semaphores are bound to an event loop, so make a new one if this handler moves loops
+		loop = asyncio.get_running_loop()
+		if self._semaphore is None or self._semaphore_loop is not loop:
+			self._semaphore = asyncio.Semaphore(self._max_in_flight)
+			self._semaphore_loop = loop
+		return self._semaphore
+	
+	@classmethod
+	def _parse_response(cls, data:str) -> dict:
+		"""Parse an API response to a Python data structure"""
+		return cls.parser.parse(data)
+
+	@classmethod
+	def _build_url(cls, server_address:urllib.parse.ParseResult, args:dict) -> str:
+		"""Build a full URL for an API request"""
+		return UrlHandler._build_url(server_address, args)
+	
+	@property
+	def max_in_flight(self) -> int:
+		"""Maximum number of calls awaiting the server at once"""
+		return self._max_in_flight
+	
+	@property
+	def in_flight(self) -> int:
+		"""Number of calls currently awaiting the server"""
+		return self._in_flight
+
+
+class AsyncHttpHandler(AsyncUrlHandler):
+	"""
+	Asynchronous URL handler using asyncio streams; no third-party libraries or threads required
+	Instance properties:
+		timeout:float -- Seconds to wait for the server to respond (default: 5)
+		ssl_context:ssl.SSLContext -- SSL context for `https` servers (default: system defaults)
+	"""
+
+	def __init__(self, *, timeout:float=5, max_in_flight:int=8, ssl_context:typing.Optional[ssl.SSLContext]=None):
+		super().__init__(max_in_flight=max_in_flight)
+		self.timeout = timeout
+		self.ssl_context = ssl_context
+
+	async def _api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> xmltodict.OrderedDict:
+		"""GET a call to the API"""
+		return self._parse_response(await asyncio.wait_for(self._get(urllib.parse.urlparse(self._build_url(server_address, args))), self.timeout))
+	
+	async def _get(self, url:urllib.parse.ParseResult) -> bytes:
+		"""Issue an HTTP/1.0 GET request and return the body of a successful response"""
+
+		is_https = url.scheme == "https"
+		port = url.port or (443 if is_https else 80)
+		ssl_context = (self.ssl_context or ssl.create_default_context()) if is_https else None
+
+		reader, writer = await asyncio.open_connection(url.hostname, port, ssl=ssl_context)
+		try:
+			path = url.path + (f"?{url.query}" if url.query else "")
+			writer.write(f"GET {path} HTTP/1.0\r\nHost: {url.netloc}\r\nAccept: text/xml\r\nConnection: close\r\n\r\n".encode("ascii"))
+			await writer.drain()
+
+			status_line = await reader.readline()
+			try:
+				status = int(status_line.split()[1])
+			except (IndexError, ValueError):
+				raise Exception(f"Error contacting {url.netloc}: Invalid response {status_line!r}")
+			
+			# HTTP/1.0 responses are not chunked; the body runs until the server closes the connection
+			headers, _, body = (status_line + await reader.read()).partition(b"\r\n\r\n")
+		
+		finally:
+			writer.close()
+			try:
+				await writer.wait_closed()
+			except OSError:
+				# The response is already read; a connection that closes badly shouldn't hide it, or the error being raised
+				pass
+
+		# Redirects aren't followed, so only a 2xx response has the body asked for
+		if not 200 <= status < 300:
+			raise Exception(f"Error contacting {url.netloc}: Returned {status}")
+
+		return body
+
+
+class AsyncDebugHandler(AsyncUrlHandler):
+	"""
+	Asynchronous URL handler for debugging with sample XMLs from the documentation
+	Sample XMLs are loaded by `DebugHandler`, so its `dirpath` and `verbose` properties apply here as well.
+	"""
+
+	async def _api_call(self, server_address:urllib.parse.ParseResult, args:dict) -> xmltodict.OrderedDict:
+		"""Load sample XML return data for the given query"""
+		await asyncio.sleep(0)
+		return DebugHandler.api_call(server_address, args)
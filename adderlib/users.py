@@ -10,6 +10,16 @@ class AdderUser:
 		self._username = user
 		self._token = token
 	
+	def load_token(self, store, server:str, username:str) -> bool:
+		"""
+		Log a user in with a token kept in a TokenStore, if there is one.  Returns whether there was.
+		The token isn't checked here: it may since have expired.
+		"""
+		token = store.load(server, username)
+		if token:
+			self.set_logged_in(username, token)
+		return bool(token)
+
 	def set_logged_out(self):
 		"""Log the user out"""
 		self._username = ""
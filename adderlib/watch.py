@@ -0,0 +1,427 @@
+import asyncio, collections, enum, itertools, threading, time, typing
+from .delta import AdderChange, DeltaTracker
+
+
+class Subscription:
+	"""
+	A subscriber's queue of changes from a Watch
+	The queue is bounded, so a slow subscriber can't hold up the others or grow without limit.  What happens when it fills up
+	depends on the overflow policy.
+	"""
+
+	@enum.unique
+	class Overflow(enum.Enum):
+		"""What to do with changes that arrive faster than they are taken"""
+		DROP_OLDEST = "drop_oldest"	# Make room by dropping the oldest change waiting
+		DROP_NEWEST = "drop_newest"	# Drop the change that has just arrived
+		COALESCE    = "coalesce"	# Merge changes of the same type to the same record, then drop the oldest if still full
+
+	def __init__(self, *, maxsize:int=1000, overflow:"Subscription.Overflow"=Overflow.COALESCE):
+		"""
+		maxsize:int -- Most changes to hold at once
+		overflow:Overflow -- What to do with changes once the queue is full
+		"""
+
+		if int(maxsize) < 1:
+			raise ValueError("A subscription must be able to hold at least one change")
+		if not isinstance(overflow, Subscription.Overflow):
+			raise ValueError(f"Overflow policy {overflow} is not a Subscription.Overflow")
+
+		self._maxsize = int(maxsize)
+		self._overflow = overflow
+		self._pending = collections.OrderedDict()	# key -> change, oldest first
+		self._sequence = itertools.count()
+		self._dropped = 0
+		self._coalesced = 0
+		self._closed = False
+		self._ready = threading.Condition()
+
+	def _push(self, change:AdderChange):
+		"""Queue a change according to the overflow policy.  Call with the lock held."""
+
+		if self._overflow is Subscription.Overflow.COALESCE:
+			key = (change.id, change.type)
+			earlier = self._pending.get(key)
+			if earlier is not None:
+				# One change spanning both: from where the earlier one started, to where this one ended
+				self._pending[key] = AdderChange(change.type, change.id, earlier.before, change.after, earlier.old_value, change.new_value)
+				self._coalesced += 1
+				return
+		else:
+			key = next(self._sequence)
+
+		if len(self._pending) >= self._maxsize:
+			self._dropped += 1
+			if self._overflow is Subscription.Overflow.DROP_NEWEST:
+				return
+			self._pending.popitem(last=False)
+
+		self._pending[key] = change
+
+	def publish(self, changes:typing.Iterable[AdderChange]):
+		"""Queue changes for this subscriber"""
+
+		with self._ready:
+			if self._closed:
+				return
+			for change in changes:
+				self._push(change)
+			self._ready.notify_all()
+
+	def get(self, timeout:typing.Optional[float]=None) -> typing.Optional[AdderChange]:
+		"""The next change, waiting up to `timeout` seconds (or indefinitely) for one.  Returns None on timeout, or once closed and empty."""
+
+		with self._ready:
+			if not self._ready.wait_for(lambda: self._pending or self._closed, timeout):
+				return None
+			return self._pending.popitem(last=False)[1] if self._pending else None
+
+	def get_all(self) -> typing.List[AdderChange]:
+		"""All the changes waiting, without waiting for more"""
+
+		with self._ready:
+			changes = list(self._pending.values())
+			self._pending.clear()
+			return changes
+
+	def close(self):
+		"""Stop taking changes.  Changes already waiting can still be taken."""
+
+		with self._ready:
+			self._closed = True
+			self._ready.notify_all()
+
+	@property
+	def closed(self) -> bool:
+		"""Whether the subscription has stopped taking changes"""
+		return self._closed
+
+	@property
+	def dropped(self) -> int:
+		"""Number of changes dropped because the queue was full"""
+		return self._dropped
+
+	@property
+	def coalesced(self) -> int:
+		"""Number of changes merged into one already waiting"""
+		return self._coalesced
+
+	def __iter__(self) -> typing.Iterator[AdderChange]:
+		while True:
+			change = self.get()
+			if change is None:
+				return
+			yield change
+
+	def __len__(self) -> int:
+		return len(self._pending)
+
+
+class AsyncSubscription(Subscription):
+	"""A subscriber's queue of changes from an AsyncWatch, to be awaited rather than waited on"""
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self._changed = asyncio.Event()
+
+	def publish(self, changes:typing.Iterable[AdderChange]):
+		super().publish(changes)
+		self._changed.set()
+
+	def close(self):
+		super().close()
+		self._changed.set()
+
+	async def get(self, timeout:typing.Optional[float]=None) -> typing.Optional[AdderChange]:
+		"""The next change, waiting up to `timeout` seconds (or indefinitely) for one.  Returns None on timeout, or once closed and empty."""
+
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while not self._pending and not self._closed:
+			self._changed.clear()
+			try:
+				await asyncio.wait_for(self._changed.wait(), None if deadline is None else max(deadline - time.monotonic(), 0))
+			except asyncio.TimeoutError:
+				return None
+
+		with self._ready:
+			return self._pending.popitem(last=False)[1] if self._pending else None
+
+	def __iter__(self):
+		raise TypeError(f"{self.__class__.__name__} is iterated with `async for`")
+
+	async def __aiter__(self) -> typing.AsyncIterator[AdderChange]:
+		while True:
+			change = await self.get()
+			if change is None:
+				return
+			yield change
+
+
+class AdaptiveInterval:
+	"""A polling interval which shortens while changes keep coming, and lengthens while things are quiet"""
+
+	def __init__(self, minimum:float=1.0, maximum:float=30.0, *, speedup:float=0.5, slowdown:float=1.5):
+		"""
+		minimum:float -- Shortest interval, in seconds, used while changes are frequent.  Polling starts at this rate.
+		maximum:float -- Longest interval, in seconds, used while nothing is changing
+		speedup:float -- Factor the interval is multiplied by after a poll with changes
+		slowdown:float -- Factor the interval is multiplied by after a poll without
+		"""
+
+		if not 0 < minimum <= maximum:
+			raise ValueError("Intervals must be positive, with the minimum no greater than the maximum")
+		if not 0 < speedup <= 1 <= slowdown:
+			raise ValueError("The speedup must be between 0 and 1, and the slowdown at least 1")
+
+		self._minimum, self._maximum = float(minimum), float(maximum)
+		self._speedup, self._slowdown = float(speedup), float(slowdown)
+		self._current = self._minimum
+
+	def update(self, changed:bool) -> float:
+		"""Adjust the interval after a poll, and return the new one"""
+		factor = self._speedup if changed else self._slowdown
+		self._current = min(max(self._current * factor, self._minimum), self._maximum)
+		return self._current
+
+	@property
+	def current(self) -> float:
+		"""Seconds until the next poll"""
+		return self._current
+
+
+class Watch:
+	"""
+	Polls a list on a background thread and hands the changes to any number of subscribers
+	However many subscribers there are, the AIM is polled once per interval.  Subscribers each get their own bounded queue.
+	"""
+
+	def __init__(self, poll:typing.Callable[[], typing.Iterable], *, min_interval:float=1.0, max_interval:float=30.0):
+		"""
+		poll:callable -- Returns the current list of records, such as AdderAPI.getReceivers
+		min_interval:float -- Shortest polling interval, in seconds, used while changes are frequent
+		max_interval:float -- Longest polling interval, in seconds, used while nothing is changing
+		"""
+
+		self._poll = poll
+		self._interval = AdaptiveInterval(min_interval, max_interval)
+		self._tracker = None
+		self._subscribers = []
+		self._lock = threading.Lock()
+		self._stopping = threading.Event()
+		self._thread = None
+		self._polls = 0
+		self._last_error = None
+
+	def subscribe(self, *, maxsize:int=1000, overflow:Subscription.Overflow=Subscription.Overflow.COALESCE) -> Subscription:
+		"""Add a subscriber, which will get the changes from the next poll on"""
+
+		subscription = self._new_subscription(maxsize=maxsize, overflow=overflow)
+		with self._lock:
+			self._subscribers.append(subscription)
+		return subscription
+
+	def unsubscribe(self, subscription:Subscription):
+		"""Remove a subscriber, and close its subscription"""
+
+		with self._lock:
+			if subscription in self._subscribers:
+				self._subscribers.remove(subscription)
+		subscription.close()
+
+	def _new_subscription(self, **kwargs) -> Subscription:
+		return Subscription(**kwargs)
+
+	def _publish(self, records:typing.Optional[typing.Iterable]) -> typing.List[AdderChange]:
+		"""Work out and hand out the changes since the last poll, and adjust the interval.  None means the poll failed."""
+
+		if records is None:
+			changes = []
+		elif self._tracker is None:
+			# The first poll is what later ones are compared against
+			self._tracker = DeltaTracker(records)
+			changes = []
+		else:
+			changes = self._tracker.update(records)
+
+		self._polls += 1
+		self._interval.update(bool(changes))
+
+		if changes:
+			with self._lock:
+				subscribers = list(self._subscribers)
+			for subscription in subscribers:
+				subscription.publish(changes)
+		return changes
+
+	def poll(self) -> typing.List[AdderChange]:
+		"""Poll now, hand out any changes to the subscribers and return them"""
+
+		try:
+			records = list(self._poll())
+		except Exception as e:
+			# Keep watching, but back off in case the AIM is struggling
+			self._last_error = e
+			records = None
+		else:
+			self._last_error = None
+		return self._publish(records)
+
+	def _run(self):
+		while not self._stopping.is_set():
+			self.poll()
+			self._stopping.wait(self._interval.current)
+
+	def start(self):
+		"""Start polling on a background thread"""
+
+		if self.running:
+			return
+		self._stopping.clear()
+		self._thread = threading.Thread(target=self._run, name="adderlib-watch", daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		"""Stop polling, and close all subscriptions"""
+
+		self._stopping.set()
+		if self._thread is not None and self._thread is not threading.current_thread():
+			self._thread.join()
+		self._thread = None
+
+		with self._lock:
+			subscribers, self._subscribers = self._subscribers, []
+		for subscription in subscribers:
+			subscription.close()
+
+	@property
+	def running(self) -> bool:
+		"""Whether the background thread is polling"""
+		return self._thread is not None and self._thread.is_alive()
+
+	@property
+	def interval(self) -> float:
+		"""Seconds until the next poll"""
+		return self._interval.current
+
+	@property
+	def polls(self) -> int:
+		"""Number of polls made"""
+		return self._polls
+
+	@property
+	def last_error(self) -> typing.Optional[Exception]:
+		"""The error from the last poll, if it failed"""
+		return self._last_error
+
+	@property
+	def subscribers(self) -> typing.Tuple[Subscription, ...]:
+		"""The current subscriptions"""
+		with self._lock:
+			return tuple(self._subscribers)
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+
+	def __iter__(self) -> typing.Iterator[AdderChange]:
+		"""Subscribe with the default settings, and start polling if need be"""
+		subscription = self.subscribe()
+		self.start()
+		return iter(subscription)
+
+
+class AsyncWatch(Watch):
+	"""
+	Polls a list in a background task and hands the changes to any number of subscribers
+	The asynchronous counterpart of Watch, for use with AsyncAdderAPI.
+	"""
+
+	def __init__(self, poll:typing.Callable[[], typing.Awaitable[typing.Iterable]], **kwargs):
+		"""
+		poll:callable -- Returns an awaitable of the current list of records
+		See Watch for the other arguments
+		"""
+
+		super().__init__(poll, **kwargs)
+		self._task = None
+
+	def subscribe(self, *, maxsize:int=1000, overflow:Subscription.Overflow=Subscription.Overflow.COALESCE) -> AsyncSubscription:
+		return super().subscribe(maxsize=maxsize, overflow=overflow)
+
+	def _new_subscription(self, **kwargs) -> AsyncSubscription:
+		return AsyncSubscription(**kwargs)
+
+	async def poll(self) -> typing.List[AdderChange]:
+		"""Poll now, hand out any changes to the subscribers and return them"""
+
+		try:
+			records = list(await self._poll())
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			self._last_error = e
+			records = None
+		else:
+			self._last_error = None
+		return self._publish(records)
+
+	async def _run(self):
+		while True:
+			await self.poll()
+			await asyncio.sleep(self._interval.current)
+
+	def start(self):
+		"""Start polling in a background task on the running event loop"""
+
+		if self.running:
+			return
+		self._task = asyncio.get_running_loop().create_task(self._run())
+
+	def stop(self):
+		"""Stop polling, and close all subscriptions.  The task is cancelled rather than waited for; see `aclose()`."""
+
+		if self._task is not None:
+			self._task.cancel()
+
+		with self._lock:
+			subscribers, self._subscribers = self._subscribers, []
+		for subscription in subscribers:
+			subscription.close()
+
+	async def aclose(self):
+		"""Stop polling, close all subscriptions, and wait for the task to finish"""
+
+		self.stop()
+		if self._task is not None:
+			try:
+				await self._task
+			except asyncio.CancelledError:
+				pass
+		self._task = None
+
+	@property
+	def running(self) -> bool:
+		"""Whether the background task is polling"""
+		return self._task is not None and not self._task.done()
+
+	def __enter__(self):
+		raise TypeError(f"{self.__class__.__name__} is used with `async with`")
+
+	async def __aenter__(self):
+		self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.aclose()
+
+	def __iter__(self):
+		raise TypeError(f"{self.__class__.__name__} is iterated with `async for`")
+
+	def __aiter__(self) -> typing.AsyncIterator[AdderChange]:
+		"""Subscribe with the default settings, and start polling if need be"""
+		subscription = self.subscribe()
+		self.start()
+		return subscription.__aiter__()
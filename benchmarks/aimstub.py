@@ -0,0 +1,114 @@
+"""
+A tiny stand-in for an AIM server, for benchmarking adderlib without real hardware
+
+Responses are served from the example XMLs in `tests/example_xml`, keyed on the `method` query parameter.
+Custom responses can be registered per method (for example, synthetic fleets of thousands of devices).
+"""
+
+import http.server, pathlib, threading, urllib.parse, typing
+
+EXAMPLE_XML_DIR = pathlib.Path(__file__).parent.parent / "tests" / "example_xml"
+
+class AimStubServer:
+	"""Threaded HTTP/1.1 server answering `/api/?method=...` requests with canned XML"""
+
+	def __init__(self, *, responses:typing.Optional[typing.Dict[str, bytes]]=None, delay:float=0.0):
+		self.responses = dict(responses or {})
+		self.delay = delay
+		self.request_count = 0
+		self.connection_count = 0
+
+		stub = self
+
+		class _Handler(http.server.BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+			disable_nagle_algorithm = True
+
+			def setup(self):
+				super().setup()
+				stub.connection_count += 1
+
+			def do_GET(self):
+				stub.request_count += 1
+				query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+				method = query.get("method", [""])[0]
+				body = stub.response_for(method)
+
+				if stub.delay:
+					threading.Event().wait(stub.delay)
+
+				if body is None:
+					self.send_response(404)
+					self.send_header("Content-Length", "0")
+					self.end_headers()
+					return
+
+				self.send_response(200)
+				self.send_header("Content-Type", "text/xml")
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args):
+				pass
+
+		self._server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+		self._server.daemon_threads = True
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+	def response_for(self, method:str) -> typing.Optional[bytes]:
+		"""Look up the canned response for an API method"""
+		if method in self.responses:
+			return self.responses[method]
+
+		path = (EXAMPLE_XML_DIR / method).with_suffix(".xml")
+		return path.read_bytes() if method and path.is_file() else None
+
+	@property
+	def address(self) -> str:
+		"""Address to pass to `AdderAPI`"""
+		host, port = self._server.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def __enter__(self):
+		self._thread.start()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self._server.shutdown()
+		self._server.server_close()
+
+
+def fake_devices_xml(count:int, device_type:str="rx") -> bytes:
+	"""Build a `get_devices` response with `count` synthetic devices"""
+
+	device = (
+		"<device item=\"{i}\"><d_id>{i}</d_id><d_serial_number>1409A{i:07d}</d_serial_number>"
+		"<d_mac_address>00:0F:58:{a:02X}:{b:02X}:{c:02X}</d_mac_address><d_mac_address2>00:0F:59:{a:02X}:{b:02X}:{c:02X}</d_mac_address2>"
+		"<d_name>{t} {i}</d_name><d_online>{online}</d_online><d_online2>0</d_online2><d_type>{t_lower}</d_type>"
+		"<d_version>2</d_version><d_variant>v</d_variant><d_ip_address>10.{a}.{b}.{c}</d_ip_address><d_ip_address2/>"
+		"<d_description>Desk {i}</d_description><d_location>Floor {floor}</d_location><d_configured>1</d_configured>"
+		"<d_valid_firmware>1</d_valid_firmware><d_valid_backup_firmware>1</d_valid_backup_firmware>"
+		"<d_firmware>4.{minor}.{build}</d_firmware><d_backup_firmware>4.0.1000</d_backup_firmware>"
+		"<d_date_added>2021-07-14 01:37:07</d_date_added><d_status>{online}</d_status>"
+		"{extra}</device>"
+	)
+	rx_extra = (
+		"<con_exclusive>0</con_exclusive><con_control>3</con_control><con_start_time>2022-09-07 13:33:19</con_start_time>"
+		"<con_end_time/><u_username>admin</u_username><u_id>1</u_id><c_name>Channel {ch}</c_name>"
+		"<count_receiver_groups>1</count_receiver_groups><count_receiver_presets>2</count_receiver_presets><count_users>1</count_users>"
+	)
+	tx_extra = "<count_transmitter_channels>1</count_transmitter_channels><count_transmitter_presets>0</count_transmitter_presets>"
+
+	parts = [
+		"<api_response><version>8</version><timestamp>2022-09-12 14:56:11</timestamp><success>1</success>"
+		f"<page>1</page><results_per_page>{count}</results_per_page><total_devices>{count}</total_devices><count_devices>{count}</count_devices><devices>"
+	]
+	for i in range(1, count+1):
+		extra = (rx_extra if device_type == "rx" else tx_extra).format(ch=i % 500)
+		parts.append(device.format(
+			i=i, a=(i >> 16) & 0xFF, b=(i >> 8) & 0xFF, c=i & 0xFF, t=device_type.upper(), t_lower=device_type,
+			online=int(i % 10 != 0), floor=i % 20, minor=i % 3, build=16000 + i % 7, extra=extra
+		))
+	parts.append("</devices></api_response>")
+	return "".join(parts).encode("utf-8")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Compare successive polls of 10k and 50k receivers, with 1% of them changed between polls
+
+  full:      compares every receiver's properties with its previous version
+  tracker:   DeltaTracker, which passes over unchanged receivers on their fingerprints
+
+Usage: python benchmarks/bench_delta.py [count ...]
+"""
+
+import pathlib, sys, time
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from adderlib import parsers, devices, delta
+from aimstub import fake_devices_xml
+
+FIELDS = ("status", "description", "location", "is_connected", "connection_start", "firmware", "name", "channel_name")
+
+def poll(data:bytes) -> list:
+	return [devices.AdderReceiver(record) for record in parsers.XmltodictParser().iterparse([data], "devices", "device")]
+
+def changed(receivers:list, every:int=100) -> list:
+	records = [dict(rx._extended) for rx in receivers]
+	for record in records[::every]:
+		record["d_location"] = "Moved"
+	return [devices.AdderReceiver(record) for record in records]
+
+def full(before:list, after:list) -> int:
+	previous = {rx.id: rx for rx in before}
+	return sum(1 for rx in after if any(getattr(rx, field) != getattr(previous[rx.id], field) for field in FIELDS))
+
+def tracked(tracker:delta.DeltaTracker, after:list) -> int:
+	return len(tracker.update(after))
+
+if __name__ == "__main__":
+	counts = [int(x) for x in sys.argv[1:]] or [10000, 50000]
+
+	for count in counts:
+		before = poll(fake_devices_xml(count))
+		after = changed(before)
+		tracker = delta.DeltaTracker(before)
+
+		start = time.perf_counter()
+		full_changes = full(before, after)
+		full_time = time.perf_counter() - start
+
+		start = time.perf_counter()
+		tracked_changes = tracked(tracker, after)
+		tracked_time = time.perf_counter() - start
+
+		print(f"{count} receivers, {tracked_changes} changed")
+		print(f"  full      {full_time*1000:8.1f}ms")
+		print(f"  tracker   {tracked_time*1000:8.1f}ms (includes fingerprinting the new poll)")
+		assert full_changes == tracked_changes
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Compare fleet-wide queries over a FleetTable with plain loops over receiver properties, for 10k and 50k receivers
+
+  "offline ALIF2112 on firmware below 4.2", and "connected for more than 8 hours", each with a count by location
+
+Usage: python benchmarks/bench_fleet.py [count ...]
+"""
+
+import pathlib, sys, time
+from datetime import datetime, timedelta
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from adderlib import parsers, devices, fleet
+from aimstub import fake_devices_xml
+
+Status, Model = devices.AdderDevice.DeviceStatus, devices.AdderDevice.DeviceModel
+NOW = datetime(2022, 9, 12, 14, 56, 11)
+
+def loops(receivers:list):
+	offline = [rx for rx in receivers if rx.status == Status.OFFLINE and rx.model == Model.ALIF2112 and tuple(map(int, rx.firmware.split("."))) < (4, 2)]
+	cutoff = NOW - timedelta(hours=8)
+	connected = [rx for rx in receivers if rx.connection_start and not rx.connection_end and rx.connection_start < cutoff]
+	by_location = {}
+	for rx in connected:
+		by_location[rx.location] = by_location.get(rx.location, 0) + 1
+	return len(offline), len(connected)
+
+def columns(table:fleet.FleetTable):
+	offline = table.is_status(Status.OFFLINE) & table.is_model(Model.ALIF2112) & table.firmware_below("4.2")
+	connected = table.connected_longer_than(timedelta(hours=8), now=NOW.timestamp())
+	table.count_by("location", connected)
+	return offline.count(), connected.count()
+
+def timed(run, *args, repeat:int=5) -> tuple:
+	start = time.perf_counter()
+	for _ in range(repeat):
+		result = run(*args)
+	return result, (time.perf_counter() - start) / repeat
+
+if __name__ == "__main__":
+	counts = [int(x) for x in sys.argv[1:]] or [10000, 50000]
+
+	for count in counts:
+		receivers = [devices.AdderReceiver(rx) for rx in parsers.RecordParser().iterparse([fake_devices_xml(count)], "devices", "device")]
+		print(f"{count} receivers")
+
+		expected, elapsed = timed(loops, receivers)
+		print(f"  python loops        {elapsed*1000:8.2f}ms")
+
+		backends = [("array", False)] + ([("numpy", True)] if fleet.numpy is not None else [])
+		for label, use_numpy in backends:
+			start = time.perf_counter()
+			table = fleet.FleetTable(receivers, use_numpy=use_numpy)
+			build = time.perf_counter() - start
+			result, elapsed = timed(columns, table)
+			assert result == expected, (result, expected)
+			print(f"  FleetTable ({label})  {elapsed*1000:8.2f}ms   (built once in {build*1000:.1f}ms)")
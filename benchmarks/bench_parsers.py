@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Compare parser backends on synthetic `get_devices` responses of 1k, 10k and 50k receivers
+
+  xmltodict (buffered): the original path -- full OrderedDict tree, then a dict copy per AdderReceiver
+  xmltodict (streamed): XmltodictParser.iterparse() items wrapped without a copy
+  records   (streamed): RecordParser.iterparse() flat records wrapped without a copy
+
+Usage: python benchmarks/bench_parsers.py [count ...]
+"""
+
+import pathlib, sys, time, tracemalloc
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+import xmltodict
+from adderlib import parsers, devices
+from aimstub import fake_devices_xml
+
+def chunked(data:bytes, size:int=16384):
+	for offset in range(0, len(data), size):
+		yield data[offset:offset+size]
+
+def original(data:bytes) -> list:
+	response = xmltodict.parse(data).get("api_response")
+	return [devices.AdderReceiver(device) for device in response.get("devices").get("device")]
+
+def streamed(parser:parsers.ResponseParser):
+	def run(data:bytes) -> list:
+		return [devices.AdderReceiver(device) for device in parser.iterparse(chunked(data), "devices", "device")]
+	return run
+
+def measure(run, data:bytes):
+	start = time.perf_counter()
+	result = run(data)
+	elapsed = time.perf_counter() - start
+	count = len(result)
+	del result
+
+	tracemalloc.start()
+	run(data)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return count, elapsed, peak
+
+if __name__ == "__main__":
+	counts = [int(x) for x in sys.argv[1:]] or [1000, 10000, 50000]
+	backends = (
+		("xmltodict (buffered)", original),
+		("xmltodict (streamed)", streamed(parsers.XmltodictParser())),
+		("records   (streamed)", streamed(parsers.RecordParser())),
+	)
+
+	for count in counts:
+		data = fake_devices_xml(count)
+		print(f"{count} receivers ({len(data)/1024/1024:.1f}MiB of XML)")
+		for label, run in backends:
+			parsed, elapsed, peak = measure(run, data)
+			assert parsed == count
+			print(f"  {label}   {elapsed*1000:9.1f}ms   {elapsed/count*1e6:6.2f}us/entity   peak memory {peak/1024/1024:7.1f}MiB")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Compare dict-backed entities with the compact slot-based ones, for fleets of 1k, 10k and 50k receivers
+
+  dict-backed: the previous AdderReceiver -- keeps the parsed record and decodes fields on every access
+  compact:     AdderReceiver as it is now -- decodes each field once into slots, sharing repeated strings
+
+Memory is what the entities hold on to once built.  Access time covers reading a typical set of properties from every entity.
+
+Usage: python benchmarks/bench_records.py [count ...]
+"""
+
+import gc, ipaddress, pathlib, sys, time, tracemalloc
+from datetime import datetime
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from adderlib import parsers, devices
+from aimstub import fake_devices_xml
+
+class DictReceiver:
+	"""The dict-backed AdderReceiver, cut down to the properties read here"""
+
+	def __init__(self, properties:dict):
+		self._extended = properties
+
+	@property
+	def location(self) -> str:
+		return self._extended.get("d_location","")
+
+	@property
+	def firmware(self) -> str:
+		return self._extended.get("d_firmware","")
+
+	@property
+	def ip_addresses(self):
+		return (
+			ipaddress.ip_address(self._extended.get("d_ip_address")) if self._extended.get("d_ip_address") else None,
+			ipaddress.ip_address(self._extended.get("d_ip_address2")) if self._extended.get("d_ip_address2") else None,
+		)
+
+	@property
+	def ip_address(self):
+		return self.ip_addresses[0] or None
+
+	@property
+	def network_interfaces(self):
+		return (
+			devices.NetworkInterface(self.ip_addresses[0], self._extended.get("d_mac_address",""), int(self._extended.get("d_online",-1))>0),
+			devices.NetworkInterface(self.ip_addresses[1], self._extended.get("d_mac_address2",""), int(self._extended.get("d_online2",-1))>0)
+		)
+
+	@property
+	def status(self):
+		try:
+			return devices.AdderDevice.DeviceStatus(int(self._extended.get("d_status")))
+		except Exception:
+			return devices.AdderDevice.DeviceStatus(-1)
+
+	@property
+	def model(self):
+		try:
+			if self._extended.get("d_version") == '2':
+				return devices.AdderDevice.DeviceModel(self._extended.get("d_variant"))
+			else:
+				return devices.AdderDevice.DeviceModel(self._extended.get("d_version"))
+		except:
+			return devices.AdderDevice.DeviceModel.UNKNOWN
+
+	@property
+	def connection_start(self):
+		if self._extended.get("con_start_time"):
+			return datetime.fromisoformat(self._extended.get("con_start_time"))
+		return None
+
+def chunked(data:bytes, size:int=16384):
+	for offset in range(0, len(data), size):
+		yield data[offset:offset+size]
+
+def build(entity_type, data:bytes) -> list:
+	return [entity_type(device) for device in parsers.XmltodictParser().iterparse(chunked(data), "devices", "device")]
+
+def read_all(entities:list):
+	for rx in entities:
+		rx.status, rx.model, rx.ip_address, rx.network_interfaces, rx.connection_start, rx.firmware, rx.location
+
+def measure(entity_type, data:bytes):
+	# Timing and memory are measured in separate passes, as tracing allocations slows everything down
+	start = time.perf_counter()
+	entities = build(entity_type, data)
+	build_time = time.perf_counter() - start
+
+	start = time.perf_counter()
+	read_all(entities)
+	access_time = time.perf_counter() - start
+	del entities
+
+	gc.collect()
+	tracemalloc.start()
+	entities = build(entity_type, data)
+	gc.collect()
+	retained, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return len(entities), build_time, retained, access_time
+
+if __name__ == "__main__":
+	counts = [int(x) for x in sys.argv[1:]] or [1000, 10000, 50000]
+	kinds = (
+		("dict-backed", DictReceiver),
+		("compact    ", devices.AdderReceiver),
+	)
+
+	for count in counts:
+		data = fake_devices_xml(count)
+		print(f"{count} receivers")
+		for label, entity_type in kinds:
+			built, build_time, retained, access_time = measure(entity_type, data)
+			assert built == count
+			print(f"  {label}   build {build_time*1000:8.1f}ms   retained {retained/1024/1024:6.1f}MiB ({retained/count:5.0f}B/entity)   access {access_time*1000:8.1f}ms ({access_time/count*1e6:5.2f}us/entity)")
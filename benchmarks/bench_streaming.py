@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Compare buffered and streamed decoding of a large `get_devices` response
+
+Reports time-to-first-receiver, total time and peak traced memory while iterating getReceivers().
+Usage: python benchmarks/bench_streaming.py [device_count]
+"""
+
+import pathlib, sys, time, tracemalloc
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from adderlib import adder, urlhandlers
+from aimstub import AimStubServer, fake_devices_xml
+
+class BufferedHandler(urlhandlers.SessionHandler):
+	"""SessionHandler without streaming: the whole response is parsed by api_call() first"""
+	api_stream = urlhandlers.UrlHandler.api_stream
+
+def measure(api:adder.AdderAPI):
+	"""Time one pass over getReceivers(), then trace peak memory over a second pass"""
+	start = time.perf_counter()
+	first = None
+	count = 0
+
+	for rx in api.getReceivers():
+		if first is None:
+			first = time.perf_counter() - start
+		count += 1
+	
+	total = time.perf_counter() - start
+
+	tracemalloc.start()
+	for rx in api.getReceivers():
+		pass
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return count, first, total, peak
+
+if __name__ == "__main__":
+	device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+	with AimStubServer(responses={"get_devices": fake_devices_xml(device_count)}) as stub:
+		for label, handler in (("buffered", BufferedHandler()), ("streamed", urlhandlers.SessionHandler())):
+			count, first, total, peak = measure(adder.AdderAPI(stub.address, url_handler=handler))
+			print(f"{label.ljust(10)} {count} receivers   first after {first*1000:8.1f}ms   total {total*1000:8.1f}ms   peak memory {peak/1024/1024:7.1f}MiB")
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Compare per-call latency of `RequestsHandler` (new connection per call) and `SessionHandler` (kept-alive pool)
+
+Usage: python benchmarks/bench_urlhandlers.py [calls] [server_address]
+Without a server address, a local AIM stub is started.
+"""
+
+import pathlib, statistics, sys, time
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from adderlib import adder, urlhandlers
+from aimstub import AimStubServer
+
+def time_calls(api:adder.AdderAPI, calls:int) -> list:
+	"""Time `calls` sequential getServers() requests, in milliseconds"""
+	timings = []
+	for _ in range(calls):
+		start = time.perf_counter()
+		list(api.getServers())
+		timings.append((time.perf_counter() - start) * 1000)
+	return timings
+
+def report(label:str, timings:list):
+	timings = sorted(timings)
+	p95 = timings[int(len(timings) * 0.95) - 1]
+	print(f"{label.ljust(18)} mean {statistics.mean(timings):7.3f}ms   median {statistics.median(timings):7.3f}ms   p95 {p95:7.3f}ms")
+
+def run(address:str, calls:int):
+	api = adder.AdderAPI(address, url_handler=urlhandlers.RequestsHandler())
+	report("RequestsHandler", time_calls(api, calls))
+
+	with urlhandlers.SessionHandler(pool_size=1) as handler:
+		api = adder.AdderAPI(address, url_handler=handler)
+		report("SessionHandler", time_calls(api, calls))
+		stats = handler.stats
+		print(f"{''.ljust(18)} {stats.requests_sent} requests over {stats.connections_opened} connection(s), {stats.reuse_ratio:.1%} reused")
+
+if __name__ == "__main__":
+	calls = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+	if len(sys.argv) > 2:
+		run(sys.argv[2], calls)
+	else:
+		with AimStubServer() as stub:
+			run(stub.address, calls)
@@ -25,10 +25,13 @@ def promptChannels(api:adder.AdderAPI) -> adder.AdderChannel:
 
 def promptReceivers(api:adder.AdderAPI) -> adder.AdderReceiver:
 	"""Request a specific transmitter"""
-	receivers = [x for x in api.getReceivers() if x.status is x.status.ONLINE]
+	# Fetch receivers and channels once, rather than looking up each receiver's channel in turn
+	graph = api.getChannelGraph()
+	receivers = [x for x in graph.receivers if x.status is x.status.ONLINE]
 
 	for idx, rx in enumerate(receivers):
-		print(f"{str(idx+1).rjust(3)}: {rx.name}  (-> {next(api.getChannels(name=rx.channel_name)).name})")
+		channel = graph.channel_for(rx)
+		print(f"{str(idx+1).rjust(3)}: {rx.name}  (-> {channel.name if channel else 'None'})")
 	if not len(receivers):
 		raise NoDevicesFound("No receivers were found to be online.")
 
@@ -34,5 +34,6 @@ setup(
 	],
 	packages=["adderlib"],
 	include_package_data=True,
-	install_requires=["requests", "xmltodict==0.12.0"]
+	install_requires=["requests", "xmltodict==0.12.0"],
+	extras_require={"numpy": ["numpy"]}
 )
\ No newline at end of file
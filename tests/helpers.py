@@ -0,0 +1,16 @@
+import collections
+from adderlib import urlhandlers
+
+class CountingDebugHandler(urlhandlers.DebugHandler):
+	"""Debug handler which counts the requests made for each method, whether called or streamed"""
+
+	def __init__(self):
+		self.calls = collections.Counter()
+
+	def api_call(self, server_address, args):
+		self.calls[args.get("method")] += 1
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		self.calls[args.get("method")] += 1
+		return super().api_stream(server_address, args, container, item)
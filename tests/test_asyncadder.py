@@ -0,0 +1,104 @@
+import unittest, asyncio
+from adderlib import asyncadder, adder, urlhandlers, channels, devices
+from test_urlhandlers import LocalServerTestCase
+
+# Config
+test_user    = "valid_username"
+test_pass    = "valid_password"
+test_addr    = "localhost"
+
+class _CountingHandler(urlhandlers.AsyncDebugHandler):
+	"""Debug handler which records how many calls overlap"""
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.peak = 0
+
+	async def _api_call(self, server_address, args):
+		self.peak = max(self.peak, self.in_flight)
+		await asyncio.sleep(0.01)
+		return await super()._api_call(server_address, args)
+
+class TestAsyncAdderAPI(unittest.IsolatedAsyncioTestCase):
+
+	async def asyncSetUp(self):
+		self.api = asyncadder.AsyncAdderAPI(test_addr, url_handler=urlhandlers.AsyncDebugHandler())
+		await self.api.login(test_user, test_pass)
+
+	async def asyncTearDown(self):
+		await self.api.logout()
+
+	async def test_login_cycle(self):
+		"""Test a valid user can log in, and not log in twice"""
+
+		self.assertTrue(self.api.user.logged_in)
+		with self.assertRaises(adder.AdderRequestError):
+			await self.api.login(test_user, test_pass)
+
+	async def test_getters(self):
+		"""The get* methods should be async generators of entities"""
+
+		chans = [ch async for ch in self.api.getChannels()]
+		self.assertGreater(len(chans), 0)
+		for ch in chans:
+			self.assertIsInstance(ch, channels.AdderChannel)
+
+		receivers = [rx async for rx in self.api.getReceivers()]
+		self.assertGreater(len(receivers), 0)
+		for rx in receivers:
+			self.assertIsInstance(rx, devices.AdderReceiver)
+
+		usb_rx = [rx async for rx in self.api.getUSBReceivers()]
+		self.assertEqual([rx.mac_address for rx in usb_rx], ["aa:aa:aa:aa:aa:aa"])
+
+		receiver = [rx async for rx in self.api.getReceivers(r_id="64")]
+		self.assertEqual(len(receiver), 1)
+
+	async def test_commands(self):
+		"""Commands should complete without raising"""
+
+		rx = [rx async for rx in self.api.getReceivers()][0]
+		ch = [ch async for ch in self.api.getChannels()][0]
+		await self.api.connectToChannel(ch, rx)
+		await self.api.disconnectFromChannel(rx)
+
+	async def test_in_flight_limit(self):
+		"""No more than `max_in_flight` calls should await the server at once"""
+
+		handler = _CountingHandler(max_in_flight=3)
+		self.api.setUrlHandler(handler)
+
+		async def count_receivers():
+			return len([rx async for rx in self.api.getReceivers()])
+
+		results = await asyncio.gather(*(count_receivers() for _ in range(12)))
+		self.assertEqual(results, [2]*12)
+		self.assertEqual(handler.peak, 3)
+
+		self.api.setUrlHandler(urlhandlers.AsyncDebugHandler())
+
+class TestAsyncHttpHandler(LocalServerTestCase):
+
+	def test_get_over_http(self):
+		"""Responses should be fetched and parsed over a real socket"""
+
+		async def fetch():
+			api = asyncadder.AsyncAdderAPI(self.address, url_handler=urlhandlers.AsyncHttpHandler(timeout=2))
+			return [server async for server in api.getServers()]
+
+		servers = asyncio.run(fetch())
+		self.assertEqual(len(servers), 2)
+		self.assertEqual(servers[0].role, devices.AdderServer.Role.PRIMARY)
+
+	def test_only_2xx_succeeds(self):
+		"""Redirects and errors should raise, rather than be parsed as a response"""
+
+		handler = urlhandlers.AsyncHttpHandler(timeout=2)
+		server_address = asyncadder.AsyncAdderAPI(self.address).server_address
+		for method in ("moved", "no_such_method"):
+			with self.subTest(method=method):
+				with self.assertRaisesRegex(Exception, "Returned"):
+					asyncio.run(handler.api_call(server_address, {"method": method}))
+
+if __name__ == "__main__":
+	unittest.main()
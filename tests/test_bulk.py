@@ -0,0 +1,99 @@
+import unittest, threading, time, asyncio
+from adderlib import adder, asyncadder, urlhandlers, devices, channels
+
+class _SlowConnectHandler(urlhandlers.DebugHandler):
+	"""Debug handler which takes a while over each connection, refuses receiver 2, and records how many overlap"""
+
+	def __init__(self, delay:float=0.05):
+		self.delay = delay
+		self.active = 0
+		self.peak = 0
+		self._lock = threading.Lock()
+
+	def api_call(self, server_address, args):
+		if args.get("method") != "connect_channel":
+			return super().api_call(server_address, args)
+
+		with self._lock:
+			self.active += 1
+			self.peak = max(self.peak, self.active)
+		try:
+			time.sleep(self.delay)
+		finally:
+			with self._lock:
+				self.active -= 1
+
+		if args.get("rx_id") == "2":
+			return {"errors": {"error": {"code": "10", "msg": "Receiver in use"}}}
+		return super().api_call(server_address, args)
+
+class _SlowAsyncConnectHandler(urlhandlers.AsyncDebugHandler):
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.active = 0
+		self.peak = 0
+
+	async def _api_call(self, server_address, args):
+		if args.get("method") != "connect_channel":
+			return await super()._api_call(server_address, args)
+
+		self.active += 1
+		self.peak = max(self.peak, self.active)
+		try:
+			await asyncio.sleep(0.05)
+		finally:
+			self.active -= 1
+		if args.get("rx_id") == "2":
+			return {"errors": {"error": {"code": "10", "msg": "Receiver in use"}}}
+		return await super()._api_call(server_address, args)
+
+def pairs(count:int) -> list:
+	channel = channels.AdderChannel({"c_id": "1", "c_name": "Edit 1"})
+	return [(channel, devices.AdderReceiver({"d_id": str(n)})) for n in range(count)]
+
+class TestConnectMany(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _SlowConnectHandler()
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+
+	def test_results(self):
+		"""Every pair should be attempted, with failures reported rather than raised"""
+
+		result = self.api.connectMany(pairs(6), max_concurrency=3)
+		self.assertEqual(len(result), 6)
+		self.assertFalse(result.ok)
+		self.assertEqual([r.pair.receiver.id for r in result.failed], ["2"])
+		self.assertIsInstance(result.failed[0].error, adder.AdderRequestError)
+		self.assertEqual(len(result.succeeded), 5)
+		self.assertTrue(all(r.latency >= self.handler.delay for r in result))
+
+	def test_concurrency(self):
+		"""Connections should overlap, but no more than allowed"""
+
+		result = self.api.connectMany(pairs(12), max_concurrency=4)
+		self.assertEqual(self.handler.peak, 4)
+		self.assertEqual(len(result), 12)
+
+	def test_bad_arguments(self):
+		with self.assertRaises(ValueError):
+			self.api.connectMany(pairs(2), max_concurrency=0)
+		with self.assertRaises(ValueError):
+			self.api.connectMany(pairs(2) + pairs(1))
+		self.assertTrue(self.api.connectMany([]).ok)
+
+class TestAsyncConnectMany(unittest.IsolatedAsyncioTestCase):
+
+	async def test_results(self):
+		handler = _SlowAsyncConnectHandler()
+		api = asyncadder.AsyncAdderAPI("localhost", url_handler=handler)
+		await api.login("valid_username", "valid_password")
+
+		result = await api.connectMany(pairs(8), max_concurrency=4)
+		self.assertEqual([r.pair.receiver.id for r in result.failed], ["2"])
+		self.assertEqual(handler.peak, 4)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,80 @@
+import unittest, threading
+from adderlib import adder, caching
+from helpers import CountingDebugHandler
+
+class TestCachingHandler(unittest.TestCase):
+
+	def setUp(self):
+		self.inner = CountingDebugHandler()
+		self.cache = caching.CachingHandler(self.inner, ttls={"get_servers": 0}, default_ttl=60)
+		self.api = adder.AdderAPI("localhost", url_handler=self.cache)
+		self.api.login("valid_username", "valid_password")
+
+	def test_reads_are_cached(self):
+		"""Repeated reads should be answered from the cache"""
+
+		for _ in range(3):
+			self.assertEqual(len(list(self.api.getReceivers())), 2)
+		self.assertEqual(self.inner.calls["get_devices"], 1)
+		self.assertEqual(self.cache.stats.hits, 2)
+		self.assertEqual(self.cache.stats.misses, 1)
+
+		# Different arguments are cached separately
+		list(self.api.getTransmitters())
+		self.assertEqual(self.inner.calls["get_devices"], 2)
+
+	def test_zero_ttl_is_not_cached(self):
+		"""Methods with a TTL of 0 should always be called"""
+
+		for _ in range(3):
+			list(self.api.getServers())
+		self.assertEqual(self.inner.calls["get_servers"], 3)
+
+	def test_expiry(self):
+		"""Results should be fetched again once their TTL has passed"""
+
+		self.cache.set_ttl("get_channels", 0.01)
+		list(self.api.getChannels())
+		threading.Event().wait(0.02)
+		list(self.api.getChannels())
+		self.assertEqual(self.inner.calls["get_channels"], 2)
+
+	def test_write_invalidates(self):
+		"""Mutating calls should drop the results they affect, and only those"""
+
+		rx = next(self.api.getReceivers())
+		ch = next(self.api.getChannels())
+		list(self.api.getPresets())
+		usb = list(self.api.getUSBReceivers())
+
+		self.api.connectToChannel(ch, rx)
+		list(self.api.getReceivers())
+		list(self.api.getChannels())
+		list(self.api.getPresets())
+		self.assertEqual([rx.mac_address for rx in self.api.getUSBReceivers()], [rx.mac_address for rx in usb])
+
+		self.assertEqual(self.inner.calls["get_devices"], 2)
+		self.assertEqual(self.inner.calls["get_channels"], 2)
+		self.assertEqual(self.inner.calls["get_presets"], 2)
+		self.assertEqual(self.inner.calls["get_all_c_usb"], 1)
+		self.assertEqual(self.cache.stats.invalidations, 3)
+
+	def test_lru_eviction(self):
+		"""The least recently used result should be evicted first"""
+
+		cache = caching.CachingHandler(self.inner, default_ttl=60, max_entries=2)
+		api = adder.AdderAPI("localhost", url_handler=cache)
+		list(api.getReceivers())
+		list(api.getTransmitters())
+		list(api.getReceivers())
+		list(api.getChannels())
+
+		self.assertEqual(cache.stats.evictions, 1)
+		self.assertEqual(cache.stats.entries, 2)
+
+		calls = self.inner.calls["get_devices"]
+		list(api.getReceivers())
+		self.assertEqual(self.inner.calls["get_devices"], calls)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,110 @@
+import unittest, collections, time
+from adderlib import cluster, channels, devices, urlhandlers
+
+class _PairHandler(urlhandlers.DebugHandler):
+	"""Debug handler for a primary and backup AIM, either of which can be taken down"""
+
+	def __init__(self):
+		self.down = set()
+		self.tokens = {}		# netloc -> tokens issued there
+		self.calls = collections.defaultdict(list)
+		self.active = "10.0.0.1"
+
+	def api_call(self, server_address, args):
+		host = server_address.hostname
+		self.calls[host].append(args.get("method"))
+		if host in self.down:
+			raise ConnectionError(f"{host} is down")
+
+		if args.get("method") == "login":
+			token = f"{host}-{len(self.tokens.setdefault(host, []))}"
+			self.tokens[host].append(token)
+			return {"success": "1", "token": token}
+		if args.get("token") not in self.tokens.get(host, ()):
+			return {"success": "0", "errors": {"error": {"code": "1", "msg": "Not logged in"}}}
+		if args.get("method") == "get_servers":
+			servers = [
+				{"name": "aim1", "ip": "10.0.0.1", "role": "primary", "status": "active" if self.active == "10.0.0.1" else "failed"},
+				{"name": "aim2", "ip": "10.0.0.2", "role": "backup", "status": "active" if self.active == "10.0.0.2" else "standby"},
+			]
+			return {"success": "1", "servers": {"server": servers}}
+		if args.get("method") == "connect_channel":
+			return {"success": "1"}
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		return urlhandlers.UrlHandler.api_stream(self, server_address, args, container, item)
+
+class TestClusterAdderAPI(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _PairHandler()
+		self.api = cluster.ClusterAdderAPI("10.0.0.1", url_handler=self.handler, probe=lambda address, timeout: address.hostname not in self.handler.down, probe_interval=0.02)
+
+	def tearDown(self):
+		self.api.stop()
+
+	def test_discover(self):
+		self.api.login("timmy", "pass")
+		members = {member.address.hostname: member for member in self.api.members}
+		self.assertEqual(set(members), {"10.0.0.1", "10.0.0.2"})
+		self.assertEqual(members["10.0.0.2"].role, devices.AdderServer.Role.BACKUP)
+		self.assertTrue(self.api.active.reported_active)
+
+	def test_health_check(self):
+		"""The background health checks should move requests off a server that goes down, within a few checks"""
+
+		self.api.login("timmy", "pass")
+		self.handler.down.add("10.0.0.1")
+
+		deadline = time.monotonic() + 1
+		while self.api.active.address.hostname != "10.0.0.2" and time.monotonic() < deadline:
+			time.sleep(0.01)
+		self.assertEqual(self.api.active.address.hostname, "10.0.0.2")
+		self.assertFalse(self.api.members[0].healthy)
+
+		# Logged in again on arrival
+		self.assertEqual(len(list(self.api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["10.0.0.2"].count("login"), 1)
+		self.assertEqual(self.api.failovers, 1)
+
+	def test_read_retried(self):
+		"""A read which can't reach the active server should be made again on the other"""
+
+		self.api.login("timmy", "pass")
+		self.api.stop()
+		self.handler.down.add("10.0.0.1")
+
+		self.assertEqual(len(list(self.api.getChannels())), 2)
+		self.assertEqual(self.api.active.address.hostname, "10.0.0.2")
+
+	def test_change_not_replayed(self):
+		"""A change which can't reach the active server may have been made, so shouldn't be made again"""
+
+		self.api.login("timmy", "pass")
+		self.api.stop()
+		self.handler.down.add("10.0.0.1")
+
+		with self.assertRaises(ConnectionError):
+			self.api.connectToChannel(channels.AdderChannel({"c_id": "1"}), devices.AdderReceiver({"d_id": "2"}))
+		self.assertNotIn("connect_channel", self.handler.calls["10.0.0.2"])
+		self.assertEqual(self.api.active.address.hostname, "10.0.0.2")
+
+	def test_login_to_backup(self):
+		"""Logging in should find the backup if the server given is down"""
+
+		self.handler.down.add("10.0.0.1")
+		self.handler.active = "10.0.0.2"
+		api = cluster.ClusterAdderAPI("10.0.0.1", backup_address="10.0.0.2", url_handler=self.handler, probe=lambda address, timeout: False)
+		api.login("timmy", "pass")
+		api.stop()
+		self.assertEqual(api.active.address.hostname, "10.0.0.2")
+
+	def test_role_change(self):
+		"""Requests should follow the active role to the other server, even if neither is down"""
+
+		self.api.login("timmy", "pass")
+		self.api.stop()
+		self.handler.active = "10.0.0.2"
+		self.api.discover()
+		self.assertEqual(self.api.active.address.hostname, "10.0.0.2")
@@ -0,0 +1,75 @@
+import unittest, threading, asyncio
+from adderlib import adder, asyncadder, urlhandlers, coalescing
+from helpers import CountingDebugHandler
+
+class _SlowDebugHandler(CountingDebugHandler):
+	"""Debug handler which takes a while to answer"""
+
+	def api_call(self, server_address, args):
+		threading.Event().wait(0.3)
+		return super().api_call(server_address, args)
+
+class TestCoalescingHandler(unittest.TestCase):
+
+	def test_concurrent_reads_share_a_call(self):
+		"""Identical concurrent reads should result in a single call"""
+
+		inner = _SlowDebugHandler()
+		handler = coalescing.CoalescingHandler(inner)
+		api = adder.AdderAPI("localhost", url_handler=handler)
+
+		results = []
+		threads = [threading.Thread(target=lambda: results.append(len(list(api.getReceivers())))) for _ in range(10)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(results, [2]*10)
+		self.assertEqual(inner.calls["get_devices"], 1)
+		self.assertEqual(handler.calls_coalesced, 9)
+
+		# Once finished, the next read is a new call
+		list(api.getReceivers())
+		self.assertEqual(inner.calls["get_devices"], 2)
+
+	def test_writes_are_not_coalesced(self):
+		"""Concurrent mutating calls should each reach the server"""
+
+		inner = _SlowDebugHandler()
+		api = adder.AdderAPI("localhost", url_handler=coalescing.CoalescingHandler(inner))
+		rx = next(api.getReceivers())
+
+		threads = [threading.Thread(target=api.identifyDevice, args=(rx,)) for _ in range(4)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(inner.calls["identify_device"], 4)
+
+	def test_async_reads_share_a_call(self):
+		"""Identical concurrent reads from tasks should result in a single call"""
+
+		class SlowAsyncHandler(urlhandlers.AsyncDebugHandler):
+			calls = 0
+			async def _api_call(self, server_address, args):
+				SlowAsyncHandler.calls += 1
+				await asyncio.sleep(0.05)
+				return await super()._api_call(server_address, args)
+
+		handler = coalescing.AsyncCoalescingHandler(SlowAsyncHandler())
+		api = asyncadder.AsyncAdderAPI("localhost", url_handler=handler)
+
+		async def count_receivers():
+			return len([rx async for rx in api.getReceivers()])
+
+		async def run():
+			return await asyncio.gather(*(count_receivers() for _ in range(10)))
+
+		self.assertEqual(asyncio.run(run()), [2]*10)
+		self.assertEqual(SlowAsyncHandler.calls, 1)
+		self.assertEqual(handler.calls_coalesced, 9)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from adderlib import devices, delta
+
+Change = delta.AdderChange.ChangeType
+
+def receiver(id:str, **fields) -> devices.AdderReceiver:
+	record = {"@item": id, "d_id": id, "d_name": f"RX {id}", "d_status": "1", "d_location": "Floor 3", "d_description": ""}
+	record.update(fields)
+	return devices.AdderReceiver(record)
+
+class TestDelta(unittest.TestCase):
+
+	def test_fingerprint(self):
+		"""Fingerprints should follow the record's content, but not its position in the list"""
+
+		self.assertEqual(receiver("1").fingerprint, receiver("1", **{"@item": "7"}).fingerprint)
+		self.assertNotEqual(receiver("1").fingerprint, receiver("1", d_location="Floor 4").fingerprint)
+
+	def test_added_removed(self):
+		changes = delta.diff([receiver("1"), receiver("2")], [receiver("2"), receiver("3")])
+		self.assertEqual({(c.type, c.id) for c in changes}, {(Change.ADDED, "3"), (Change.REMOVED, "1")})
+
+	def test_field_changes(self):
+		"""Each kind of change should be reported with its old and new values"""
+
+		before = [receiver("1"), receiver("2"), receiver("3", con_start_time="2022-09-12 09:00:00"), receiver("4")]
+		after = [
+			receiver("1", d_status="0", d_description="Flickering"),
+			receiver("2", con_start_time="2022-09-12 10:00:00", c_name="Edit 1"),
+			receiver("3", con_start_time="2022-09-12 09:00:00", con_end_time="2022-09-12 11:00:00"),
+			receiver("4", d_firmware="4.3.48200"),
+		]
+		changes = {(c.type, c.id): c for c in delta.diff(before, after)}
+
+		self.assertEqual(set(changes), {
+			(Change.STATUS_CHANGED, "1"), (Change.DESCRIPTION_CHANGED, "1"), (Change.CONNECTION_STARTED, "2"),
+			(Change.CONNECTION_ENDED, "3"), (Change.OTHER_CHANGED, "4"),
+		})
+		status = changes[(Change.STATUS_CHANGED, "1")]
+		self.assertEqual((status.old_value, status.new_value), (devices.AdderDevice.DeviceStatus.ONLINE, devices.AdderDevice.DeviceStatus.OFFLINE))
+		self.assertEqual(changes[(Change.CONNECTION_STARTED, "2")].new_value, "Edit 1")
+
+	def test_switched_channel(self):
+		"""A receiver moving straight to another channel should end one connection and start another"""
+
+		before = [receiver("1", con_start_time="2022-09-12 09:00:00", c_name="Edit 1")]
+		after = [receiver("1", con_start_time="2022-09-12 10:00:00", c_name="Edit 2")]
+		self.assertEqual([c.type for c in delta.diff(before, after)], [Change.CONNECTION_ENDED, Change.CONNECTION_STARTED])
+
+	def test_tracker(self):
+		"""Unchanged polls should report nothing"""
+
+		tracker = delta.DeltaTracker([receiver("1"), receiver("2")])
+		self.assertEqual(tracker.update([receiver("2"), receiver("1")]), [])
+		self.assertEqual([c.type for c in tracker.update([receiver("1", d_location="Floor 4")])], [Change.LOCATION_CHANGED, Change.REMOVED])
+		self.assertEqual(len(tracker), 1)
+		self.assertEqual(tracker.get("1").location, "Floor 4")
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from adderlib import adder, urlhandlers, filters, devices
+
+class _RecordingDebugHandler(urlhandlers.DebugHandler):
+	"""Debug handler which keeps the arguments of each call"""
+
+	def __init__(self):
+		self.requests = []
+
+	def api_call(self, server_address, args):
+		self.requests.append(dict(args))
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		self.requests.append(dict(args))
+		return super().api_stream(server_address, args, container, item)
+
+class TestFilterPushdown(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _RecordingDebugHandler()
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+
+	def test_device_query_args(self):
+		"""Search strings and supported statuses should become API arguments"""
+
+		filter = filters.DeviceFilter().named("Desk").located("Floor 3").with_status(devices.AdderDevice.DeviceStatus.OFFLINE).with_id("12")
+		self.assertEqual(filter.query_args(), {"filter_d_name":"Desk", "filter_d_location":"Floor 3", "status":"offline"})
+
+		# ONLINE can't be requested from the API
+		self.assertTrue(filters.DeviceFilter(status=devices.AdderDevice.DeviceStatus.ONLINE).is_local_only)
+
+	def test_pushed_down(self):
+		"""Filters should be sent to the AIM with the request"""
+
+		list(self.api.getReceivers(filter=filters.DeviceFilter(name="RX")))
+		self.assertEqual(self.handler.requests[-1]["filter_d_name"], "RX")
+
+		list(self.api.getChannels(filter=filters.ChannelFilter(location="Location", favourites_only=True)))
+		self.assertEqual(self.handler.requests[-1]["filter_c_location"], "Location")
+		self.assertEqual(self.handler.requests[-1]["filter_favourites"], 1)
+
+	def test_local_fallback(self):
+		"""Criteria the AIM can't apply -- or ignores -- should still be applied"""
+
+		# The debug handler ignores filters entirely, so these are all applied locally
+		self.assertEqual([rx.name for rx in self.api.getReceivers(filter=filters.DeviceFilter(name="rx 1"))], ["RX 123"])
+		self.assertEqual([rx.id for rx in self.api.getReceivers("64")], ["64"])
+		self.assertEqual([ch.id for ch in self.api.getChannels(name="Channel 2")], ["5"])
+		self.assertEqual([ch.id for ch in self.api.getChannels(filter=filters.ChannelFilter().favourites())], ["5"])
+		self.assertEqual([ps.id for ps in self.api.getPresets(filter=filters.PresetFilter().where(lambda ps: ps.pair_count > 1))], ["4"])
+
+		offline = filters.DeviceFilter(status=devices.AdderDevice.DeviceStatus.OFFLINE)
+		self.assertEqual([tx.id for tx in self.api.getTransmitters(filter=offline)], ["64"])
+
+	def test_combined_predicates(self):
+		"""Predicates added with where() should all have to hold"""
+
+		filter = filters.DeviceFilter().where(lambda d: d.id != "").where(lambda d: d.name.startswith("TX"))
+		self.assertEqual([tx.id for tx in self.api.getTransmitters(filter=filter)], ["64"])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime, timedelta
+from adderlib import devices, fleet
+
+Status = devices.AdderDevice.DeviceStatus
+Model  = devices.AdderDevice.DeviceModel
+
+def _receiver(i:int, status:int, variant:str, firmware:str, start:str=None, end:str=None, location:str="Floor 1"):
+	return devices.AdderReceiver({
+		"d_id": str(i), "d_name": f"RX {i}", "d_status": str(status), "d_online": str(int(status > 0)),
+		"d_version": "2", "d_variant": variant, "d_firmware": firmware, "d_location": location,
+		"con_start_time": start, "con_end_time": end
+	})
+
+NOW = datetime(2022, 9, 12, 18, 0, 0)
+FLEET = [
+	_receiver(1, 0, "v", "4.3.48200", location="Floor 2"),
+	_receiver(2, 1, "v", "4.5.1000", start="2022-09-12 06:00:00"),
+	_receiver(3, 0, "v", "4.5.1000"),
+	_receiver(4, 1, "t", "4.3.48200", start="2022-09-12 16:00:00"),
+	_receiver(5, 0, "t", "3.9.1", start="2022-09-11 08:00:00", end="2022-09-11 17:00:00", location="Floor 2"),
+	devices.AdderTransmitter({"d_id": "6", "d_status": "1", "d_online": "1", "d_version": "2", "d_variant": "b", "d_firmware": "4.5.1000"}),
+]
+
+class _FleetTests:
+	"""Tests run against each storage backend"""
+
+	use_numpy = False
+
+	def setUp(self):
+		self.table = fleet.FleetTable(FLEET, use_numpy=self.use_numpy)
+
+	def ids(self, mask=None, **kwargs):
+		return [device.id for device in self.table.devices(mask, **kwargs)]
+
+	def test_filters(self):
+		"""Masks should select the matching devices, and combine"""
+
+		offline_2112 = self.table.is_status(Status.OFFLINE) & self.table.is_model(Model.ALIF2112)
+		self.assertEqual(self.ids(offline_2112), ["1", "3"])
+		self.assertEqual(self.ids(offline_2112 & self.table.firmware_below("4.4")), ["1"])
+		self.assertEqual(self.ids(self.table.is_type(devices.AdderDevice.DeviceType.TX)), ["6"])
+		self.assertEqual(self.ids(~self.table.is_online() | self.table.located("Floor 2")), ["1", "3", "5"])
+		self.assertEqual(self.table.all().count(), len(FLEET))
+
+	def test_connected_longer_than(self):
+		"""Only current connections older than the duration should be selected"""
+
+		long_connected = self.table.connected_longer_than(timedelta(hours=8), now=NOW.timestamp())
+		self.assertEqual(self.ids(long_connected), ["2"])
+		self.assertEqual(self.table.connected_longer_than(60, now=NOW.timestamp()).count(), 2)
+
+	def test_count_by(self):
+		"""Group-by counts should cover the selected rows only"""
+
+		self.assertEqual(self.table.count_by("firmware"), {"4.5.1000": 3, "4.3.48200": 2, "3.9.1": 1})
+		self.assertEqual(self.table.count_by("status", self.table.is_model(Model.ALIF2020)), {Status.ONLINE: 1, Status.OFFLINE: 1})
+
+	def test_sort(self):
+		"""Sorting should follow the column's values, with missing times last"""
+
+		self.assertEqual(self.ids(sort_by="firmware"), ["5", "1", "4", "2", "3", "6"])
+		self.assertEqual(self.ids(sort_by="connection_start"), ["5", "2", "4", "1", "3", "6"])
+		self.assertEqual(self.ids(self.table.is_online(), sort_by="connection_start", descending=True), ["4", "2", "6"])
+
+	def test_bad_column(self):
+		with self.assertRaises(ValueError):
+			self.table.count_by("connection_start")
+		with self.assertRaises(ValueError):
+			self.table.rows(sort_by="colour")
+
+class TestFleetTableArray(_FleetTests, unittest.TestCase):
+	use_numpy = False
+
+@unittest.skipIf(fleet.numpy is None, "NumPy is not installed")
+class TestFleetTableNumpy(_FleetTests, unittest.TestCase):
+	use_numpy = True
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,131 @@
+import unittest, dataclasses, threading, time
+from adderlib import adder, asyncadder, devices, urlhandlers, inventory
+from helpers import CountingDebugHandler
+
+class _SlowListHandler(urlhandlers.DebugHandler):
+	"""Debug handler which takes a while over each list, and records how many overlap"""
+
+	def __init__(self, delay:float=0.2):
+		self.delay = delay
+		self.active = 0
+		self.peak = 0
+		self._lock = threading.Lock()
+
+	def api_stream(self, server_address, args, container, item):
+		with self._lock:
+			self.active += 1
+			self.peak = max(self.peak, self.active)
+		try:
+			time.sleep(self.delay)
+			items = list(super().api_stream(server_address, args, container, item))
+		finally:
+			with self._lock:
+				self.active -= 1
+		yield from items
+
+class TestSnapshot(unittest.TestCase):
+
+	def setUp(self):
+		self.api = adder.AdderAPI("localhost", url_handler=urlhandlers.DebugHandler())
+
+	def test_snapshot_matches_getters(self):
+		"""A snapshot should hold the same entities as the individual getters"""
+
+		self.api.login("valid_username", "valid_password")
+		inv = self.api.snapshot()
+
+		self.assertEqual([tx.id for tx in inv.transmitters], [tx.id for tx in self.api.getTransmitters()])
+		self.assertEqual([rx.id for rx in inv.receivers], [rx.id for rx in self.api.getReceivers()])
+		self.assertEqual([ch.id for ch in inv.channels], [ch.id for ch in self.api.getChannels()])
+		self.assertEqual([ps.id for ps in inv.presets], [ps.id for ps in self.api.getPresets()])
+		self.assertEqual(len(inv.servers), len(list(self.api.getServers())))
+		self.assertEqual([usb.mac_address for usb in inv.usb_receivers], [usb.mac_address for usb in self.api.getUSBReceivers()])
+		self.assertEqual([usb.mac_address for usb in inv.usb_transmitters], [usb.mac_address for usb in self.api.getUSBTransmitters()])
+
+		self.assertEqual(set(inv.fetched_at), set(inventory.AdderInventory.LISTS))
+		self.assertTrue(all(t >= inv.started_at for t in inv.fetched_at.values()))
+		self.assertGreaterEqual(inv.wall_time, 0)
+		self.assertIs(self.api.inventory, inv)
+
+	def test_immutable(self):
+		"""Inventories should not be changed after the fact"""
+
+		self.api.login("valid_username", "valid_password")
+		inv = self.api.snapshot()
+
+		with self.assertRaises(dataclasses.FrozenInstanceError):
+			inv.channels = ()
+		with self.assertRaises(TypeError):
+			inv.fetched_at["channels"] = None
+		self.assertIsInstance(inv.receivers, tuple)
+
+	def test_login_prefetch(self):
+		"""Logging in with prefetch should take a snapshot, which logging out discards"""
+
+		inv = self.api.login("valid_username", "valid_password", prefetch=True)
+		self.assertIsInstance(inv, inventory.AdderInventory)
+		self.assertIs(self.api.inventory, inv)
+
+		self.api.logout()
+		self.assertIsNone(self.api.inventory)
+
+	def test_concurrent(self):
+		"""The lists should be fetched at the same time, not one after another"""
+
+		handler = _SlowListHandler(0.2)
+		api = adder.AdderAPI("localhost", url_handler=handler)
+		api.login("valid_username", "valid_password", prefetch=True)
+
+		self.assertEqual(handler.peak, len(inventory.AdderInventory.LISTS))
+
+class TestUSBTopology(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = CountingDebugHandler()
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+
+	def test_single_request(self):
+		"""Transmitters and receivers should both come from one request"""
+
+		usb = self.api.getUSBExtenders()
+		self.assertEqual(self.handler.calls["get_all_c_usb"], 1)
+		self.assertEqual([rx.mac_address for rx in usb.receivers], ["aa:aa:aa:aa:aa:aa"])
+		self.assertEqual([tx.mac_address for tx in usb.transmitters], ["bb:bb:bb:bb:bb:bb"])
+		self.assertEqual(len(usb), 2)
+
+	def test_connections(self):
+		"""Receivers should resolve to the transmitters they are connected to"""
+
+		usb = self.api.getUSBExtenders()
+		rx, tx = usb.receivers[0], usb.transmitters[0]
+
+		self.assertIs(usb.connected_to(rx), tx)
+		self.assertEqual(usb.receivers_of(tx), (rx,))
+		self.assertEqual(list(usb.connections()), [(rx, tx)])
+		self.assertIs(usb.get("BB:BB:BB:BB:BB:BB"), tx)
+		self.assertNotIn("cc:cc:cc:cc:cc:cc", usb)
+
+	def test_unconnected_receiver(self):
+		"""A receiver with an empty <connectedTo/> should resolve to no transmitter"""
+
+		rx = devices.AdderUSBReceiver({"mac": "cc:cc:cc:cc:cc:cc", "connectedTo": None})
+		tx = devices.AdderUSBTransmitter({"mac": None})
+		usb = inventory.AdderUSBTopology([rx, tx])
+
+		self.assertEqual(rx.connected_to, "")
+		self.assertIsNone(usb.connected_to(rx))
+		self.assertEqual(usb.receivers_of(tx), ())
+		self.assertEqual(list(usb.connections()), [])
+
+class TestAsyncSnapshot(unittest.IsolatedAsyncioTestCase):
+
+	async def test_snapshot(self):
+		api = asyncadder.AsyncAdderAPI("localhost", url_handler=urlhandlers.AsyncDebugHandler())
+		inv = await api.login("valid_username", "valid_password", prefetch=True)
+
+		self.assertEqual([ch.id for ch in inv.channels], [ch.id async for ch in api.getChannels()])
+		self.assertEqual(set(inv.fetched_at), set(inventory.AdderInventory.LISTS))
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,76 @@
+import unittest, collections
+from adderlib import adder, urlhandlers, devices, channels, presets
+
+class _ProvisioningHandler(urlhandlers.DebugHandler):
+	"""Debug handler which creates channels and presets, and counts list requests"""
+
+	def __init__(self):
+		self.lists = collections.Counter()
+		self.channels = []
+		self.presets = []
+
+	def api_call(self, server_address, args):
+		method = args.get("method")
+		if method == "create_channel":
+			self.channels.append({"c_id": str(100 + len(self.channels)), "c_name": args["name"]})
+			return {"success": "1", "id": self.channels[-1]["c_id"]}
+		if method == "create_preset":
+			self.presets.append({"cp_id": str(200 + len(self.presets)), "cp_name": args["name"], "cp_pairs": "1"})
+			return {"success": "1", "id": self.presets[-1]["cp_id"]}
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		self.lists[args["method"]] += 1
+		return iter(self.channels if args["method"] == "get_channels" else self.presets)
+
+class TestLazyCreation(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _ProvisioningHandler()
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+		self.tx = devices.AdderTransmitter({"d_id": "64"})
+
+	def test_lazy_channel(self):
+		"""A lazy channel should only be fetched when something unknown is asked of it"""
+
+		channel = self.api.createChannel("Edit 1", location="Suite 1", video1=self.tx, lazy=True)
+		self.assertEqual((channel.id, channel.name, channel.location), ("100", "Edit 1", "Suite 1"))
+		self.assertFalse(channel.is_hydrated)
+
+		# Only the ID is needed to connect to it
+		self.api.connectToChannel(channel, devices.AdderReceiver({"d_id": "170"}))
+		self.assertEqual(self.handler.lists["get_channels"], 0)
+
+		self.assertEqual(channel.view_button, channels.AdderChannel.ButtonState.UNKNOWN)
+		self.assertTrue(channel.is_hydrated)
+		self.assertIsInstance(channel.hydrate(), channels.AdderChannel)
+		self.assertEqual(self.handler.lists["get_channels"], 1)
+
+	def test_eager_default(self):
+		channel = self.api.createChannel("Edit 1")
+		self.assertIsInstance(channel, channels.AdderChannel)
+
+	def test_batch(self):
+		"""Batch creation should fetch the list once, however many are created"""
+
+		created = self.api.createChannels({"name": f"Edit {n}", "video1": self.tx} for n in range(20))
+		self.assertEqual([ch.name for ch in created], [f"Edit {n}" for n in range(20)])
+		self.assertTrue(all(isinstance(ch, channels.AdderChannel) for ch in created))
+		self.assertEqual(self.handler.lists["get_channels"], 1)
+
+		pair = presets.AdderPreset.Pair(created[0], devices.AdderReceiver({"d_id": "170"}))
+		made = self.api.createPresets([{"name": "Morning", "pairs": pair, "modes": channels.AdderChannel.ConnectionMode.SHARED}] * 3)
+		self.assertEqual([ps.id for ps in made], ["200", "201", "202"])
+		self.assertEqual(self.handler.lists["get_presets"], 1)
+
+	def test_missing(self):
+		"""A created record missing from the list should be an error"""
+
+		channel = self.api.createChannel("Edit 1", lazy=True)
+		self.handler.channels.clear()
+		with self.assertRaises(LookupError):
+			channel.hydrate()
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,108 @@
+import unittest, threading
+from adderlib import adder, urlhandlers, paging
+
+class _PagingHandler(urlhandlers.UrlHandler):
+	"""URL handler serving a list of synthetic receivers, honouring `page` and `results_per_page`"""
+
+	def __init__(self, count:int, fail_page:int=0):
+		self.count = count
+		self.fail_page = fail_page
+		self.pages = []
+		self._lock = threading.Lock()
+
+	def api_call(self, server_address, args):
+		if args.get("method") == "login":
+			return {"success":"1", "token":"abc"}
+
+		page = int(args.get("page", 1))
+		size = int(args.get("results_per_page", self.count or 1))
+		with self._lock:
+			self.pages.append(page)
+		if page == self.fail_page:
+			return {"success":"0", "errors": {"error": {"code":"3", "msg":"Invalid token"}}}
+
+		ids = range((page-1) * size + 1, min(page * size, self.count) + 1)
+		devices = [{"d_id":str(i), "d_name":f"RX {i}", "d_type":"rx"} for i in ids]
+		return {
+			"success":"1", "page":str(page), "results_per_page":str(size), "total_devices":str(self.count),
+			"devices": {"device": devices if len(devices) != 1 else devices[0]} if devices else None
+		}
+
+class TestPagedList(unittest.TestCase):
+
+	def test_order(self):
+		"""Pages fetched ahead should still be yielded in order"""
+
+		for prefetch in (0, 1, 3):
+			handler = _PagingHandler(23)
+			pages = paging.PagedList(lambda args: handler.api_call(None, args), {"method":"get_devices"}, "devices", "device", page_size=5, prefetch=prefetch)
+			self.assertEqual([int(d["d_id"]) for d in pages], list(range(1, 24)))
+			self.assertTrue(pages.paging_supported)
+			self.assertEqual(pages.pages_fetched, 5)
+			self.assertEqual(sorted(handler.pages), [1, 2, 3, 4, 5])
+
+	def test_exact_multiple(self):
+		"""A list filling its last page exactly should not need an extra request"""
+
+		handler = _PagingHandler(10)
+		pages = paging.PagedList(lambda args: handler.api_call(None, args), {"method":"get_devices"}, "devices", "device", page_size=5, prefetch=2)
+		self.assertEqual(len(list(pages)), 10)
+		self.assertEqual(pages.pages_fetched, 2)
+
+	def test_single_item_page(self):
+		"""A page holding a single item should still be a list of one"""
+
+		handler = _PagingHandler(3)
+		pages = paging.PagedList(lambda args: handler.api_call(None, args), {"method":"get_devices"}, "devices", "device", page_size=2)
+		self.assertEqual([d["d_id"] for d in pages], ["1", "2", "3"])
+
+	def test_failed_page(self):
+		"""A page the AIM turns down should raise, rather than cut the list short"""
+
+		handler = _PagingHandler(23, fail_page=3)
+		pages = paging.PagedList(lambda args: handler.api_call(None, args), {"method":"get_devices"}, "devices", "device", page_size=5)
+		items = []
+		with self.assertRaises(adder.AdderRequestError):
+			for item in pages:
+				items.append(item)
+		self.assertEqual(len(items), 10)
+
+	def test_failed_list(self):
+		"""A list the AIM turns down should raise whether it is streamed or paged"""
+
+		api = adder.AdderAPI("localhost", url_handler=_PagingHandler(23, fail_page=1))
+		api.login("valid_username", "valid_password")
+		for page_size in (None, 5):
+			with self.subTest(page_size=page_size):
+				with self.assertRaises(adder.AdderRequestError):
+					list(api.getReceivers(page_size=page_size))
+
+	def test_bad_arguments(self):
+		with self.assertRaises(ValueError):
+			paging.PagedList(dict, {}, "devices", "device", page_size=0)
+		with self.assertRaises(ValueError):
+			paging.PagedList(dict, {}, "devices", "device", page_size=5, prefetch=-1)
+
+class TestPagedGetters(unittest.TestCase):
+
+	def test_paged_receivers(self):
+		"""Getters should request pages when given a page size"""
+
+		handler = _PagingHandler(12)
+		api = adder.AdderAPI("localhost", url_handler=handler)
+		api.login("user", "pass")
+
+		self.assertEqual([rx.id for rx in api.getReceivers(page_size=5, prefetch=2)], [str(i) for i in range(1, 13)])
+		self.assertEqual(sorted(handler.pages), [1, 2, 3])
+
+	def test_unpaged_server(self):
+		"""A server which ignores paging should be read in a single request"""
+
+		api = adder.AdderAPI("localhost", url_handler=urlhandlers.DebugHandler())
+		api.login("valid_username", "valid_password")
+
+		self.assertEqual([rx.id for rx in api.getReceivers(page_size=2)], [rx.id for rx in api.getReceivers()])
+		self.assertEqual([ch.id for ch in api.getChannels(page_size=50)], [ch.id for ch in api.getChannels()])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,104 @@
+import unittest, pathlib
+import xmltodict
+from adderlib import parsers, adder, urlhandlers
+
+example_dir = pathlib.Path(__file__).parent / "example_xml"
+
+list_methods = {
+	"get_devices":   ("devices", "device"),
+	"get_channels":  ("channels", "channel"),
+	"get_presets":   ("connection_presets", "connection_preset"),
+	"get_servers":   ("servers", "server"),
+	"get_all_c_usb": ("c_usb_lan_extenders", "c_usb"),
+}
+
+class TestItemStreamParser(unittest.TestCase):
+
+	def test_matches_xmltodict(self):
+		"""Streamed items should match those parsed from the full document"""
+
+		for method, (container, item) in list_methods.items():
+			with self.subTest(method=method):
+				data = (example_dir / method).with_suffix(".xml").read_bytes()
+
+				expected = xmltodict.parse(data)["api_response"][container][item]
+				expected = [dict(x) for x in (expected if isinstance(expected, list) else [expected])]
+
+				parser = parsers.ItemStreamParser(container, item)
+				streamed = []
+				for offset in range(0, len(data), 7):
+					streamed.extend(parser.feed(data[offset:offset+7]))
+				streamed.extend(parser.close())
+
+				self.assertEqual(streamed, expected)
+				self.assertEqual(parser.header.get("success"), "1")
+
+	def test_items_yielded_before_document_ends(self):
+		"""An item should be available as soon as its closing tag has been fed"""
+
+		parser = parsers.ItemStreamParser("devices", "device")
+		self.assertEqual(list(parser.feed(b"<api_response><success>1</success><devices><device item=\"1\"><d_id>1</d_id>")), [])
+		self.assertEqual(list(parser.feed(b"</device><device item=\"2\">")), [{"@item":"1", "d_id":"1"}])
+		self.assertEqual(parser.item_count, 1)
+
+	def test_errors_in_header(self):
+		"""Errors should be collected in the header, with no items"""
+
+		parser = parsers.ItemStreamParser("devices", "device")
+		items = list(parser.feed(b"<api_response><success>0</success><errors><error><code>2</code><msg>Nope</msg></error></errors></api_response>"))
+		items.extend(parser.close())
+		self.assertEqual(items, [])
+		self.assertEqual(parser.header["errors"], {"error": {"code":"2", "msg":"Nope"}})
+
+class _RecordDebugHandler(urlhandlers.DebugHandler):
+	parser = parsers.RecordParser()
+
+class TestRecordParser(unittest.TestCase):
+
+	def test_matches_xmltodict(self):
+		"""Records should hold the same fields as the `xmltodict` items"""
+
+		for method, (container, item) in list_methods.items():
+			with self.subTest(method=method):
+				data = (example_dir / method).with_suffix(".xml").read_bytes()
+
+				expected = xmltodict.parse(data)["api_response"]
+				parsed = parsers.RecordParser().parse(data)
+				self.assertEqual(parsed["success"], expected["success"])
+
+				expected = expected[container][item]
+				expected = [dict(x) for x in (expected if isinstance(expected, list) else [expected])]
+				self.assertEqual(parsed[container][item], expected)
+
+				streamed = list(parsers.RecordParser().iterparse([data[:100], data[100:]], container, item))
+				self.assertEqual(streamed, expected)
+
+	def test_single_item_is_list(self):
+		"""A single item should still be returned in a list"""
+
+		parsed = parsers.RecordParser().parse(b"<api_response><success>1</success><servers><server><name>a</name></server></servers></api_response>")
+		self.assertEqual(parsed["servers"]["server"], [{"name":"a"}])
+
+	def test_other_responses(self):
+		"""Responses other than lists should be parsed like `xmltodict`"""
+
+		for method in ("login", "logout", "create_preset"):
+			with self.subTest(method=method):
+				data = (example_dir / method).with_suffix(".xml").read_bytes()
+				self.assertEqual(parsers.RecordParser().parse(data), dict(xmltodict.parse(data)["api_response"]))
+
+	def test_api_with_record_parser(self):
+		"""AdderAPI should give the same results with either parser backend"""
+
+		default = adder.AdderAPI("localhost", url_handler=urlhandlers.DebugHandler())
+		records = adder.AdderAPI("localhost", url_handler=_RecordDebugHandler())
+
+		for api in (default, records):
+			api.login("valid_username", "valid_password")
+
+		self.assertEqual([rx.name for rx in default.getReceivers()], [rx.name for rx in records.getReceivers()])
+		self.assertEqual([ch.id for ch in default.getChannels()], [ch.id for ch in records.getChannels()])
+		self.assertEqual([ps.pair_count for ps in default.getPresets()], [ps.pair_count for ps in records.getPresets()])
+
+if __name__ == "__main__":
+	unittest.main()
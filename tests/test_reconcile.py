@@ -0,0 +1,119 @@
+import unittest, collections
+from adderlib import adder, urlhandlers, channels, reconcile
+
+Mode = channels.AdderChannel.ConnectionMode
+
+def connected(id:str, channel:str) -> dict:
+	return {"d_id": id, "d_name": f"RX {id}", "c_name": channel, "con_start_time": "2022-09-12 09:00:00"}
+
+def disconnected(id:str, channel:str="") -> dict:
+	return {"d_id": id, "d_name": f"RX {id}", "c_name": channel, "con_start_time": "2022-09-12 09:00:00", "con_end_time": "2022-09-12 10:00:00"}
+
+class _RoutingHandler(urlhandlers.DebugHandler):
+	"""Debug handler serving given receivers and channels, and recording changes"""
+
+	def __init__(self, receivers:list):
+		self.receivers = receivers
+		self.channels = [{"c_id": str(n), "c_name": f"CH {n}"} for n in range(1, 5)]
+		self.calls = collections.defaultdict(list)
+		self.fail_disconnect = False
+
+	def api_stream(self, server_address, args, container, item):
+		self.calls[args["method"]].append(args)
+		return iter(self.receivers if args["method"] == "get_devices" else self.channels)
+
+	def api_call(self, server_address, args):
+		self.calls[args["method"]].append(args)
+		if args["method"] == "disconnect_channel" and self.fail_disconnect:
+			return {"success": "0", "errors": {"error": {"code": "10", "msg": "Receiver in use"}}}
+		return super().api_call(server_address, args)
+
+class TestReconciler(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _RoutingHandler([
+			connected("1", "CH 1"), connected("2", "CH 2"), connected("3", "CH 3"),
+			disconnected("4", "CH 4"), disconnected("5"),
+		])
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+		self.reconciler = reconcile.RoutingReconciler(self.api)
+
+	def test_minimal_plan(self):
+		"""Only receivers not already as desired should be touched"""
+
+		plan = self.reconciler.plan({"1": "CH 1", "2": None, "3": None, "4": "CH 4", "5": None})
+		self.assertEqual([rx.id for rx in plan.disconnect], ["2", "3"])
+		self.assertEqual([pair.receiver.id for pair in plan.connections], ["4"])
+		self.assertEqual(sorted(rx.id for rx in plan.unchanged), ["1", "5"])
+		self.assertEqual(plan.call_count, 2)
+		self.assertEqual(len(self.handler.calls["get_devices"]), 1)
+
+	def test_dry_run(self):
+		"""A dry run should plan without changing anything"""
+
+		plan, result = self.reconciler.reconcile({"1": "CH 2", "2": None}, dry_run=True)
+		self.assertIsNone(result)
+		self.assertIn("Disconnect RX 2", str(plan))
+		self.assertIn("2 API calls", str(plan))
+		self.assertFalse(self.handler.calls["disconnect_channel"] or self.handler.calls["connect_channel"])
+
+	def test_apply(self):
+		"""Disconnections should go first, in one request"""
+
+		plan, result = self.reconciler.reconcile({"1": "CH 4", "2": None, "3": None, "5": "CH 1"})
+		self.assertTrue(result.ok)
+		self.assertEqual(len(result), 4)
+		self.assertEqual([call["rx_id"] for call in self.handler.calls["disconnect_channel"]], ["2,3"])
+		self.assertEqual(sorted(call["rx_id"] for call in self.handler.calls["connect_channel"]), ["1", "5"])
+		self.assertEqual([r.receiver.id for r in result if isinstance(r, reconcile.DisconnectResult)], ["2", "3"])
+
+	def test_exclusive_order(self):
+		"""In exclusive modes, receivers should wait for the channel they want to be let go of"""
+
+		# 5 takes over CH 1 from 1, which moves to CH 2, which 2 leaves for CH 4
+		plan = self.reconciler.plan({"5": "CH 1", "1": "CH 2", "2": "CH 4"}, Mode.EXCLUSIVE)
+		self.assertEqual([[pair.receiver.id for pair in wave] for wave in plan.connect], [["2"], ["1"], ["5"]])
+		self.assertEqual(plan.disconnect, ())
+
+		# Shared channels can be switched all at once
+		self.assertEqual(len(self.reconciler.plan({"5": "CH 1", "1": "CH 2", "2": "CH 4"}).connect), 1)
+
+	def test_exclusive_swap(self):
+		"""Receivers swapping channels should have one disconnected first"""
+
+		plan = self.reconciler.plan({"1": "CH 2", "2": "CH 1"}, Mode.EXCLUSIVE)
+		self.assertEqual([rx.id for rx in plan.disconnect], ["1"])
+		self.assertEqual([[pair.receiver.id for pair in wave] for wave in plan.connect], [["2"], ["1"]])
+		self.assertEqual(plan.call_count, 3)
+
+	def test_swap_with_disconnect(self):
+		"""Receivers disconnected to break a swap should follow those asked to be disconnected, in the same request"""
+
+		plan = self.reconciler.plan({"1": "CH 2", "2": "CH 1", "3": None}, Mode.EXCLUSIVE)
+		self.assertEqual([rx.id for rx in plan.disconnect], ["3", "1"])
+		self.assertEqual(plan.call_count, 3)
+
+	def test_failed_disconnect(self):
+		"""In exclusive modes, connections shouldn't be attempted once the disconnections they wait on have failed"""
+
+		self.handler.fail_disconnect = True
+		plan, result = self.reconciler.reconcile({"1": "CH 2", "2": "CH 1"}, Mode.EXCLUSIVE)
+		self.assertFalse(result.ok)
+		self.assertEqual([r.receiver.id for r in result.failed], ["1"])
+		self.assertEqual([pair.receiver.id for pair in result.skipped], ["2", "1"])
+		self.assertFalse(self.handler.calls["connect_channel"])
+
+		# Shared connections don't wait on anything, so go ahead
+		plan, result = self.reconciler.reconcile({"1": "CH 4", "2": None})
+		self.assertEqual(result.skipped, ())
+		self.assertEqual(len(self.handler.calls["connect_channel"]), 1)
+
+	def test_unknown(self):
+		with self.assertRaises(ValueError):
+			self.reconciler.plan({"99": "CH 1"})
+		with self.assertRaises(ValueError):
+			self.reconciler.plan({"1": "No such channel"})
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,72 @@
+import unittest, ipaddress
+from datetime import datetime
+from adderlib import devices, channels, records
+
+RECORD = {
+	"@item": "1", "d_id": "170", "d_name": "RX 1", "d_location": "Floor 3", "d_firmware": "4.3.48200",
+	"d_ip_address": "10.10.10.66", "d_ip_address2": None, "d_mac_address": "00:0F:58:01:6E:3D",
+	"d_online": "1", "d_status": "1", "d_version": "2", "d_variant": "v", "d_date_added": "2012-07-14 01:37:07",
+	"con_start_time": "2012-09-07 13:33:19", "con_end_time": None, "con_control": "3", "d_undocumented": "surprise"
+}
+
+class TestCompactRecords(unittest.TestCase):
+
+	def test_decoded_fields(self):
+		"""Fields should be decoded into their proper types"""
+
+		rx = devices.AdderReceiver(RECORD)
+		self.assertEqual(rx.ip_address, ipaddress.ip_address("10.10.10.66"))
+		self.assertIsNone(rx.ip_addresses[1])
+		self.assertEqual(rx.status, devices.AdderDevice.DeviceStatus.ONLINE)
+		self.assertEqual(rx.model, devices.AdderDevice.DeviceModel.ALIF2112)
+		self.assertEqual(rx.date_dadded, datetime(2012, 7, 14, 1, 37, 7))
+		self.assertEqual(rx.connection_control, devices.AdderReceiver.ConnectionControlType.SHARED)
+		self.assertTrue(rx.is_connected)
+		self.assertTrue(rx.network_interfaces[0].is_online)
+
+	def test_bad_values(self):
+		"""Unexpected values should decode to defaults rather than raise"""
+
+		rx = devices.AdderReceiver({"d_status": "banana", "d_ip_address": "not an ip", "d_version": "9", "con_control": None})
+		self.assertEqual(rx.status, devices.AdderDevice.DeviceStatus.UNKNOWN)
+		self.assertIsNone(rx.ip_address)
+		self.assertEqual(rx.model, devices.AdderDevice.DeviceModel.UNKNOWN)
+		self.assertEqual(rx.connection_control, devices.AdderReceiver.ConnectionControlType.UNKNOWN)
+		self.assertIsNone(rx.date_dadded)
+		self.assertFalse(rx.is_firmware_valid)
+
+	def test_extended(self):
+		"""The original record, undocumented fields and all, should still be available"""
+
+		rx = devices.AdderReceiver(RECORD)
+		self.assertEqual(rx._extended, RECORD)
+		self.assertFalse(hasattr(rx, "__dict__"))
+
+	def test_shared_storage(self):
+		"""Records should share repeated values, and key tuples of the same shape"""
+
+		a = devices.AdderReceiver(dict(RECORD))
+		b = devices.AdderReceiver({key: "".join(val) if isinstance(val, str) else val for key,val in RECORD.items()})
+
+		self.assertIs(a.firmware, b.firmware)
+		self.assertIs(a.location, b.location)
+		self.assertIs(a._keys, b._keys)
+
+		ch1 = channels.AdderChannel({"c_id": "1", "c_name": "".join(["Edit ", "Bay"])})
+		ch2 = channels.AdderChannel({"c_id": "2", "c_name": "".join(["Edit B", "ay"])})
+		self.assertIs(ch1.name, ch2.name)
+
+	def test_intern_bound(self):
+		"""The table of shared strings should not grow past its limit"""
+
+		limit = records.MAX_INTERNED
+		try:
+			records.MAX_INTERNED = 10
+			for i in range(25):
+				records.intern(f"value {i}")
+			self.assertLessEqual(len(records._interned), 10)
+		finally:
+			records.MAX_INTERNED = limit
+
+if __name__ == "__main__":
+	unittest.main()
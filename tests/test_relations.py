@@ -0,0 +1,51 @@
+import unittest
+from adderlib import adder, devices, channels, relations
+from helpers import CountingDebugHandler
+
+class TestChannelGraph(unittest.TestCase):
+
+	def setUp(self):
+		self.receivers = [
+			devices.AdderReceiver({"d_id": "1", "c_name": "Edit 1", "con_start_time": "2022-09-12 09:00:00", "con_end_time": None}),
+			devices.AdderReceiver({"d_id": "2", "c_name": "Edit 1", "con_start_time": "2022-09-12 09:00:00", "con_end_time": "2022-09-12 10:00:00"}),
+			devices.AdderReceiver({"d_id": "3", "c_name": "Gone"}),
+			devices.AdderReceiver({"d_id": "4"}),
+		]
+		self.transmitters = [devices.AdderTransmitter({"d_id": "10"}), devices.AdderTransmitter({"d_id": "11"})]
+		self.channels = [
+			channels.AdderChannel({"c_id": "100", "c_name": "Edit 1", "c_video1": "10", "c_video2": "11", "c_usb": "10", "c_audio": "99"}),
+			channels.AdderChannel({"c_id": "101", "c_name": "Edit 2", "c_video1": "11"}),
+		]
+		self.graph = relations.ChannelGraph(self.receivers, self.channels, self.transmitters)
+
+	def test_receivers_to_channels(self):
+		"""Receivers should be joined to their last known channel by name"""
+
+		edit1 = self.channels[0]
+		self.assertIs(self.graph.channel_for(self.receivers[0]), edit1)
+		self.assertIsNone(self.graph.channel_for(self.receivers[2]))
+		self.assertIsNone(self.graph.channel_for(self.receivers[3]))
+		self.assertEqual([rx.id for rx in self.graph.receivers_on(edit1)], ["1", "2"])
+		self.assertEqual([rx.id for rx in self.graph.receivers_on(edit1, connected_only=True)], ["1"])
+
+	def test_channels_to_transmitters(self):
+		"""Channels should be joined to the transmitters they list, ignoring unknown IDs"""
+
+		tx10, tx11 = self.transmitters
+		self.assertEqual(self.graph.transmitters_for(self.channels[0]), {"video1": tx10, "video2": tx11, "usb": tx10})
+		self.assertEqual([ch.id for ch in self.graph.channels_using(tx10)], ["100"])
+		self.assertEqual([ch.id for ch in self.graph.channels_using(tx11)], ["100", "101"])
+
+	def test_single_fetch(self):
+		"""Each list should be requested once, however many receivers there are"""
+
+		handler = CountingDebugHandler()
+		api = adder.AdderAPI("localhost", url_handler=handler)
+		api.login("valid_username", "valid_password")
+
+		graph = api.getChannelGraph()
+		self.assertEqual((handler.calls["get_devices"], handler.calls["get_channels"]), (2, 1))
+		self.assertEqual(len(graph.channels), 2)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,73 @@
+import unittest, threading
+from adderlib import adder, devices, resilience
+from helpers import CountingDebugHandler
+
+class _FlakyDebugHandler(CountingDebugHandler):
+	"""Debug handler which fails or stalls on chosen attempts at each method"""
+
+	def __init__(self, fail=(), stall=(), stall_time=0.5):
+		super().__init__()
+		self.fail = set(fail)		# Attempt numbers which raise, counting from 1
+		self.stall = set(stall)		# Attempt numbers which take `stall_time` to answer
+		self.stall_time = stall_time
+
+	def api_call(self, server_address, args):
+		response = super().api_call(server_address, args)
+		attempt = self.calls[args.get("method")]
+		if attempt in self.fail:
+			raise ConnectionError("Dropped")
+		if attempt in self.stall:
+			threading.Event().wait(self.stall_time)
+		return response
+
+class TestResilientHandler(unittest.TestCase):
+
+	def test_reads_are_retried(self):
+		"""A read which fails should be made again"""
+
+		inner = _FlakyDebugHandler(fail={1, 2})
+		handler = resilience.ResilientHandler(inner, retries=2, backoff=0.01)
+		api = adder.AdderAPI("localhost", url_handler=handler)
+
+		self.assertEqual(len(list(api.getReceivers())), 2)
+		self.assertEqual(inner.calls["get_devices"], 3)
+		self.assertEqual(handler.stats.retries, 2)
+
+	def test_retries_run_out(self):
+		inner = _FlakyDebugHandler(fail={1, 2})
+		api = adder.AdderAPI("localhost", url_handler=resilience.ResilientHandler(inner, retries=1, backoff=0.01))
+		with self.assertRaises(ConnectionError):
+			list(api.getReceivers())
+		self.assertEqual(api.url_handler.stats.failures, 1)
+
+	def test_writes_are_not_retried(self):
+		"""A mutating call which fails may have been made, so should never be made again"""
+
+		inner = _FlakyDebugHandler(fail={1})
+		api = adder.AdderAPI("localhost", url_handler=resilience.ResilientHandler(inner, hedge=True, hedge_delay=0))
+		with self.assertRaises(ConnectionError):
+			api.identifyDevice(devices.AdderReceiver({"d_id": "1"}))
+		self.assertEqual(inner.calls["identify_device"], 1)
+
+	def test_slow_reads_are_hedged(self):
+		"""A read still unanswered after the hedge delay should be sent again, and the first answer used"""
+
+		inner = _FlakyDebugHandler(stall={1}, stall_time=1)
+		handler = resilience.ResilientHandler(inner, hedge=True, hedge_delay=0.05)
+		api = adder.AdderAPI("localhost", url_handler=handler)
+
+		self.assertEqual(len(list(api.getReceivers())), 2)
+		self.assertEqual(inner.calls["get_devices"], 2)
+		self.assertEqual((handler.stats.hedges, handler.stats.hedges_won), (1, 1))
+		handler.close()
+
+	def test_hedge_delay_follows_latency(self):
+		"""Once there are enough response times, the hedge delay should be their quantile"""
+
+		handler = resilience.ResilientHandler(CountingDebugHandler(), hedge_delay=5, min_samples=10, hedge_quantile=0.9)
+		self.assertEqual(handler.hedge_delay("get_devices"), 5)
+		handler._latencies["get_devices"].extend(n / 100 for n in range(1, 11))
+		self.assertAlmostEqual(handler.hedge_delay("get_devices"), 0.09)
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,82 @@
+import unittest, threading, time
+from adderlib import adder, urlhandlers, devices, rollout
+
+class _FleetHandler(urlhandlers.DebugHandler):
+	"""Debug handler simulating receivers which go down for a while when rebooted"""
+
+	def __init__(self, count:int, downtime:float=0.05, dead:tuple=()):
+		self.downtime = downtime
+		self.dead = set(dead)
+		self.back_at = {str(n): 0.0 for n in range(count)}
+		self.reboots = []
+		self.peak_down = 0
+		self._lock = threading.Lock()
+
+	def _down(self) -> int:
+		now = time.monotonic()
+		return sum(1 for id, back in self.back_at.items() if back > now or id in self.dead)
+
+	def api_call(self, server_address, args):
+		if args.get("method") == "reboot_devices":
+			ids = args["ids"].split(",")
+			with self._lock:
+				self.reboots.append(ids)
+				for id in ids:
+					self.back_at[id] = time.monotonic() + self.downtime
+				self.peak_down = max(self.peak_down, self._down())
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		now = time.monotonic()
+		with self._lock:
+			self.peak_down = max(self.peak_down, self._down())
+			return iter([{"d_id": id, "d_status": "2" if back > now or id in self.dead else "1"} for id, back in self.back_at.items()])
+
+class TestRollingReboot(unittest.TestCase):
+
+	def api(self, handler) -> adder.AdderAPI:
+		api = adder.AdderAPI("localhost", url_handler=handler)
+		api.login("valid_username", "valid_password")
+		return api
+
+	def receivers(self, count:int) -> list:
+		return [devices.AdderReceiver({"d_id": str(n)}) for n in range(count)]
+
+	def test_waves(self):
+		"""Devices should be rebooted a wave at a time, each waiting for the last to come back"""
+
+		handler = _FleetHandler(7)
+		result = rollout.RollingReboot(self.api(handler), wave_size=3, poll_interval=0.01, min_downtime=1).run(self.receivers(7))
+
+		self.assertTrue(result.ok)
+		self.assertEqual(handler.reboots, [["0", "1", "2"], ["3", "4", "5"], ["6"]])
+		self.assertEqual(handler.peak_down, 3)
+		for wave in result.waves:
+			self.assertGreaterEqual(wave.recovery_time, handler.downtime)
+		self.assertLessEqual(result.waves[0].started + result.waves[0].duration, result.waves[1].started)
+
+	def test_concurrency(self):
+		"""Up to `concurrency` waves should be down at once"""
+
+		handler = _FleetHandler(8, downtime=0.1)
+		result = rollout.RollingReboot(self.api(handler), wave_size=2, concurrency=2, poll_interval=0.01, min_downtime=1).run(self.receivers(8))
+		self.assertTrue(result.ok)
+		self.assertEqual(handler.peak_down, 4)
+		self.assertEqual(len(handler.reboots), 4)
+
+	def test_failure_stops(self):
+		"""A wave which doesn't come back should stop the rest"""
+
+		handler = _FleetHandler(6, dead=("1",))
+		result = rollout.RollingReboot(self.api(handler), wave_size=2, poll_interval=0.01, wave_timeout=0.2).run(self.receivers(6))
+		self.assertFalse(result.ok)
+		self.assertEqual(len(result.waves), 1)
+		self.assertEqual([device.id for device in result.waves[0].not_recovered], ["1"])
+		self.assertEqual([device.id for device in result.skipped], ["2", "3", "4", "5"])
+
+	def test_bad_arguments(self):
+		with self.assertRaises(ValueError):
+			rollout.RollingReboot(None, wave_size=0)
+
+if __name__ == "__main__":
+	unittest.main()
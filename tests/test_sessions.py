@@ -0,0 +1,134 @@
+import unittest, collections, threading, time, concurrent.futures, tempfile, pathlib
+from adderlib import adder, sessions, urlhandlers, tokens
+
+class _ConcurrencyHandler(urlhandlers.DebugHandler):
+	"""Debug handler which issues numbered tokens, and notes the most requests in flight on each"""
+
+	def __init__(self, delay=0.02):
+		self.delay = delay
+		self.lock = threading.Lock()
+		self.issued = set()
+		self.logins = 0
+		self.logged_out = set()
+		self.in_flight = collections.Counter()
+		self.peak = collections.Counter()
+
+	def api_call(self, server_address, args):
+		method = args.get("method")
+		if method == "login":
+			with self.lock:
+				self.logins += 1
+				self.issued.add(f"token-{self.logins}")
+				return {"success": "1", "token": f"token-{self.logins}"}
+		if method == "logout":
+			self.logged_out.add(args["token"])
+			return {"success": "1"}
+		if args.get("token") not in self.issued:
+			return {"success": "0", "errors": {"error": {"code": "1", "msg": "Invalid token"}}}
+
+		token = args["token"]
+		with self.lock:
+			self.in_flight[token] += 1
+			self.peak[token] = max(self.peak[token], self.in_flight[token])
+		time.sleep(self.delay)
+		with self.lock:
+			self.in_flight[token] -= 1
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		# Through api_call, so lists count towards the requests in flight
+		return urlhandlers.UrlHandler.api_stream(self, server_address, args, container, item)
+
+class TestPooledAdderAPI(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _ConcurrencyHandler()
+		self.api = sessions.PooledAdderAPI("localhost", url_handler=self.handler, sessions=3, max_in_flight=2)
+		self.api.login("timmy", "pass")
+
+	def test_login(self):
+		self.assertEqual(len(self.api.pool), 3)
+		self.assertEqual(len({user.token for user in self.api.pool.users}), 3)
+		self.assertTrue(self.api.user.logged_in)
+
+	def test_in_flight_limit(self):
+		"""Requests should be spread across every session, without going over the limit on any"""
+
+		with concurrent.futures.ThreadPoolExecutor(max_workers=12) as executor:
+			results = list(executor.map(lambda _: len(list(self.api.getChannels())), range(24)))
+
+		self.assertEqual(results, [2] * 24)
+		self.assertEqual(set(self.handler.peak), {user.token for user in self.api.pool.users})
+		self.assertLessEqual(max(self.handler.peak.values()), 2)
+		self.assertEqual(self.api.pool.in_flight, 0)
+
+	def test_wait_timeout(self):
+		api = sessions.PooledAdderAPI("localhost", url_handler=_ConcurrencyHandler(delay=0.2), sessions=1, max_in_flight=1, wait_timeout=0.05)
+		api.login("timmy", "pass")
+		with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+			futures = [executor.submit(api.rebootDevices, []) for _ in range(2)]
+		self.assertEqual(sum(isinstance(future.exception(), TimeoutError) for future in futures), 1)
+
+	def test_nested_requests(self):
+		"""Requests made while working through a list shouldn't wait on the session the list came from"""
+
+		api = sessions.PooledAdderAPI("localhost", url_handler=_ConcurrencyHandler(delay=0), sessions=1, max_in_flight=1, wait_timeout=0.5)
+		api.login("timmy", "pass")
+		for receiver in api.getReceivers():
+			api.rebootDevices([receiver])
+		self.assertEqual(api.pool.in_flight, 0)
+
+	def test_renewal(self):
+		"""A session the AIM turns down should be logged in again, and the request retried"""
+
+		stale = self.api.pool.users[1].token
+		self.handler.issued.discard(stale)
+		for _ in range(3):
+			self.assertEqual(len(list(self.api.getChannels())), 2)
+		self.assertNotIn(stale, {user.token for user in self.api.pool.users})
+		self.assertEqual(self.handler.logins, 4)
+
+	def test_logout(self):
+		tokens = {user.token for user in self.api.pool.users}
+		self.api.logout()
+		self.assertEqual(self.handler.logged_out, tokens)
+		self.assertTrue(self.api.user.logged_out)
+		with self.assertRaises(adder.AdderRequestError):
+			self.api.rebootDevices([])
+
+	def test_token_store(self):
+		"""Each session should keep its token in the store, and pick it up again next run"""
+
+		with tempfile.TemporaryDirectory() as directory:
+			store = tokens.TokenStore(pathlib.Path(directory, "tokens.json"))
+			server = self.api.server_address.geturl()
+
+			api = sessions.PooledAdderAPI("localhost", url_handler=self.handler, sessions=2)
+			api.login("timmy", "pass", token_store=store)
+			stored = [store.load(server, "timmy"), store.load(server, "timmy#2")]
+			self.assertEqual(stored, [user.token for user in api.pool.users])
+
+			# Next run: no logins, until a session is turned down
+			logins = self.handler.logins
+			api = sessions.PooledAdderAPI("localhost", url_handler=self.handler, sessions=2)
+			api.login("timmy", "pass", token_store=store)
+			self.assertEqual(self.handler.logins, logins)
+
+			self.handler.issued.discard(stored[0])
+			for _ in range(2):
+				self.assertEqual(len(list(api.getChannels())), 2)
+			self.assertEqual(self.handler.logins, logins + 1)
+			self.assertEqual(store.load(server, "timmy"), api.pool.users[0].token)
+
+			api.logout()
+			self.assertIsNone(store.load(server, "timmy"))
+			self.assertIsNone(store.load(server, "timmy#2"))
+
+	def test_racing_logins(self):
+		"""Only one of several threads logging in at once should succeed"""
+
+		api = sessions.PooledAdderAPI("localhost", url_handler=_ConcurrencyHandler(), sessions=2)
+		with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+			futures = [executor.submit(api.login, "timmy", "pass") for _ in range(4)]
+		self.assertEqual(sum(future.exception() is None for future in futures), 1)
+		self.assertEqual(len(api.pool), 2)
@@ -0,0 +1,58 @@
+import unittest, dataclasses, ipaddress
+from adderlib import adder, urlhandlers, devices, store
+
+def _rx(id:str, name:str, location:str="", mac:str="", ip:str=""):
+	return devices.AdderReceiver({"d_id": id, "d_name": name, "d_location": location, "d_mac_address": mac, "d_ip_address": ip})
+
+class TestInventoryStore(unittest.TestCase):
+
+	def setUp(self):
+		api = adder.AdderAPI("localhost", url_handler=urlhandlers.DebugHandler())
+		self.inventory = api.login("valid_username", "valid_password", prefetch=True)
+		self.store = store.InventoryStore(self.inventory)
+
+	def test_hash_lookups(self):
+		"""Devices and channels should be found by any of their indexed keys"""
+
+		self.assertEqual(self.store.device("170").name, "RX 123")
+		self.assertEqual(self.store.device_by_mac("00:0f:58:01:6e:3d").id, "170")
+		self.assertEqual(self.store.device_by_ip("1.1.201.31").id, "64")
+		self.assertEqual(self.store.device_by_ip(ipaddress.ip_address("10.10.10.66")).id, "170")
+		self.assertEqual(self.store.device_by_serial("1409A0000159").id, "170")
+		self.assertEqual([d.id for d in self.store.devices_named("tx 456")], ["64"])
+		self.assertEqual([c.id for c in self.store.channels_named("CHANNEL 2")], ["5"])
+		self.assertIsNone(self.store.device_by_mac("ff:ff:ff:ff:ff:ff"))
+
+	def test_prefix_queries(self):
+		"""Sorted indexes should answer prefix and range queries in order"""
+
+		self.assertEqual([d.id for d in self.store.devices_by_name_prefix("")], ["170", "64"])
+		self.assertEqual([d.id for d in self.store.devices_by_location_prefix("server rack")], ["170"])
+		self.assertEqual([c.id for c in self.store.channels_by_name_prefix("Chan")], ["3", "5"])
+		self.assertEqual([d.id for d in self.store.devices.range("name", "rx", "s")], ["170"])
+
+	def test_incremental_update(self):
+		"""A refresh should add, change and remove entries, leaving no stale keys"""
+
+		moved = _rx("170", "RX 123", location="Edit Bay 1", mac="00:0F:58:01:6E:3D", ip="10.10.10.99")
+		added = _rx("200", "RX 200", location="Edit Bay 2", mac="00:0F:58:00:00:C8")
+		refreshed = dataclasses.replace(self.inventory, transmitters=(), receivers=(moved, added))
+
+		changes = self.store.update(refreshed)
+		self.assertEqual(changes["devices"], (1, 1, 1))
+		self.assertEqual(changes["channels"], (0, 2, 0))
+
+		self.assertIs(self.store.device_by_mac("00:0F:58:01:6E:3D"), moved)
+		self.assertIsNone(self.store.device_by_ip("10.10.10.66"))
+		self.assertIs(self.store.device_by_ip("10.10.10.99"), moved)
+		self.assertIsNone(self.store.device("64"))
+		self.assertEqual(self.store.devices_by_location_prefix("server"), [])
+		self.assertEqual([d.id for d in self.store.devices_by_location_prefix("edit bay")], ["170", "200"])
+		self.assertEqual(len(self.store.devices), 2)
+
+	def test_unknown_index(self):
+		with self.assertRaises(ValueError):
+			self.store.devices.lookup("colour", "red")
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,131 @@
+import unittest, collections
+from adderlib import adder, urlhandlers, devices, channels, switching
+
+class _PresetHandler(urlhandlers.DebugHandler):
+	"""Debug handler which records preset requests, and can be told to refuse some"""
+
+	def __init__(self):
+		self.calls = collections.defaultdict(list)
+		self.taken = set()
+		self.load_errors = []	# Responses for the next preset loads, in turn
+		self.refuse = None		# Response to any preset creation
+
+	def api_call(self, server_address, args):
+		method = args.get("method")
+		self.calls[method].append(args)
+
+		if method == "create_preset":
+			if self.refuse is not None:
+				return self.refuse
+			if args.get("name") in self.taken:
+				return {"errors": {"error": {"code": "20", "msg": "Name in use"}}}
+			# The example response always gives ID 5, which isn't among the example presets
+			return {"success": "1", "id": "3"}
+		if method == "connect_preset" and self.load_errors:
+			return self.load_errors.pop(0)
+		return super().api_call(server_address, args)
+
+def pairs(*ids:str) -> list:
+	channel = channels.AdderChannel({"c_id": "1"})
+	return [(channel, devices.AdderReceiver({"d_id": id})) for id in ids]
+
+class TestPresetSwitcher(unittest.TestCase):
+
+	def setUp(self):
+		self.handler = _PresetHandler()
+		self.api = adder.AdderAPI("localhost", url_handler=self.handler)
+		self.api.login("valid_username", "valid_password")
+
+	def test_reuse(self):
+		"""The same batch, in any order, should reuse its preset"""
+
+		switcher = switching.PresetSwitcher(self.api, keep=1)
+		switcher.switch(pairs("1", "2"))
+		switcher.switch(pairs("2", "1"), channels.AdderChannel.ConnectionMode.VIEW_ONLY)
+		self.assertEqual(len(self.handler.calls["create_preset"]), 1)
+		self.assertEqual(len(self.handler.calls["connect_preset"]), 2)
+		self.assertEqual(self.handler.calls["create_preset"][0]["pairs"], "1-1,1-2")
+
+		# A new batch pushes the old preset out
+		switcher.switch(pairs("3"))
+		self.assertEqual(len(self.handler.calls["delete_preset"]), 1)
+		switcher.close()
+		self.assertEqual(len(self.handler.calls["delete_preset"]), 2)
+		self.assertEqual(switcher.presets, ())
+
+	def test_name_taken(self):
+		"""Another name should be tried if the first is taken"""
+
+		switcher = switching.PresetSwitcher(self.api)
+		self.handler.taken.add(switcher._name(switcher._batch_key(switching.as_pairs(pairs("1"))), 0))
+		switcher.switch(pairs("1"))
+		names = [call["name"] for call in self.handler.calls["create_preset"]]
+		self.assertEqual(len(names), 2)
+		self.assertTrue(names[1].startswith(switching.PresetSwitcher.PREFIX) and names[1].endswith("-2"))
+
+	def test_other_error_not_retried(self):
+		"""Only a taken name is worth another try; any other error should be raised straight away"""
+
+		self.handler.refuse = {"errors": {"error": {"code": "22", "msg": "Receiver not found"}}}
+		with self.assertRaises(adder.AdderRequestError):
+			switching.PresetSwitcher(self.api).switch(pairs("1"))
+		self.assertEqual(len(self.handler.calls["create_preset"]), 1)
+
+	def test_create_unknown_failure(self):
+		"""A preset which isn't created should raise, even without errors to say why"""
+
+		self.handler.refuse = {"success": "0"}
+		with self.assertRaises(adder.AdderRequestError):
+			self.api.createPreset("Test", switching.as_pairs(pairs("1")), channels.AdderChannel.ConnectionMode.SHARED)
+
+	def test_failure_cleanup(self):
+		"""A preset which fails to load should be deleted, and the error raised"""
+
+		self.handler.load_errors = [{"errors": {"error": {"code": "21", "msg": "Receiver in use"}}}]
+		switcher = switching.PresetSwitcher(self.api)
+		with self.assertRaises(Exception):
+			switcher.switch(pairs("1", "2"))
+		self.assertEqual(len(self.handler.calls["delete_preset"]), 1)
+		self.assertEqual(switcher.presets, ())
+
+	def test_reused_missing(self):
+		"""A kept preset someone else has deleted should be replaced with a new one"""
+
+		switcher = switching.PresetSwitcher(self.api)
+		switcher.switch(pairs("1"))
+		self.handler.load_errors = [{"errors": {"error": {"code": "30", "msg": "Preset not found"}}}]
+		switcher.switch(pairs("1"))
+		self.assertEqual([len(self.handler.calls[m]) for m in ("create_preset", "connect_preset", "delete_preset")], [2, 3, 1])
+		self.assertEqual(len(switcher.presets), 1)
+
+	def test_reused_load_failure(self):
+		"""Any other failure loading a kept preset should be raised, keeping the preset and without trying again"""
+
+		switcher = switching.PresetSwitcher(self.api)
+		switcher.switch(pairs("1"))
+		self.handler.load_errors = [{"errors": {"error": {"code": "21", "msg": "Receiver in use"}}}]
+		with self.assertRaises(adder.AdderRequestError):
+			switcher.switch(pairs("1"))
+		self.assertEqual([len(self.handler.calls[m]) for m in ("create_preset", "connect_preset", "delete_preset")], [1, 2, 0])
+		self.assertEqual(len(switcher.presets), 1)
+
+	def test_ephemeral(self):
+		"""With nothing kept, each preset should be deleted once loaded"""
+
+		switching.PresetSwitcher(self.api, keep=0).switch(pairs("1"))
+		self.assertEqual([len(self.handler.calls[m]) for m in ("create_preset", "connect_preset", "delete_preset")], [1, 1, 1])
+
+	def test_atomic_connect_many(self):
+		"""connectMany(atomic=True) should make one switch, and tidy up on logout"""
+
+		result = self.api.connectMany(pairs("1", "2", "3"), atomic=True)
+		self.assertTrue(result.ok)
+		self.assertEqual(len(result), 3)
+		self.assertEqual(len(self.handler.calls["connect_channel"]), 0)
+		self.assertEqual(len(self.handler.calls["connect_preset"]), 1)
+
+		self.api.logout()
+		self.assertEqual(len(self.handler.calls["delete_preset"]), 1)
+
+if __name__ == "__main__":
+	unittest.main()
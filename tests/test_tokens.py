@@ -0,0 +1,170 @@
+import unittest, collections, os, stat, tempfile, pathlib
+from adderlib import adder, urlhandlers, tokens
+
+class _SessionHandler(urlhandlers.DebugHandler):
+	"""Debug handler which issues numbered tokens, and turns down any it didn't issue"""
+
+	def __init__(self):
+		self.calls = collections.Counter()
+		self.issued = set()
+
+	def api_call(self, server_address, args):
+		method = args.get("method")
+		self.calls[method] += 1
+		if method == "login":
+			self.issued.add(f"token-{len(self.issued) + 1}")
+			return {"success": "1", "token": f"token-{len(self.issued)}"}
+		if "token" in args and args["token"] not in self.issued:
+			return {"success": "0", "errors": {"error": {"code": "1", "msg": "Invalid token"}}}
+		return super().api_call(server_address, args)
+
+	def api_stream(self, server_address, args, container, item):
+		if args["token"] not in self.issued:
+			# The error comes back in the header of an empty list
+			return urlhandlers.UrlHandler.api_stream(self, server_address, args, container, item)
+		return super().api_stream(server_address, args, container, item)
+
+class _QuietSessionHandler(_SessionHandler):
+	"""Session handler whose lists don't say how the response went"""
+
+	def api_stream(self, server_address, args, container, item):
+		return iter(list(super().api_stream(server_address, args, container, item)))
+
+class TestTokenStore(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+		self.store = tokens.TokenStore(pathlib.Path(self.dir.name, "adderlib", "tokens.json"))
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	def test_save_load(self):
+		self.store.save("http://aim", "timmy", "abc")
+		self.assertEqual(self.store.load("http://aim", "timmy"), "abc")
+		self.assertIsNone(self.store.load("http://aim", "jimmy"))
+		self.assertIsNone(self.store.load("http://other", "timmy"))
+
+		self.store.discard("http://aim", "timmy")
+		self.assertIsNone(self.store.load("http://aim", "timmy"))
+
+	@unittest.skipUnless(os.name == "posix", "File modes are POSIX only")
+	def test_permissions(self):
+		"""Only the owner should be able to read the store"""
+
+		self.store.save("http://aim", "timmy", "abc")
+		self.assertEqual(stat.S_IMODE(self.store.path.stat().st_mode), 0o600)
+
+		# A store others could read may have been seen, so it shouldn't be trusted
+		os.chmod(self.store.path, 0o644)
+		self.assertIsNone(self.store.load("http://aim", "timmy"))
+
+	def test_corrupt(self):
+		self.store.save("http://aim", "timmy", "abc")
+		self.store.path.write_text("{not json")
+		self.assertIsNone(self.store.load("http://aim", "timmy"))
+
+class TestStoredSession(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.TemporaryDirectory()
+		self.store = tokens.TokenStore(pathlib.Path(self.dir.name, "tokens.json"))
+		self.handler = _SessionHandler()
+
+	def tearDown(self):
+		self.dir.cleanup()
+
+	def _api(self):
+		return adder.AdderAPI("localhost", url_handler=self.handler)
+
+	def test_saved_on_login(self):
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		self.assertEqual(self.store.load(api.server_address.geturl(), "timmy"), "token-1")
+
+	def test_restored(self):
+		"""A second run should pick up the stored session without logging in"""
+
+		self._api().login("timmy", "pass", token_store=self.store)
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+
+		self.assertEqual(self.handler.calls["login"], 1)
+		self.assertEqual(api.user.token, "token-1")
+		self.assertEqual(len(list(api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["login"], 1)
+
+	def test_expired(self):
+		"""A stored token the AIM turns down should be replaced with a new login, and the call retried"""
+
+		self.store.save(self._api().server_address.geturl(), "timmy", "token-expired")
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		self.assertEqual(self.handler.calls["login"], 0)
+
+		# Even a list, which would otherwise come back empty
+		self.assertEqual(len(list(api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["login"], 1)
+		self.assertEqual(api.user.token, "token-1")
+		self.assertEqual(self.store.load(api.server_address.geturl(), "timmy"), "token-1")
+
+	def test_expires_later(self):
+		"""A session which expires after it has been used should still be renewed for a streamed list"""
+
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		self.assertEqual(len(list(api.getChannels())), 2)
+
+		self.handler.issued.clear()
+		self.assertEqual(len(list(api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["login"], 2)
+
+	def test_expired_quiet_handler(self):
+		"""Lists from a handler which doesn't report success should be checked with a whole response when empty"""
+
+		self.handler = _QuietSessionHandler()
+		self.store.save(self._api().server_address.geturl(), "timmy", "token-expired")
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		self.assertEqual(len(list(api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["login"], 1)
+
+	def test_token_error_codes(self):
+		"""The AIM's error code should decide what is a token error, with the message only used without one"""
+
+		def error(code, msg):
+			return {"success": "0", "errors": {"error": {"code": code, "msg": msg}}}
+
+		self.assertTrue(adder.AdderAPI._isTokenError(error("1", "Invalid token")))
+		self.assertFalse(adder.AdderAPI._isTokenError(error("231", "Token ring not available")))
+		self.assertTrue(adder.AdderAPI._isTokenError(error(None, "You are not logged in")))
+		self.assertFalse(adder.AdderAPI._isTokenError({"success": "1"}))
+
+	def test_logout(self):
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		api.logout()
+		self.assertIsNone(self.store.load(api.server_address.geturl(), "timmy"))
+
+	def test_failed_logout(self):
+		"""A logout the AIM turns down should leave the stored session, and its renewal, in place"""
+
+		api = self._api()
+		api.login("timmy", "pass", token_store=self.store)
+		self.handler.issued.clear()
+		with self.assertRaises(adder.AdderRequestError):
+			api.logout()
+		self.assertEqual(self.store.load(api.server_address.geturl(), "timmy"), "token-1")
+
+		self.assertEqual(len(list(api.getChannels())), 2)
+		self.assertEqual(self.handler.calls["login"], 2)
+
+	def test_without_store(self):
+		"""Without a store, token errors should be left to the caller as before"""
+
+		api = self._api()
+		api.login("timmy", "pass")
+		self.handler.issued.clear()
+		with self.assertRaises(adder.AdderRequestError):
+			api.rebootDevices([])
+		self.assertEqual(self.handler.calls["login"], 1)
@@ -0,0 +1,98 @@
+import unittest, http.server, pathlib, threading, urllib.parse
+from adderlib import adder, urlhandlers
+
+# Serve the example XMLs over a local HTTP/1.1 server
+example_dir = pathlib.Path(__file__).parent / "example_xml"
+
+class _ExampleXmlHandler(http.server.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True
+
+	def do_GET(self):
+		method = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query).get("method",[""])[0]
+		if method == "moved":
+			self.send_response(302)
+			self.send_header("Location", "/elsewhere")
+			self.send_header("Content-Length", "0")
+			self.end_headers()
+			return
+		path = (example_dir / method).with_suffix(".xml")
+		body = path.read_bytes() if method and path.is_file() else b""
+		self.send_response(200 if body else 404)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+class LocalServerTestCase(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _ExampleXmlHandler)
+		cls.server.daemon_threads = True
+		threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+		cls.address = "{}:{}".format(*cls.server.server_address[:2])
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+
+class TestSessionHandler(LocalServerTestCase):
+
+	def test_connections_are_reused(self):
+		"""Repeated calls should travel over a single kept-alive connection"""
+
+		with urlhandlers.SessionHandler(pool_size=1) as handler:
+			api = adder.AdderAPI(self.address, url_handler=handler)
+			for _ in range(5):
+				self.assertEqual(len(list(api.getServers())), 2)
+
+			self.assertEqual(handler.stats.requests_sent, 5)
+			self.assertEqual(handler.stats.connections_opened, 1)
+			self.assertEqual(handler.stats.connections_reused, 4)
+
+	def test_per_instance_settings(self):
+		"""Settings should not leak between handler instances"""
+
+		fast = urlhandlers.SessionHandler(timeout=1, pool_size=2)
+		slow = urlhandlers.SessionHandler(timeout=30)
+		self.assertEqual(fast.timeout, 1)
+		self.assertEqual(slow.timeout, 30)
+		self.assertEqual(fast.pool_size, 2)
+
+		with self.assertRaises(ValueError):
+			urlhandlers.SessionHandler(pool_size=0)
+
+	def test_bad_status(self):
+		"""Non-2xx responses should raise"""
+
+		with urlhandlers.SessionHandler() as handler:
+			with self.assertRaises(Exception):
+				handler.api_call(adder.AdderAPI(self.address).server_address, {"method":"not_a_method"})
+
+class TestStreaming(LocalServerTestCase):
+
+	def test_stream_matches_buffered(self):
+		"""Streamed list items should match the buffered response, for each handler"""
+
+		server_address = adder.AdderAPI(self.address).server_address
+		args = {"method":"get_devices"}
+		buffered = urlhandlers.RequestsHandler.api_call(server_address, args)["devices"]["device"]
+
+		with urlhandlers.SessionHandler(stream_chunk_size=64) as session:
+			for handler in (urlhandlers.RequestsHandler(), session):
+				with self.subTest(handler=type(handler).__name__):
+					streamed = list(handler.api_stream(server_address, args, "devices", "device"))
+					self.assertEqual(streamed, [dict(x) for x in buffered])
+
+	def test_stream_without_list_is_empty(self):
+		"""Nothing should be yielded from a response without the requested list"""
+
+		server_address = adder.AdderAPI(self.address).server_address
+		self.assertEqual(list(urlhandlers.RequestsHandler().api_stream(server_address, {"method":"logout"}, "devices", "device")), [])
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,129 @@
+import unittest, time
+from adderlib import adder, urlhandlers, devices, delta, watch
+
+Change = delta.AdderChange.ChangeType
+Overflow = watch.Subscription.Overflow
+
+def receiver(id:str, status:str="1") -> devices.AdderReceiver:
+	return devices.AdderReceiver({"d_id": id, "d_status": status})
+
+class _ScriptedPoll:
+	"""Returns one list of receivers per poll, repeating the last"""
+
+	def __init__(self, *polls):
+		self.polls = list(polls)
+		self.calls = 0
+
+	def __call__(self):
+		self.calls += 1
+		return self.polls.pop(0) if len(self.polls) > 1 else self.polls[0]
+
+class TestWatch(unittest.TestCase):
+
+	def test_one_poll_many_subscribers(self):
+		"""Every subscriber should get every change, from one poll"""
+
+		poll = _ScriptedPoll([receiver("1")], [receiver("1", "0"), receiver("2")])
+		w = watch.Watch(poll)
+		first, second = w.subscribe(), w.subscribe()
+
+		self.assertEqual(w.poll(), [])
+		self.assertEqual(len(w.poll()), 2)
+		self.assertEqual(poll.calls, 2)
+		for subscription in (first, second):
+			self.assertEqual({c.type for c in subscription.get_all()}, {Change.STATUS_CHANGED, Change.ADDED})
+
+	def test_adaptive_interval(self):
+		"""Polling should speed up with changes and slow down without, within limits"""
+
+		w = watch.Watch(_ScriptedPoll([receiver("1")], [receiver("1", "0")], [receiver("1")], [receiver("1")]), min_interval=1, max_interval=2)
+		w.poll()
+		self.assertEqual(w.interval, 1.5)
+		w.poll()
+		self.assertEqual(w.interval, 1)
+		w.poll()
+		w.poll()
+		w.poll()
+		self.assertEqual(w.interval, 2)
+
+	def test_failed_poll(self):
+		"""A failed poll should be noted, and watching carry on"""
+
+		def fail():
+			raise adder.AdderRequestError("Error 1: Nope")
+
+		w = watch.Watch(fail)
+		self.assertEqual(w.poll(), [])
+		self.assertIsInstance(w.last_error, adder.AdderRequestError)
+
+	def test_overflow(self):
+		"""Full queues should drop or coalesce according to their policy"""
+
+		changes = [delta.AdderChange(Change.STATUS_CHANGED, "1", None, None, n, n+1) for n in range(3)]
+
+		for overflow, expected in ((Overflow.DROP_OLDEST, [1, 2]), (Overflow.DROP_NEWEST, [0, 1])):
+			subscription = watch.Subscription(maxsize=2, overflow=overflow)
+			subscription.publish(changes)
+			self.assertEqual([c.old_value for c in subscription.get_all()], expected)
+			self.assertEqual(subscription.dropped, 1)
+
+		subscription = watch.Subscription(maxsize=2, overflow=Overflow.COALESCE)
+		subscription.publish(changes)
+		coalesced = subscription.get_all()
+		self.assertEqual([(c.old_value, c.new_value) for c in coalesced], [(0, 3)])
+		self.assertEqual((subscription.dropped, subscription.coalesced), (0, 2))
+
+		with self.assertRaises(ValueError):
+			watch.Subscription(maxsize=0)
+
+	def test_background(self):
+		"""AdderAPI.watch() should poll in the background until stopped, then end its subscriptions"""
+
+		api = adder.AdderAPI("localhost", url_handler=urlhandlers.DebugHandler())
+		api.login("valid_username", "valid_password")
+
+		with api.watch(min_interval=0.01, max_interval=0.01) as w:
+			subscription = w.subscribe()
+			deadline = time.monotonic() + 5
+			while w.polls < 3 and time.monotonic() < deadline:
+				time.sleep(0.01)
+			self.assertTrue(w.running)
+
+		self.assertGreaterEqual(w.polls, 3)
+		self.assertFalse(w.running)
+		self.assertEqual(list(subscription), [])
+
+class TestAsyncWatch(unittest.IsolatedAsyncioTestCase):
+
+	async def test_async_subscribers(self):
+		"""Subscribers should be able to await changes from a background task"""
+
+		polls = _ScriptedPoll([receiver("1")], [receiver("1"), receiver("2")])
+
+		async def poll():
+			return polls()
+
+		async with watch.AsyncWatch(poll, min_interval=0.01, max_interval=0.01) as w:
+			subscription = w.subscribe()
+			change = await subscription.get(timeout=5)
+
+		self.assertEqual((change.type, change.id), (Change.ADDED, "2"))
+		self.assertIsNone(await subscription.get())
+
+	async def test_stop(self):
+		"""stop() should work as it does on a Watch, without being awaited"""
+
+		async def poll():
+			return [receiver("1")]
+
+		w = watch.AsyncWatch(poll, min_interval=0.01, max_interval=0.01)
+		subscription = w.subscribe()
+		w.start()
+		self.assertIsNone(w.stop())
+		self.assertTrue(subscription.closed)
+
+		await w.aclose()
+		self.assertFalse(w.running)
+
+if __name__ == "__main__":
+	unittest.main()